@@ -3,9 +3,19 @@
 Compute SHA256 hash of first 4KB + last 4KB of a file.
 
 Usage: python3 8k_hash.py <file_path>
+       python3 8k_hash.py --batch [-0] [<file_path> ...]
 
 For files <= 8KB, hashes the entire file.
 Output: Just the hex digest (compatible with sha256sum output format).
+
+Batch mode hashes many files in one interpreter. Paths are taken from argv,
+or from stdin when none are given (one per line, or NUL-separated with -0).
+Each result is streamed as soon as it is computed:
+
+  <hash>\t<size>\t<name>
+
+A file that cannot be hashed is reported as "Error\t-1\t<name>" and the
+exit code is 1, but the remaining files are still processed.
 """
 
 import hashlib
@@ -29,12 +39,59 @@ def compute_8k_hash(file_path):
     return hashlib.sha256(data).hexdigest()
 
 
+def read_batch_paths(stream, null_separated=False):
+    """Yield paths from a binary stream, newline- or NUL-separated."""
+    separator = b'\0' if null_separated else b'\n'
+    data = stream.read()
+    for raw in data.split(separator):
+        if not null_separated:
+            raw = raw.rstrip(b'\r')
+        if raw:
+            yield os.fsdecode(raw)
+
+
+def run_batch(paths, out=None):
+    """
+    Hash each path and stream "hash<TAB>size<TAB>name" lines to out.
+
+    Returns:
+        int: 0 if every file was hashed, 1 otherwise
+    """
+    out = out or sys.stdout
+    exit_code = 0
+    for file_path in paths:
+        try:
+            if not os.path.isfile(file_path):
+                raise OSError(f"{file_path} is not a valid file")
+            size = os.path.getsize(file_path)
+            digest = compute_8k_hash(file_path)
+            out.write(f"{digest}\t{size}\t{file_path}\n")
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            out.write(f"Error\t-1\t{file_path}\n")
+            exit_code = 1
+        out.flush()
+    return exit_code
+
+
 if __name__ == '__main__':
-    if len(sys.argv) != 2:
+    argv = sys.argv[1:]
+
+    if argv and argv[0] == '--batch':
+        argv = argv[1:]
+        null_separated = False
+        if argv and argv[0] in ('-0', '--null'):
+            null_separated = True
+            argv = argv[1:]
+        paths = argv if argv else read_batch_paths(sys.stdin.buffer, null_separated)
+        sys.exit(run_batch(paths))
+
+    if len(argv) != 1:
         print(f"Usage: {sys.argv[0]} <file_path>", file=sys.stderr)
+        print(f"       {sys.argv[0]} --batch [-0] [<file_path> ...]", file=sys.stderr)
         sys.exit(1)
 
-    file_path = sys.argv[1]
+    file_path = argv[0]
 
     if not os.path.isfile(file_path):
         print(f"Error: {file_path} is not a valid file", file=sys.stderr)
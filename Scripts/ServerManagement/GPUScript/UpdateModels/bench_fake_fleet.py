@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Fake-fleet benchmark for the UpdateModels pipeline.
+
+Runs the real sync code on a plain Linux box, without GPU servers, a NAS
+host or R2:
+  - "servers" and the NAS are local directories of synthetic sparse
+    .ckpt / .ckpt-tensordata files (unique first 4K, zeros after that, so
+    hashes differ per file but generating 10k files takes seconds)
+  - ssh and scp are replaced with local shims through UPDATEMODELS_SSH /
+    UPDATEMODELS_SCP (see ssh_pool.py): the shim drops the options and the
+    host and runs the command with bash, and scp becomes cp
+  - the NAS directory is served by a local HTTP server, which the fake
+    servers download from with wget like from the NAS's nginx
+
+For each file count it measures:
+  L1/L2/L3 generation   compare_checksums.update_directory() on the NAS
+                        directory, one level at a time (local mode)
+  L1/L2/L3 comparison   diff_checksums() of a server CSV missing 10% of the
+                        files and with 5% changed against the NAS CSV
+  end-to-end sync       sync_servers_parallel() of all fake servers, each
+                        starting with half of the files (checksum update,
+                        comparison, downloads, final update), followed by
+                        the per-phase report of sync_profile.py
+
+Remote commands run the scripts from this directory (as
+DEFAULT_REMOTE_SCRIPTS_DIR). Requires wget. The sync writes its working
+CSVs and state files to logs/ like a real run, under fake host names
+(fakefleet-NN) that are removed again afterwards.
+
+Usage:
+  python3 bench_fake_fleet.py                           # 100, 1000 and 10000 files
+  python3 bench_fake_fleet.py --files 1000 --servers 4 --file-size 1M
+  python3 bench_fake_fleet.py --files 100 --keep --json bench.json
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+DEFAULT_FILE_COUNTS = [100, 1000, 10000]
+DEFAULT_SERVERS = 2
+
+# Apparent sizes of the synthetic files (tensordata / ckpt)
+DEFAULT_FILE_SIZE = '256K'
+CKPT_SIZE = 64 * 1024
+
+# Unique bytes at the start of every file (L2 reads the first and last 4K)
+HEADER_SIZE = 4096
+
+# Fraction of the NAS files each fake server starts with
+PREFILL_FRACTION = 0.5
+
+# Fake host names; their files in logs/ are removed after the run
+HOST_PREFIX = 'fakefleet-'
+
+SSH_SHIM = """#!/bin/bash
+# Fake ssh for bench_fake_fleet.py: runs the remote command locally
+while [ $# -gt 0 ]; do
+    case "$1" in
+        -O) exit 0 ;;                       # Control commands (ssh -O exit)
+        -[bcDEeFIiJLlmoOpQRSWw]) shift 2 ;; # Options with an argument
+        -*) shift ;;
+        *) break ;;
+    esac
+done
+shift  # Destination
+exec bash -c "$*"
+"""
+
+SCP_SHIM = """#!/bin/bash
+# Fake scp for bench_fake_fleet.py: host:path becomes path
+while [ $# -gt 0 ]; do
+    case "$1" in
+        -[cFiJloPS]) shift 2 ;;
+        -*) shift ;;
+        *) break ;;
+    esac
+done
+exec cp "${1#*:}" "${2#*:}"
+"""
+
+
+def parse_size(value):
+    """Size with optional K/M/G suffix (binary units) in bytes."""
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    value = value.strip().upper().rstrip('B')
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+def install_shims(bin_dir):
+    """Write the ssh/scp shims and point ssh_pool at them (before it is imported)."""
+    os.makedirs(bin_dir, exist_ok=True)
+    for name, script, variable in (('fake-ssh', SSH_SHIM, 'UPDATEMODELS_SSH'),
+                                   ('fake-scp', SCP_SHIM, 'UPDATEMODELS_SCP')):
+        path = os.path.join(bin_dir, name)
+        with open(path, 'w') as f:
+            f.write(script)
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+        os.environ[variable] = path
+
+
+def model_files(count):
+    """Filenames of the synthetic fleet: .ckpt/.ckpt-tensordata pairs."""
+    files = []
+    for i in range((count + 1) // 2):
+        files.append(f"bench-model-{i:05d}.ckpt-tensordata")
+        if len(files) < count:
+            files.append(f"bench-model-{i:05d}.ckpt")
+    return files
+
+
+def file_size_of(filename, file_size):
+    return CKPT_SIZE if filename.endswith('.ckpt') else file_size
+
+
+def write_sparse_file(path, filename, size):
+    """Unique header derived from the filename, then a hole up to size."""
+    header = (filename.encode() + b'\n' + hashlib.sha256(filename.encode()).digest() * 128)[:HEADER_SIZE]
+    with open(path, 'wb') as f:
+        f.write(header[:size])
+        f.truncate(size)
+
+
+def build_directory(directory, files, file_size):
+    """Create directory with the given synthetic files and an empty sha256-list.csv."""
+    os.makedirs(directory, exist_ok=True)
+    for filename in files:
+        write_sparse_file(os.path.join(directory, filename), filename, file_size_of(filename, file_size))
+    with open(os.path.join(directory, 'sha256-list.csv'), 'w') as f:
+        f.write('filename,sha256sum,8k_sha256sum,filesize\n')
+
+
+def start_nas_server(directory):
+    """Serve directory over HTTP on a free local port (NAS stand-in)."""
+    class QuietHandler(SimpleHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(QuietHandler, directory=directory))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def remove_fake_host_files():
+    """Remove the working CSVs, stat caches and state files of the fake hosts from logs/."""
+    for path in (SCRIPT_DIR / "logs").glob(f"*{HOST_PREFIX}*"):
+        path.unlink(missing_ok=True)
+
+
+def timed(function, *args, **kwargs):
+    """Call function with its output discarded; return (result, seconds)."""
+    started = time.monotonic()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = function(*args, **kwargs)
+    return result, time.monotonic() - started
+
+
+def bench_generation(cc, nas_dir, results):
+    """Time L1, L2 and L3 generation for the NAS directory (produces the NAS CSV)."""
+    for level in ('L1', 'L2', 'L3'):
+        csv_file, seconds = timed(cc.update_directory, nas_dir, level, use_stat_cache=False)
+        if csv_file is None:
+            raise RuntimeError(f"{level} generation failed for {nas_dir}")
+        results[f'generate_{level}_seconds'] = round(seconds, 3)
+    return os.path.join(nas_dir, 'sha256-list.csv')
+
+
+def bench_comparison(cc, nas_csv, work_dir, results):
+    """Time diff_checksums() per level for a server CSV with missing and changed files."""
+    checksums = cc.read_csv(nas_csv)
+    server_checksums = {}
+    for i, (filename, values) in enumerate(sorted(checksums.items())):
+        if i % 10 == 9:
+            continue  # Missing on the server
+        values = dict(values)
+        if i % 20 == 3:
+            values['sha256sum'] = hashlib.sha256(filename.encode()).hexdigest()
+            values['8k_sha256sum'] = values['sha256sum']
+            values['filesize'] = values['filesize'] + 1
+        server_checksums[filename] = values
+    server_csv = os.path.join(work_dir, 'server-sha256-list.csv')
+    cc.write_csv(server_csv, server_checksums)
+
+    for level in ('L1', 'L2', 'L3'):
+        diffs, seconds = timed(cc.diff_checksums, server_csv, nas_csv, level)
+        results[f'compare_{level}_seconds'] = round(seconds, 3)
+        results[f'compare_{level}_diffs'] = len(diffs)
+
+
+def bench_sync(m, nas_dir, nas_csv, work_dir, files, file_size, server_count, results):
+    """Sync fake servers (each starting with part of the files) from the local NAS."""
+    import asyncio
+    from sync_profile import SyncProfile
+
+    prefill = files[:int(len(files) * PREFILL_FRACTION)]
+    servers = []
+    for i in range(1, server_count + 1):
+        path = os.path.join(work_dir, f"{HOST_PREFIX}{i:02d}", 'models')
+        build_directory(path, prefill, file_size)
+        servers.append((f"root@{HOST_PREFIX}{i:02d}:{path}", path, None))
+
+    nas_server = start_nas_server(nas_dir)
+    nas_url = f"127.0.0.1:{nas_server.server_address[1]}"
+    servers = [(server, path, nas_url) for server, path, _ in servers]
+    log_dir = os.path.join(work_dir, 'logs')
+    os.makedirs(log_dir, exist_ok=True)
+
+    m.PROFILE = SyncProfile()
+    started = time.monotonic()
+    try:
+        sync_results = asyncio.run(m.sync_servers_parallel(servers, nas_csv, log_dir))
+    finally:
+        nas_server.shutdown()
+    seconds = time.monotonic() - started
+
+    downloaded = sum(file_size_of(filename, file_size) for filename in files[len(prefill):]) * server_count
+    results['sync_seconds'] = round(seconds, 3)
+    results['sync_servers_ok'] = sum(1 for ok in sync_results.values() if ok)
+    results['sync_downloaded_bytes'] = downloaded
+    return m.PROFILE.report()
+
+
+def run_benchmark(count, args, work_dir):
+    """Build the fake fleet for one file count and run every benchmark on it."""
+    import compare_checksums as cc
+    import sync_models_multi_server as m
+
+    m.DEFAULT_REMOTE_SCRIPTS_DIR = cc.DEFAULT_REMOTE_SCRIPTS_DIR = str(SCRIPT_DIR)
+    m.PROGRESS_INTERVAL_SECONDS = 3600  # Only the final status lines
+
+    files = model_files(count)
+    nas_dir = os.path.join(work_dir, 'nas')
+    results = {'files': count, 'servers': args.servers,
+               'bytes': sum(file_size_of(filename, args.file_size) for filename in files)}
+
+    started = time.monotonic()
+    build_directory(nas_dir, files, args.file_size)
+    results['build_seconds'] = round(time.monotonic() - started, 3)
+
+    nas_csv = bench_generation(cc, nas_dir, results)
+    bench_comparison(cc, nas_csv, work_dir, results)
+    profile_lines = bench_sync(m, nas_dir, nas_csv, work_dir, files, args.file_size, args.servers, results)
+    return results, profile_lines
+
+
+def print_results(all_results):
+    """Summary table: seconds and files/s per benchmark and file count."""
+    columns = [('generate_L1_seconds', 'gen L1'), ('generate_L2_seconds', 'gen L2'),
+               ('generate_L3_seconds', 'gen L3'), ('compare_L1_seconds', 'cmp L1'),
+               ('compare_L2_seconds', 'cmp L2'), ('compare_L3_seconds', 'cmp L3'),
+               ('sync_seconds', 'sync')]
+    print(f"\n{'='*70}")
+    print("Fake-fleet benchmark (seconds, files/s)")
+    print('='*70)
+    print(f"{'files':>7}" + ''.join(f" {title:>16}" for _, title in columns) + f" {'sync MB/s':>10}")
+    for results in all_results:
+        row = f"{results['files']:>7}"
+        for key, _ in columns:
+            seconds = results[key]
+            files = results['files'] * (results['servers'] if key == 'sync_seconds' else 1)
+            rate = files / seconds if seconds > 0 else 0
+            row += f" {f'{seconds:.2f} ({rate:.0f}/s)':>16}"
+        mbps = results['sync_downloaded_bytes'] / 1024 ** 2 / results['sync_seconds'] if results['sync_seconds'] else 0
+        ok = '' if results['sync_servers_ok'] == results['servers'] else \
+             f"  ❌ {results['servers'] - results['sync_servers_ok']} server(s) failed"
+        print(row + f" {mbps:>10.1f}{ok}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the UpdateModels pipeline on a local fake fleet'
+    )
+    parser.add_argument(
+        '--files',
+        type=int,
+        nargs='+',
+        default=DEFAULT_FILE_COUNTS,
+        help=f'File counts to benchmark (default: {" ".join(map(str, DEFAULT_FILE_COUNTS))})'
+    )
+    parser.add_argument(
+        '--servers',
+        type=int,
+        default=DEFAULT_SERVERS,
+        help=f'Fake GPU servers synced in parallel (default: {DEFAULT_SERVERS})'
+    )
+    parser.add_argument(
+        '--file-size',
+        type=parse_size,
+        default=parse_size(DEFAULT_FILE_SIZE),
+        help=f'Apparent size of each .ckpt-tensordata file, e.g. 4M (default: {DEFAULT_FILE_SIZE}; '
+             f'.ckpt files are {CKPT_SIZE // 1024}K). Downloaded copies are not sparse.'
+    )
+    parser.add_argument(
+        '--workdir',
+        help='Directory for the fake fleet (default: a new temporary directory)'
+    )
+    parser.add_argument(
+        '--keep',
+        action='store_true',
+        help='Keep the fake fleet and its logs after the run'
+    )
+    parser.add_argument(
+        '--json',
+        metavar='PATH',
+        help='Also write the results as JSON to PATH'
+    )
+    args = parser.parse_args()
+
+    if not shutil.which('wget'):
+        print("❌ wget is required (the fake servers download with it)")
+        sys.exit(1)
+
+    root = args.workdir or tempfile.mkdtemp(prefix='fake-fleet-')
+    install_shims(os.path.join(root, 'bin'))
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+    # The sync keeps its working CSVs and state files in logs/ (created by main() in a real run)
+    logs_dir = SCRIPT_DIR / "logs"
+    created_logs_dir = not logs_dir.exists()
+    logs_dir.mkdir(exist_ok=True)
+
+    all_results = []
+    try:
+        for count in args.files:
+            work_dir = os.path.join(root, f"{count}-files")
+            shutil.rmtree(work_dir, ignore_errors=True)
+            remove_fake_host_files()
+            print(f"\n{'#'*70}")
+            print(f"# {count} files, {args.servers} server(s)  ({work_dir})")
+            print('#'*70)
+            results, profile_lines = run_benchmark(count, args, work_dir)
+            all_results.append(results)
+            print()
+            for line in profile_lines:
+                print(line)
+            if not args.keep:
+                shutil.rmtree(work_dir, ignore_errors=True)
+    finally:
+        remove_fake_host_files()
+        if created_logs_dir and not any(logs_dir.iterdir()):
+            logs_dir.rmdir()
+        if not args.keep and not args.workdir:
+            shutil.rmtree(root, ignore_errors=True)
+
+    print_results(all_results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(all_results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+    if args.keep:
+        print(f"Fake fleet kept in {root}")
+
+    failed = any(results['sync_servers_ok'] < results['servers'] for results in all_results)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
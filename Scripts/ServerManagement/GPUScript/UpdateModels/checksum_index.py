@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Indexed SQLite store for sha256-list.csv.
+
+The index is an optional sidecar (sha256-list.index.sqlite next to
+sha256-list.csv) holding the same 4 columns in a table keyed by filename.
+Lookups use the primary-key B-tree (O(log n) per filename) and iteration
+streams rows in filename order, so callers do not have to parse the whole
+CSV into memory on every invocation.
+
+The CSV stays the source of truth. The index records the size and mtime
+(ns) of the CSV it was imported from and is only used while both match, so
+checking it costs one stat() rather than a read of the whole CSV; a CSV
+that was rewritten or re-downloaded makes it stale until it is re-imported
+(refresh_index() after compare_checksums.py writes the CSV).
+
+Usage:
+  python3 checksum_index.py import <csv_file> [<index_file>]
+  python3 checksum_index.py export <index_file> <csv_file>
+  python3 checksum_index.py get <index_file> <filename> [<filename> ...]
+"""
+
+import csv
+import os
+import sqlite3
+import sys
+
+
+# CSV column names (same order as compare_checksums.CSV_COLUMNS)
+CSV_COLUMNS = ['filename', 'sha256sum', '8k_sha256sum', 'filesize']
+
+# Index file suffix, replacing the CSV's .csv extension
+INDEX_SUFFIX = '.index.sqlite'
+
+# Rows inserted per executemany() batch during import
+IMPORT_BATCH_SIZE = 5000
+
+
+def index_path(csv_file):
+    """Path of the index sidecar for a CSV file (sha256-list.csv -> sha256-list.index.sqlite)."""
+    base, _ = os.path.splitext(csv_file)
+    return f"{base}{INDEX_SUFFIX}"
+
+
+def _row_to_data(sha256sum, hash_8k, filesize):
+    """Convert stored columns to the dict format used by compare_checksums.read_csv."""
+    if filesize:
+        try:
+            filesize = int(filesize)
+        except ValueError:
+            filesize = ''
+    return {
+        'sha256sum': sha256sum or '',
+        '8k_sha256sum': hash_8k or '',
+        'filesize': filesize or ''
+    }
+
+
+class ChecksumIndex:
+    """SQLite-backed checksum table keyed by filename."""
+
+    def __init__(self, index_file):
+        self.index_file = index_file
+        self.connection = sqlite3.connect(index_file)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS checksums ('
+            ' filename TEXT PRIMARY KEY,'
+            ' sha256sum TEXT NOT NULL,'
+            ' hash_8k TEXT NOT NULL,'
+            ' filesize TEXT NOT NULL'
+            ') WITHOUT ROWID'
+        )
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)'
+        )
+        self.connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM checksums').fetchone()[0]
+
+    def _get_meta(self, key):
+        row = self.connection.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self.connection.execute(
+            'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, str(value))
+        )
+
+    def is_current(self, csv_file):
+        """
+        Check whether the index was imported from csv_file as it is now.
+
+        Compares the CSV's size and mtime (ns) with the ones recorded by
+        import_csv(); the CSV is not read.
+        """
+        try:
+            st = os.stat(csv_file)
+        except OSError:
+            return False
+        return (self._get_meta('source_size') == str(st.st_size)
+                and self._get_meta('source_mtime_ns') == str(st.st_mtime_ns))
+
+    def import_csv(self, csv_file):
+        """
+        Replace the index contents with the rows of a 4-column CSV file.
+
+        Returns:
+            int: Number of rows imported
+        """
+        st = os.stat(csv_file)
+        count = 0
+        with self.connection:
+            self.connection.execute('DELETE FROM checksums')
+            with open(csv_file, 'r', newline='') as f:
+                reader = csv.DictReader(f)
+                if reader.fieldnames:
+                    reader.fieldnames = [name.strip() for name in reader.fieldnames]
+                batch = []
+                for row in reader:
+                    if not row:
+                        continue
+                    filename = (row.get('filename', '') or '').strip()
+                    if not filename:
+                        continue
+                    batch.append((
+                        filename,
+                        (row.get('sha256sum', '') or '').strip(),
+                        (row.get('8k_sha256sum', '') or '').strip(),
+                        (row.get('filesize', '') or '').strip()
+                    ))
+                    if len(batch) >= IMPORT_BATCH_SIZE:
+                        count += self._insert(batch)
+                        batch = []
+                count += self._insert(batch)
+            self._set_meta('source_size', st.st_size)
+            self._set_meta('source_mtime_ns', st.st_mtime_ns)
+        return count
+
+    def _insert(self, batch):
+        # Later rows win, matching read_csv() for duplicate filenames
+        self.connection.executemany(
+            'INSERT OR REPLACE INTO checksums (filename, sha256sum, hash_8k, filesize) VALUES (?, ?, ?, ?)',
+            batch
+        )
+        return len(batch)
+
+    def export_csv(self, csv_file):
+        """Write the index contents to a 4-column CSV file, sorted by filename."""
+        temp_file = f"{csv_file}.tmp"
+        with open(temp_file, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_COLUMNS)
+            for row in self.connection.execute(
+                'SELECT filename, sha256sum, hash_8k, filesize FROM checksums ORDER BY filename'
+            ):
+                writer.writerow(row)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, csv_file)
+
+    def lookup(self, filenames):
+        """
+        Look up entries by filename.
+
+        Returns:
+            dict: {filename: {'sha256sum': str, '8k_sha256sum': str, 'filesize': int}}
+                  for the filenames present in the index
+        """
+        results = {}
+        for filename in filenames:
+            row = self.connection.execute(
+                'SELECT sha256sum, hash_8k, filesize FROM checksums WHERE filename = ?',
+                (filename,)
+            ).fetchone()
+            if row:
+                results[filename] = _row_to_data(*row)
+        return results
+
+    def iter_rows(self):
+        """
+        Stream all entries in filename order.
+
+        Yields:
+            tuple: (filename, {'sha256sum': str, '8k_sha256sum': str, 'filesize': int})
+        """
+        cursor = self.connection.execute(
+            'SELECT filename, sha256sum, hash_8k, filesize FROM checksums ORDER BY filename'
+        )
+        for filename, sha256sum, hash_8k, filesize in cursor:
+            yield filename, _row_to_data(sha256sum, hash_8k, filesize)
+
+
+def open_index(csv_file, build=False):
+    """
+    Open the index sidecar for a CSV file if it is current.
+
+    Args:
+        csv_file: Path to the CSV file
+        build: If True, create or refresh the index when it is missing or stale
+
+    Returns:
+        ChecksumIndex or None: None if there is no usable index
+    """
+    if not os.path.exists(csv_file):
+        return None
+    index_file = index_path(csv_file)
+    if not build and not os.path.exists(index_file):
+        return None
+
+    try:
+        index = ChecksumIndex(index_file)
+        if index.is_current(csv_file):
+            return index
+        if not build:
+            index.close()
+            return None
+        count = index.import_csv(csv_file)
+        print(f"Indexed {count} CSV entries: {index_file}")
+        return index
+    except (sqlite3.Error, OSError) as e:
+        print(f"Warning: Checksum index unavailable ({index_file}): {e}")
+        return None
+
+
+def refresh_index(csv_file):
+    """Re-import csv_file into its index sidecar if one already exists."""
+    if os.path.exists(index_path(csv_file)):
+        index = open_index(csv_file, build=True)
+        if index:
+            index.close()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3 or sys.argv[1] not in ('import', 'export', 'get'):
+        print(f"Usage: {sys.argv[0]} import <csv_file> [<index_file>]", file=sys.stderr)
+        print(f"       {sys.argv[0]} export <index_file> <csv_file>", file=sys.stderr)
+        print(f"       {sys.argv[0]} get <index_file> <filename> [<filename> ...]", file=sys.stderr)
+        sys.exit(1)
+
+    command = sys.argv[1]
+    if command == 'import':
+        csv_file = sys.argv[2]
+        target = sys.argv[3] if len(sys.argv) > 3 else index_path(csv_file)
+        with ChecksumIndex(target) as index:
+            print(f"Imported {index.import_csv(csv_file)} entries into {target}")
+    elif command == 'export':
+        if len(sys.argv) != 4:
+            print(f"Usage: {sys.argv[0]} export <index_file> <csv_file>", file=sys.stderr)
+            sys.exit(1)
+        with ChecksumIndex(sys.argv[2]) as index:
+            index.export_csv(sys.argv[3])
+            print(f"Exported {len(index)} entries to {sys.argv[3]}")
+    else:
+        with ChecksumIndex(sys.argv[2]) as index:
+            entries = index.lookup(sys.argv[3:])
+        for filename in sys.argv[3:]:
+            data = entries.get(filename)
+            if data is None:
+                print(f"{filename}: not found")
+            else:
+                print(f"{filename},{data['sha256sum']},{data['8k_sha256sum']},{data['filesize']}")
+        sys.exit(0 if len(entries) == len(sys.argv) - 3 else 1)
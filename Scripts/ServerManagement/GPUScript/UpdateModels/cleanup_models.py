@@ -23,6 +23,8 @@ import csv
 import subprocess
 from pathlib import Path
 
+from ssh_pool import run_scp, run_ssh
+
 
 def parse_remote_path(path):
     """
@@ -115,8 +117,8 @@ def download_target_csv(ssh_host, remote_path):
     local_temp = "/tmp/target-sha256-list-temp.csv"
 
     try:
-        result = subprocess.run(
-            ['scp', f'{ssh_host}:{csv_path}', local_temp],
+        result = run_scp(
+            f'{ssh_host}:{csv_path}', local_temp,
             capture_output=True,
             text=True
         )
@@ -140,8 +142,8 @@ def list_remote_files(ssh_host, remote_path):
         list: Sorted list of filenames
     """
     try:
-        result = subprocess.run(
-            ['ssh', ssh_host, f'find "{remote_path}" -maxdepth 1 -type f \\( -name "*.ckpt-tensordata" -o -name "*.ckpt" \\) -printf "%f\\n"'],
+        result = run_ssh(
+            ssh_host, f'find "{remote_path}" -maxdepth 1 -type f \\( -name "*.ckpt-tensordata" -o -name "*.ckpt" \\) -printf "%f\\n"',
             capture_output=True,
             text=True,
             check=True
@@ -185,8 +187,8 @@ def get_file_size(file_path, ssh_host=None, remote_base_path=None):
     try:
         if ssh_host:
             full_remote_path = f"{remote_base_path}/{file_path}"
-            result = subprocess.run(
-                ['ssh', ssh_host, f'stat -c %s "{full_remote_path}"'],
+            result = run_ssh(
+                ssh_host, f'stat -c %s "{full_remote_path}"',
                 capture_output=True,
                 text=True,
                 check=True
@@ -236,8 +238,8 @@ def remove_files_from_server(files_to_remove, ssh_host=None, remote_path=None, l
         if ssh_host:
             # Remote files - batch remove
             files_str = ' '.join([f'"{remote_path}/{f}"' for f in files_to_remove])
-            result = subprocess.run(
-                ['ssh', ssh_host, f'rm -f {files_str}'],
+            result = run_ssh(
+                ssh_host, f'rm -f {files_str}',
                 capture_output=True,
                 text=True
             )
@@ -294,8 +296,8 @@ def update_sha256_csv(files_to_remove, ssh_host=None, remote_path=None, local_di
             local_temp = "/tmp/sha256-list-temp.csv"
 
             # Download
-            result = subprocess.run(
-                ['scp', f'{ssh_host}:{csv_path}', local_temp],
+            result = run_scp(
+                f'{ssh_host}:{csv_path}', local_temp,
                 capture_output=True,
                 text=True
             )
@@ -327,8 +329,8 @@ def update_sha256_csv(files_to_remove, ssh_host=None, remote_path=None, local_di
                     writer.writerow([row.get('filename', ''), row.get('sha256sum', '')])
 
             # Upload
-            result = subprocess.run(
-                ['scp', local_temp, f'{ssh_host}:{csv_path}'],
+            result = run_scp(
+                local_temp, f'{ssh_host}:{csv_path}',
                 capture_output=True,
                 text=True
             )
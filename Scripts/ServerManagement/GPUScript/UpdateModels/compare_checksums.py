@@ -8,14 +8,33 @@ Supports three levels of integrity checking:
   L3: Full SHA256 hash (slowest but most thorough)
 
 CSV format: filename, sha256sum, 8k_sha256sum, filesize
+
+Python API (used in-process by sync_models_multi_server.py):
+  update_directory(dir_arg, level)       Update a local/remote sha256-list.csv
+  diff_checksums(csv1, csv2, level)      List of ChecksumDiff(level, filename, kind,
+                                         local_value, reference_value)
+  files_to_fix(diffs)                    Filenames missing or mismatched in csv1
 """
 
 import os
+import re
 import sys
 import csv
+import fcntl
+import importlib.util
+import io
+import json
+import socket
 import subprocess
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
 from pathlib import Path
 
+from checksum_index import open_index, refresh_index
+from hashing import ThroughputCounter, hash_files, sha256_file
+from ssh_pool import popen_ssh, run_scp, run_ssh
+
 
 # CSV column names
 CSV_COLUMNS = ['filename', 'sha256sum', '8k_sha256sum', 'filesize']
@@ -23,6 +42,17 @@ CSV_COLUMNS = ['filename', 'sha256sum', '8k_sha256sum', 'filesize']
 # Default remote script directory (where scripts are deployed on remote servers)
 DEFAULT_REMOTE_SCRIPTS_DIR = "/root/utils/UpdateModels"
 
+# Default number of files hashed in parallel for L3 (local threads / remote xargs)
+DEFAULT_L3_JOBS = 4
+
+# Valid journal values: a hex digest (hash fields) or an integer (filesize),
+# or one of the markers update_csv_with_level() stores for failed files
+SHA256_HEX_RE = re.compile(r'[0-9a-fA-F]{64}')
+JOURNAL_MARKERS = ('Error', 'ZeroSize')
+
+# 8k_hash.py loaded in-process for local L2 hashing (see _load_8k_hash_module)
+_8K_HASH_MODULE = None
+
 
 def parse_remote_path(path):
     """
@@ -55,8 +85,8 @@ def get_file_size(file_path, ssh_host=None, remote_base_path=None):
         if ssh_host:
             # Remote file - get size via SSH
             full_remote_path = f"{remote_base_path}/{file_path}"
-            result = subprocess.run(
-                ['ssh', ssh_host, f'stat -c %s "{full_remote_path}"'],
+            result = run_ssh(
+                ssh_host, f'stat -c %s "{full_remote_path}"',
                 capture_output=True,
                 text=True,
                 check=True
@@ -70,6 +100,18 @@ def get_file_size(file_path, ssh_host=None, remote_base_path=None):
         return -1
 
 
+def _load_8k_hash_module():
+    """Import 8k_hash.py from the script directory (its name is not a valid identifier)."""
+    global _8K_HASH_MODULE
+    if _8K_HASH_MODULE is None:
+        script_path = Path(__file__).parent / "8k_hash.py"
+        spec = importlib.util.spec_from_file_location("_8k_hash", script_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _8K_HASH_MODULE = module
+    return _8K_HASH_MODULE
+
+
 def calculate_8k_hash(file_path, ssh_host=None, remote_base_path=None, remote_scripts_dir=None):
     """
     Calculate SHA256 hash of first 4KB + last 4KB of a file.
@@ -89,33 +131,114 @@ def calculate_8k_hash(file_path, ssh_host=None, remote_base_path=None, remote_sc
             full_remote_path = f"{remote_base_path}/{file_path}"
             scripts_dir = remote_scripts_dir or DEFAULT_REMOTE_SCRIPTS_DIR
             script_path = f"{scripts_dir}/8k_hash.py"
-            result = subprocess.run(
-                ['ssh', ssh_host, f'python3 "{script_path}" "{full_remote_path}"'],
+            result = run_ssh(
+                ssh_host, f'python3 "{script_path}" "{full_remote_path}"',
                 capture_output=True,
                 text=True,
                 check=True
             )
             return result.stdout.strip()
         else:
-            # Local file - use 8k_hash.py script
-            script_dir = Path(__file__).parent
-            script_path = script_dir / "8k_hash.py"
-            result = subprocess.run(
-                ['python3', str(script_path), file_path],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            return result.stdout.strip()
+            # Local file - hash in-process with the same code as 8k_hash.py
+            return _load_8k_hash_module().compute_8k_hash(file_path)
 
     except (subprocess.CalledProcessError, OSError, ValueError) as e:
         print(f"Error calculating 8K hash for {file_path}: {e}")
         return "Error"
 
 
+def _collect_stderr(process):
+    """
+    Drain a process's stderr pipe in a thread, so it cannot fill up.
+
+    The lines are printed with _print_stderr() by the thread that started
+    the process: sync_models_multi_server.py routes sys.stderr per thread,
+    so they end up in that server's log instead of the terminal.
+
+    Returns:
+        tuple: (thread, lines) - join the thread before reading lines
+    """
+    lines = []
+
+    def drain():
+        for raw_line in process.stderr:
+            lines.append(os.fsdecode(raw_line.rstrip(b'\n')))
+
+    thread = threading.Thread(target=drain, daemon=True)
+    thread.start()
+    return thread, lines
+
+
+def _print_stderr(drain):
+    """Print the lines collected by _collect_stderr() to sys.stderr (current thread)."""
+    thread, lines = drain
+    thread.join()
+    for line in lines:
+        print(line, file=sys.stderr)
+
+
+def calculate_8k_hashes(filenames, directory=None, ssh_host=None, remote_base_path=None, remote_scripts_dir=None):
+    """
+    Calculate 8K hashes for many files, yielding results as they are computed.
+
+    Local files are hashed in-process. Remote files are hashed by a single
+    `8k_hash.py --batch` invocation over one SSH session for the directory,
+    with filenames sent NUL-separated on stdin.
+
+    Args:
+        filenames: List of filenames (relative to directory / remote_base_path)
+        directory: Local directory path (for local files)
+        ssh_host: SSH host (user@host) if calculating remotely
+        remote_base_path: Base path on remote system
+        remote_scripts_dir: Directory containing scripts on remote system (default: /root/utils/UpdateModels)
+
+    Yields:
+        tuple: (filename, value) where value is the hash or "Error"
+    """
+    if not filenames:
+        return
+
+    if not ssh_host:
+        for filename in filenames:
+            yield filename, calculate_8k_hash(os.path.join(directory, filename))
+        return
+
+    scripts_dir = remote_scripts_dir or DEFAULT_REMOTE_SCRIPTS_DIR
+    script_path = f"{scripts_dir}/8k_hash.py"
+    pending = set(filenames)
+    try:
+        process = popen_ssh(
+            ssh_host, f'cd "{remote_base_path}" && python3 "{script_path}" --batch -0',
+            input=b'\0'.join(os.fsencode(f) for f in filenames) + b'\0',
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        stderr = _collect_stderr(process)
+        for raw_line in process.stdout:
+            parts = os.fsdecode(raw_line.rstrip(b'\n')).split('\t', 2)
+            if len(parts) != 3 or parts[2] not in pending:
+                continue
+            value, _, filename = parts
+            pending.discard(filename)
+            yield filename, value
+        process.wait()
+        _print_stderr(stderr)
+    except OSError as e:
+        print(f"Error calculating 8K hashes on {ssh_host}: {e}")
+
+    # Anything the remote batch did not report is treated as a failure
+    for filename in filenames:
+        if filename in pending:
+            print(f"Error calculating 8K hash for {filename}: no result from remote batch")
+            yield filename, "Error"
+
+
 def calculate_sha256(file_path, ssh_host=None, remote_base_path=None):
     """
-    Calculate full SHA256 checksum of a file using sha256sum command.
+    Calculate full SHA256 checksum of a file.
+
+    Local files are hashed in-process with hashing.sha256_file; remote files
+    with the sha256sum command over SSH.
 
     Args:
         file_path: Local file path or just filename if remote
@@ -129,23 +252,17 @@ def calculate_sha256(file_path, ssh_host=None, remote_base_path=None):
         if ssh_host:
             # Remote file - run sha256sum via SSH
             full_remote_path = f"{remote_base_path}/{file_path}"
-            result = subprocess.run(
-                ['ssh', ssh_host, f'sha256sum "{full_remote_path}"'],
+            result = run_ssh(
+                ssh_host, f'sha256sum "{full_remote_path}"',
                 capture_output=True,
                 text=True,
                 check=True
             )
+            # sha256sum output format: "<hash>  <filename>"
+            return result.stdout.split()[0]
         else:
             # Local file
-            result = subprocess.run(
-                ['sha256sum', file_path],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-        # sha256sum output format: "<hash>  <filename>"
-        sha256_hash = result.stdout.split()[0]
-        return sha256_hash
+            return sha256_file(file_path)
     except subprocess.CalledProcessError as e:
         print(f"Error calculating SHA256 for {file_path}: {e}")
         stderr_msg = e.stderr if hasattr(e, 'stderr') and e.stderr else 'N/A'
@@ -156,6 +273,103 @@ def calculate_sha256(file_path, ssh_host=None, remote_base_path=None):
         return "Error"
 
 
+def calculate_sha256_local_batch(filenames, directory, jobs=None, counter=None):
+    """
+    Calculate full SHA256 checksums for many local files on a thread pool.
+
+    Args:
+        filenames: List of filenames relative to directory
+        directory: Local directory path
+        jobs: Number of files hashed concurrently (default: DEFAULT_L3_JOBS)
+        counter: Optional ThroughputCounter for the bytes read
+
+    Yields:
+        tuple: (filename, value) where value is the hash or "Error"
+    """
+    paths = {os.path.join(directory, f): f for f in filenames}
+    jobs = max(1, jobs or DEFAULT_L3_JOBS)
+    for path, digest, error in hash_files(paths, jobs, counter=counter):
+        if error:
+            print(f"Error calculating SHA256 for {path}: {error}")
+            yield paths[path], "Error"
+        else:
+            yield paths[path], digest
+
+
+def _parse_sha256sum_line(line):
+    """
+    Parse one line of sha256sum output into (hash, filename).
+
+    sha256sum prefixes the line with a backslash and escapes the name when
+    it contains a backslash or newline.
+    """
+    escaped = line.startswith('\\')
+    if escaped:
+        line = line[1:]
+    parts = line.split('  ', 1)
+    if len(parts) != 2:
+        parts = line.split(' *', 1)
+    if len(parts) != 2:
+        return None, None
+    sha256_hash, filename = parts
+    if escaped:
+        filename = re.sub(r'\\(.)', lambda m: '\n' if m.group(1) == 'n' else m.group(1), filename)
+    return sha256_hash, filename
+
+
+def calculate_sha256_batch(filenames, ssh_host, remote_base_path, jobs=None):
+    """
+    Calculate full SHA256 checksums for many remote files in one SSH session.
+
+    Filenames are sent NUL-separated on stdin and hashed on the remote side by
+    `xargs -P <jobs> sha256sum`, so several files are read in parallel. Each
+    result is yielded as soon as its sha256sum process finishes.
+
+    Args:
+        filenames: List of filenames relative to remote_base_path
+        ssh_host: SSH host (user@host)
+        remote_base_path: Base path on remote system
+        jobs: Number of parallel sha256sum workers (default: DEFAULT_L3_JOBS)
+
+    Yields:
+        tuple: (filename, value) where value is the hash or "Error"
+    """
+    if not filenames:
+        return
+
+    jobs = max(1, jobs or DEFAULT_L3_JOBS)
+    pending = set(filenames)
+    payload = b''.join(os.fsencode(f) + b'\0' for f in filenames)
+
+    try:
+        # The list is spooled on the server before xargs starts, so sending
+        # it all up front cannot deadlock against the output pipe
+        process = popen_ssh(
+            ssh_host, f'cd "{remote_base_path}" && xargs -0 -r -n 1 -P {jobs} sha256sum --',
+            input=payload,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        stderr = _collect_stderr(process)
+
+        for raw_line in process.stdout:
+            sha256_hash, filename = _parse_sha256sum_line(os.fsdecode(raw_line.rstrip(b'\n')))
+            if filename not in pending:
+                continue
+            pending.discard(filename)
+            yield filename, sha256_hash
+        process.wait()
+        _print_stderr(stderr)
+    except OSError as e:
+        print(f"Error calculating SHA256 on {ssh_host}: {e}")
+
+    # Files sha256sum could not read only show up on stderr
+    for filename in filenames:
+        if filename in pending:
+            print(f"Error calculating SHA256 for {filename}: no result from remote batch")
+            yield filename, "Error"
+
+
 def remove_files(file_list, directory=None, ssh_host=None, remote_base_path=None):
     """
     Remove multiple files in batch (local or remote).
@@ -177,8 +391,8 @@ def remove_files(file_list, directory=None, ssh_host=None, remote_base_path=None
         if ssh_host:
             # Remote files - build rm command with all files
             files_to_remove = ' '.join([f'"{remote_base_path}/{f}"' for f in file_list])
-            subprocess.run(
-                ['ssh', ssh_host, f'rm -f {files_to_remove}'],
+            run_ssh(
+                ssh_host, f'rm -f {files_to_remove}',
                 capture_output=True,
                 text=True,
                 check=True
@@ -213,18 +427,138 @@ def list_remote_files(ssh_host, remote_path):
     Returns:
         list: Sorted list of filenames
     """
-    try:
-        result = subprocess.run(
-            ['ssh', ssh_host, f'find "{remote_path}" -maxdepth 1 -type f \\( -name "*.ckpt-tensordata" -o -name "*.ckpt" \\) -printf "%f\\n"'],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        files = [f.strip() for f in result.stdout.strip().split('\n') if f.strip()]
-        return sorted(files)
-    except subprocess.CalledProcessError as e:
-        print(f"Error listing remote files: {e}")
+    file_stats = get_file_stats(ssh_host=ssh_host, remote_path=remote_path)
+    if file_stats is None:
+        print(f"Error listing remote files in {ssh_host}:{remote_path}")
         return []
+    return sorted(file_stats)
+
+
+def _parse_find_mtime_ns(value):
+    """Convert find's %T@ output (seconds with a fractional part) to integer nanoseconds."""
+    seconds, _, fraction = value.partition('.')
+    return int(seconds) * 1_000_000_000 + int((fraction + '000000000')[:9])
+
+
+def get_file_stats(directory=None, ssh_host=None, remote_path=None):
+    """
+    Collect (inode, size, mtime_ns) for every .ckpt-tensordata and .ckpt file.
+
+    This is the directory inventory: remote directories are listed with a
+    single `find -printf` over SSH, which returns the file list, the L1 sizes
+    and the stat cache keys in one round trip.
+
+    Args:
+        directory: Local directory path (for local files)
+        ssh_host: SSH host (user@host) if listing remotely
+        remote_path: Path on remote system
+
+    Returns:
+        dict: {filename: (inode, size, mtime_ns)}, or None if listing failed
+    """
+    stats = {}
+    try:
+        if ssh_host:
+            result = run_ssh(
+                ssh_host, f'find "{remote_path}" -maxdepth 1 -type f \\( -name "*.ckpt-tensordata" -o -name "*.ckpt" \\) -printf "%i\\t%s\\t%T@\\t%f\\n"',
+                capture_output=True,
+                text=True,
+                check=True
+            )
+            for line in result.stdout.splitlines():
+                parts = line.split('\t', 3)
+                if len(parts) != 4:
+                    continue
+                inode, size, mtime, filename = parts
+                stats[filename] = (int(inode), int(size), _parse_find_mtime_ns(mtime))
+        else:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if not (entry.name.endswith('.ckpt-tensordata') or entry.name.endswith('.ckpt')):
+                        continue
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                    stats[entry.name] = (st.st_ino, st.st_size, st.st_mtime_ns)
+    except (subprocess.CalledProcessError, ValueError, OSError) as e:
+        print(f"Error collecting file stats: {e}")
+        return None
+    return stats
+
+
+def stat_cache_path(csv_file):
+    """Path of the stat cache sidecar for a CSV file (sha256-list.csv -> sha256-list.statcache.json)."""
+    base, _ = os.path.splitext(csv_file)
+    return f"{base}.statcache.json"
+
+
+def load_stat_cache(csv_file):
+    """
+    Load the stat cache for a CSV file.
+
+    The cache records, per file and per CSV field, the (inode, size, mtime_ns)
+    the file had when that field was computed.
+
+    Returns:
+        dict: {filename: {field: [inode, size, mtime_ns]}}
+    """
+    cache_file = stat_cache_path(csv_file)
+    if not os.path.exists(cache_file):
+        return {}
+    try:
+        with open(cache_file, 'r') as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError) as e:
+        print(f"Warning: Ignoring unreadable stat cache {cache_file}: {e}")
+        return {}
+
+
+def save_stat_cache(csv_file, cache):
+    """Atomically write the stat cache for a CSV file."""
+    cache_file = stat_cache_path(csv_file)
+    temp_file = f"{cache_file}.tmp"
+    try:
+        with open(temp_file, 'w') as f:
+            json.dump(cache, f, separators=(',', ':'), sort_keys=True)
+        os.replace(temp_file, cache_file)
+    except OSError as e:
+        print(f"Warning: Could not write stat cache {cache_file}: {e}")
+
+
+def _parse_csv_row(row):
+    """
+    Normalize one csv.DictReader row.
+
+    Returns:
+        tuple or None: (filename, {'sha256sum': str, '8k_sha256sum': str, 'filesize': int}),
+                       or None for blank rows and rows without a filename
+    """
+    if not row:
+        return None
+    filename = (row.get('filename', '') or '').strip()
+    if not filename:
+        return None
+
+    data = {
+        'sha256sum': (row.get('sha256sum', '') or '').strip(),
+        '8k_sha256sum': (row.get('8k_sha256sum', '') or '').strip(),
+        'filesize': row.get('filesize', '').strip() if row.get('filesize') else ''
+    }
+    # Convert filesize to int if present
+    if data['filesize']:
+        try:
+            data['filesize'] = int(data['filesize'])
+        except ValueError:
+            data['filesize'] = ''
+    return filename, data
+
+
+def _open_csv_reader(f):
+    reader = csv.DictReader(f)
+    if reader.fieldnames:
+        reader.fieldnames = [name.strip() for name in reader.fieldnames]
+    return reader
 
 
 def read_csv(csv_file):
@@ -237,39 +571,116 @@ def read_csv(csv_file):
     checksums = {}
     if os.path.exists(csv_file):
         with open(csv_file, 'r', newline='') as f:
-            reader = csv.DictReader(f)
-            if reader.fieldnames:
-                reader.fieldnames = [name.strip() for name in reader.fieldnames]
-            for row in reader:
-                if not row:
-                    continue
-                filename = (row.get('filename', '') or '').strip()
-                if not filename:
-                    continue
-
-                checksums[filename] = {
-                    'sha256sum': (row.get('sha256sum', '') or '').strip(),
-                    '8k_sha256sum': (row.get('8k_sha256sum', '') or '').strip(),
-                    'filesize': row.get('filesize', '').strip() if row.get('filesize') else ''
-                }
-                # Convert filesize to int if present
-                if checksums[filename]['filesize']:
-                    try:
-                        checksums[filename]['filesize'] = int(checksums[filename]['filesize'])
-                    except ValueError:
-                        checksums[filename]['filesize'] = ''
+            for row in _open_csv_reader(f):
+                parsed = _parse_csv_row(row)
+                if parsed:
+                    checksums[parsed[0]] = parsed[1]
     return checksums
 
 
+class UnsortedCSVError(ValueError):
+    """Raised by iter_csv_rows() when filenames are not strictly increasing."""
+
+
+def iter_csv_rows(csv_file):
+    """
+    Stream CSV entries in file order without loading the whole file.
+
+    write_csv() always emits rows sorted by filename, so a well-formed file
+    yields strictly increasing filenames. A missing file yields nothing.
+
+    Yields:
+        tuple: (filename, {'sha256sum': str, '8k_sha256sum': str, 'filesize': int})
+
+    Raises:
+        UnsortedCSVError: If a filename is not greater than the previous one
+                          (out of order or duplicated)
+    """
+    if not os.path.exists(csv_file):
+        return
+    previous = None
+    with open(csv_file, 'r', newline='') as f:
+        for row in _open_csv_reader(f):
+            parsed = _parse_csv_row(row)
+            if not parsed:
+                continue
+            if previous is not None and parsed[0] <= previous:
+                raise UnsortedCSVError(f"{csv_file} is not sorted ('{parsed[0]}' after '{previous}')")
+            previous = parsed[0]
+            yield parsed
+
+
+def iter_checksum_rows(csv_file):
+    """
+    Stream entries of a checksum CSV in filename order.
+
+    Uses the SQLite index sidecar when it is current (already ordered by its
+    primary key), otherwise iter_csv_rows().
+    """
+    index = open_index(csv_file)
+    if index is None:
+        yield from iter_csv_rows(csv_file)
+        return
+    try:
+        yield from index.iter_rows()
+    finally:
+        index.close()
+
+
+def merge_join_checksums(csv_file1, csv_file2):
+    """
+    Sorted merge-join of two checksum CSVs.
+
+    Both inputs are streamed once in filename order, so memory use does not
+    grow with the number of entries.
+
+    Yields:
+        tuple: (filename, data1, data2) for the sorted union of filenames;
+               data1/data2 is {} when the file is absent from that CSV
+
+    Raises:
+        UnsortedCSVError: If either CSV is not sorted by filename
+    """
+    rows1 = iter_checksum_rows(csv_file1)
+    rows2 = iter_checksum_rows(csv_file2)
+    row1 = next(rows1, None)
+    row2 = next(rows2, None)
+
+    while row1 is not None or row2 is not None:
+        if row2 is None or (row1 is not None and row1[0] < row2[0]):
+            yield row1[0], row1[1], {}
+            row1 = next(rows1, None)
+        elif row1 is None or row2[0] < row1[0]:
+            yield row2[0], {}, row2[1]
+            row2 = next(rows2, None)
+        else:
+            yield row1[0], row1[1], row2[1]
+            row1 = next(rows1, None)
+            row2 = next(rows2, None)
+
+
+def _dict_join_checksums(csv_file1, csv_file2):
+    """In-memory equivalent of merge_join_checksums() for unsorted CSVs."""
+    checksums1 = read_csv(csv_file1)
+    checksums2 = read_csv(csv_file2)
+    for filename in sorted(set(checksums1.keys()) | set(checksums2.keys())):
+        yield filename, checksums1.get(filename, {}), checksums2.get(filename, {})
+
+
 def write_csv(csv_file, checksums):
     """
     Write checksums dictionary to CSV file.
 
+    The file is written to a temporary name unique to this host and process,
+    fsynced and renamed over the original, so a crash never leaves a
+    truncated CSV behind and concurrent writers never share a temp file.
+
     Args:
         csv_file: Path to CSV file
         checksums: dict {filename: {'sha256sum': str, '8k_sha256sum': str, 'filesize': int}}
     """
-    with open(csv_file, 'w', newline='') as f:
+    temp_file = f"{csv_file}.{socket.gethostname()}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_file, 'w', newline='') as f:
         writer = csv.writer(f)
         writer.writerow(CSV_COLUMNS)
         for filename in sorted(checksums.keys()):
@@ -283,9 +694,253 @@ def write_csv(csv_file, checksums):
                 data.get('8k_sha256sum', ''),
                 filesize
             ])
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_file, csv_file)
+
+
+def journal_path(csv_file):
+    """Path of the append-only checkpoint journal of local update_csv_with_level() runs."""
+    return f"{csv_file}.journal"
+
+
+def sync_journal_path(csv_file):
+    """Path of the journal sync_models_multi_server.py appends verified downloads to."""
+    return f"{csv_file}.sync-journal"
+
+
+@contextmanager
+def csv_lock(csv_file):
+    """
+    Hold an exclusive flock on {csv_file}.lock.
+
+    Taken around every read-modify-write of the CSV that must not interleave
+    with a journal compaction (compact_journal() and the final write of
+    update_csv_with_level()).
+    """
+    with open(f"{csv_file}.lock", 'a') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def format_journal(rows):
+    """
+    Journal lines for (filename, field, value) rows.
+
+    Lines are CSV records quoted like write_csv() does, ending in a
+    newline, so filenames with commas or quotes survive the round trip.
+
+    Returns:
+        str: The lines
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator='\n').writerows(rows)
+    return buffer.getvalue()
 
 
-def update_csv_with_level(directory, csv_file, level, dry_run=False, ssh_host=None, remote_path=None, force=False, specific_files=None, remote_scripts_dir=None):
+def append_journal(journal, filename, field, value):
+    """
+    Append one completed value to an open journal and fsync it.
+
+    Each line is a CSV record: filename, field, value.
+    """
+    if isinstance(value, int):
+        value = str(value)
+    journal.write(format_journal([(filename, field, value)]))
+    journal.flush()
+    os.fsync(journal.fileno())
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _claim_journals(csv_file, journals):
+    """
+    Claim journals for folding (csv_lock() held).
+
+    Each journal is renamed to {journal}.{host}.{pid}.{token}.claimed, so values
+    appended meanwhile go to a new journal. A journal still flocked by the
+    update_csv_with_level() run writing it is left alone (that run folds its
+    values itself). Claims left by an interrupted compaction are taken over
+    if they belong to this process or to a dead process on this host;
+    claims of live processes are left alone.
+
+    Args:
+        csv_file: CSV the journals belong to
+        journals: Journal paths to claim (journal_path() and/or sync_journal_path())
+
+    Returns:
+        list: Claimed files, oldest first
+    """
+    hostname, pid = socket.gethostname(), os.getpid()
+    claimed = []
+    for journal_file in journals:
+        directory = os.path.dirname(journal_file) or '.'
+        prefix = os.path.basename(journal_file) + '.'
+        for name in os.listdir(directory):
+            if not (name.startswith(prefix) and name.endswith('.claimed')):
+                continue
+            owner = name[len(prefix):-len('.claimed')].rsplit('.', 2)
+            if len(owner) != 3 or owner[0] != hostname or not owner[1].isdigit():
+                continue
+            if int(owner[1]) == pid or not _pid_alive(int(owner[1])):
+                claimed.append(os.path.join(directory, name))
+        try:
+            with open(journal_file, 'r') as f:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                own_claim = f"{journal_file}.{hostname}.{pid}.{os.urandom(4).hex()}.claimed"
+                os.replace(journal_file, own_claim)
+                claimed.append(own_claim)
+        except FileNotFoundError:
+            pass
+        except BlockingIOError:
+            pass  # Written by a live run
+
+    def age(path):
+        try:
+            return os.path.getmtime(path)
+        except FileNotFoundError:
+            return 0
+    return sorted(claimed, key=age)
+
+
+def _fold_journal(claimed_file, checksums):
+    """
+    Apply the complete, valid lines of a journal to checksums.
+
+    A last line without its newline (a torn append) is skipped, as are
+    values that are not a 64-character hex digest (hash fields), an
+    integer (filesize) or a JOURNAL_MARKERS value; an empty value clears
+    the field.
+
+    Returns:
+        int: Number of values applied
+    """
+    try:
+        with open(claimed_file, 'r', newline='') as f:
+            content = f.read()
+    except FileNotFoundError:
+        return 0
+    lines = content.split('\n')
+    lines.pop()  # Empty after the final newline, or a torn last line
+
+    applied = 0
+    for row in csv.reader(lines):
+        if len(row) != 3 or row[1] not in CSV_COLUMNS[1:]:
+            continue
+        filename, field, value = row
+        if value and value not in JOURNAL_MARKERS:
+            if field == 'filesize':
+                if not value.isdigit():
+                    continue
+                value = int(value)
+            elif not SHA256_HEX_RE.fullmatch(value):
+                continue
+        entry = checksums.setdefault(filename, {'sha256sum': '', '8k_sha256sum': '', 'filesize': ''})
+        entry[field] = value
+        applied += 1
+    return applied
+
+
+def _remove_claims(claimed):
+    for claimed_file in claimed:
+        try:
+            os.remove(claimed_file)
+        except FileNotFoundError:
+            pass  # Already applied and removed
+
+
+def compact_journal(csv_file):
+    """
+    Fold the journals of a CSV into it and remove them.
+
+    Folds the local checkpoint journal, which survives when a previous
+    update_csv_with_level() run was interrupted before its final write, and
+    the sync journal of verified downloads appended by
+    sync_models_multi_server.py (see the compact mode). Claim, read, fold,
+    write and removal all happen under csv_lock(), so overlapping
+    compactions and local runs cannot overwrite each other's results.
+
+    Returns:
+        int: Number of journal entries applied
+    """
+    with csv_lock(csv_file):
+        claimed = _claim_journals(csv_file, [journal_path(csv_file), sync_journal_path(csv_file)])
+        if not claimed:
+            return 0
+
+        checksums = read_csv(csv_file)
+        applied = sum(_fold_journal(claimed_file, checksums) for claimed_file in claimed)
+        write_csv(csv_file, checksums)
+        _remove_claims(claimed)
+    print(f"Applied {applied} value(s) from journal: {csv_file}")
+    return applied
+
+
+def _merge_concurrent_changes(checksums, initial, current):
+    """
+    Take values another process wrote to the CSV since it was read.
+
+    Fields whose on-disk value differs from the value read at the start
+    (initial) were changed by a compaction of verified downloads, which is
+    newer than what this run computed; entries that appeared meanwhile are
+    added. Entries this run removed stay removed.
+    """
+    for filename, entry in current.items():
+        before = initial.get(filename)
+        if before is None:
+            if filename not in checksums:
+                checksums[filename] = dict(entry)
+            continue
+        if filename not in checksums:
+            continue
+        for field in CSV_COLUMNS[1:]:
+            if entry.get(field) != before.get(field):
+                checksums[filename][field] = entry.get(field)
+
+
+def iter_level_values(level, filenames, directory=None, ssh_host=None, remote_path=None, remote_scripts_dir=None, jobs=None, counter=None, file_stats=None):
+    """
+    Compute the value of the given level for each file.
+
+    L2 is computed in one batch (in-process locally, one SSH session
+    remotely). L3 hashes `jobs` files in parallel (a local thread pool, or
+    one SSH session running parallel workers). L1 sizes are taken from the
+    file_stats inventory when given, otherwise stat'ed file by file.
+
+    Yields:
+        tuple: (filename, value) in completion order
+    """
+    if level == 'L2':
+        yield from calculate_8k_hashes(filenames, directory, ssh_host, remote_path, remote_scripts_dir)
+        return
+    if level == 'L3':
+        if ssh_host:
+            yield from calculate_sha256_batch(filenames, ssh_host, remote_path, jobs)
+        else:
+            yield from calculate_sha256_local_batch(filenames, directory, jobs, counter)
+        return
+
+    for filename in filenames:
+        if file_stats and filename in file_stats:
+            yield filename, file_stats[filename][1]
+        elif ssh_host:
+            yield filename, get_file_size(filename, ssh_host, remote_path)
+        else:
+            yield filename, get_file_size(os.path.join(directory, filename))
+
+
+def update_csv_with_level(directory, csv_file, level, dry_run=False, ssh_host=None, remote_path=None, force=False, specific_files=None, remote_scripts_dir=None, jobs=None, use_stat_cache=True):
     """
     Update CSV file with checksums at the specified level.
 
@@ -299,6 +954,9 @@ def update_csv_with_level(directory, csv_file, level, dry_run=False, ssh_host=No
         force: If True, recalculate even if value already exists
         specific_files: List of specific filenames to update (if None, process all files)
         remote_scripts_dir: Directory containing scripts on remote system (default: /root/utils/UpdateModels)
+        jobs: Number of files hashed in parallel for L3 (default: DEFAULT_L3_JOBS)
+        use_stat_cache: If True, record each file's (inode, size, mtime_ns) when a
+            value is computed, and in force mode skip files whose stat is unchanged
     """
     display_path = f"{ssh_host}:{remote_path}" if ssh_host else directory
     print(f"\n=== Processing directory: {display_path} ===")
@@ -310,29 +968,33 @@ def update_csv_with_level(directory, csv_file, level, dry_run=False, ssh_host=No
     if specific_files:
         print(f"(SPECIFIC FILES MODE: Processing {len(specific_files)} file(s))")
 
-    # Read existing CSV data
+    # Recover values checkpointed by an interrupted run before reading
+    if not ssh_host and not dry_run:
+        compact_journal(csv_file)
+
+    # Read existing CSV data (initial: to keep changes made meanwhile, see below)
     checksums = read_csv(csv_file)
+    initial = {filename: dict(entry) for filename, entry in checksums.items()} if not ssh_host else None
     csv_entry_count = len(checksums)
 
-    # Get all .ckpt-tensordata and .ckpt files in directory
-    if ssh_host:
-        tensordata_files = list_remote_files(ssh_host, remote_path)
-    else:
-        tensordata_files = sorted([
-            f for f in os.listdir(directory)
-            if (f.endswith('.ckpt-tensordata') or f.endswith('.ckpt')) and os.path.isfile(os.path.join(directory, f))
-        ])
+    # Inventory of all .ckpt-tensordata and .ckpt files in directory: one
+    # listing provides the file names, L1 sizes and stat cache keys
+    file_stats = get_file_stats(directory, ssh_host, remote_path)
+    if file_stats is None:
+        print(f"Error: Could not list files in {display_path}")
+        return checksums
+    tensordata_files = sorted(file_stats)
 
     # If specific files are requested, filter to only those files
     if specific_files:
         # Validate that specified files exist in the directory
-        missing_files = [f for f in specific_files if f not in tensordata_files]
+        missing_files = [f for f in specific_files if f not in file_stats]
         if missing_files:
             print(f"\nWarning: The following files were not found in directory:")
             for f in missing_files:
                 print(f"  - {f}")
         # Filter to only the specified files that exist
-        tensordata_files = [f for f in specific_files if f in tensordata_files]
+        tensordata_files = [f for f in specific_files if f in file_stats]
         if not tensordata_files:
             print("Error: None of the specified files were found in the directory")
             return checksums
@@ -355,9 +1017,20 @@ def update_csv_with_level(directory, csv_file, level, dry_run=False, ssh_host=No
     else:  # L3
         field = 'sha256sum'
 
+    # Stat recorded when each value was computed
+    stat_cache = load_stat_cache(csv_file) if use_stat_cache else {}
+
     # Count files that need processing
     if force:
         files_to_process = tensordata_files
+        if use_stat_cache:
+            # Only rehash files whose stat changed since the value was computed
+            files_to_process = [
+                f for f in tensordata_files
+                if not checksums[f].get(field)
+                or stat_cache.get(f, {}).get(field) != list(file_stats[f])
+            ]
+            print(f"  Unchanged (stat cache):     {len(tensordata_files) - len(files_to_process)}")
     else:
         files_to_process = [f for f in tensordata_files if not checksums[f].get(field)]
 
@@ -377,23 +1050,20 @@ def update_csv_with_level(directory, csv_file, level, dry_run=False, ssh_host=No
     # Process files
     files_to_remove = []
     updated = False
+    counter = ThroughputCounter()
 
-    for i, filename in enumerate(files_to_process):
-        if ssh_host:
-            file_ref = filename
-        else:
-            file_ref = os.path.join(directory, filename)
+    # Checkpoint each completed value to an append-only journal (for
+    # recovery); it is folded into the CSV by the final write below. The
+    # flock keeps compactions from claiming it while this run is alive
+    journal = open(journal_path(csv_file), 'a', newline='') if not ssh_host else None
+    if journal:
+        fcntl.flock(journal.fileno(), fcntl.LOCK_EX)
 
+    for i, (filename, value) in enumerate(iter_level_values(level, files_to_process, directory, ssh_host, remote_path, remote_scripts_dir, jobs, counter, file_stats)):
         # Progress indicator
         print(f"[{i+1}/{len(files_to_process)}] Processing: {filename}")
 
         if level == 'L1':
-            # Get file size
-            if ssh_host:
-                value = get_file_size(filename, ssh_host, remote_path)
-            else:
-                value = get_file_size(file_ref)
-
             if value == 0:
                 print(f"  Zero-size file detected")
                 files_to_remove.append(filename)
@@ -409,12 +1079,6 @@ def update_csv_with_level(directory, csv_file, level, dry_run=False, ssh_host=No
             print(f"  -> {value} bytes")
 
         elif level == 'L2':
-            # Calculate 8K hash
-            if ssh_host:
-                value = calculate_8k_hash(filename, ssh_host, remote_path, remote_scripts_dir)
-            else:
-                value = calculate_8k_hash(file_ref)
-
             if value == "Error":
                 print(f"  8K hash calculation failed")
                 files_to_remove.append(filename)
@@ -423,12 +1087,6 @@ def update_csv_with_level(directory, csv_file, level, dry_run=False, ssh_host=No
             print(f"  -> {value[:16]}..." if len(value) > 16 else f"  -> {value}")
 
         else:  # L3
-            # Calculate full SHA256
-            if ssh_host:
-                value = calculate_sha256(filename, ssh_host, remote_path)
-            else:
-                value = calculate_sha256(file_ref)
-
             if value == "Error":
                 print(f"  SHA256 calculation failed")
                 files_to_remove.append(filename)
@@ -437,10 +1095,15 @@ def update_csv_with_level(directory, csv_file, level, dry_run=False, ssh_host=No
             print(f"  -> {value[:16]}..." if len(value) > 16 else f"  -> {value}")
 
         updated = True
+        if use_stat_cache and filename not in files_to_remove:
+            stat_cache.setdefault(filename, {})[field] = list(file_stats[filename])
 
-        # Save CSV after each file (for recovery)
-        if not ssh_host:
-            write_csv(csv_file, checksums)
+        # Checkpoint this value (for recovery)
+        if journal:
+            append_journal(journal, filename, field, checksums[filename][field])
+
+    if counter.total_files:
+        print(f"Hashed {counter.summary()}")
 
     # Remove corrupted files
     if files_to_remove:
@@ -453,9 +1116,29 @@ def update_csv_with_level(directory, csv_file, level, dry_run=False, ssh_host=No
 
         for f in files_to_remove:
             del checksums[f]
-
-    # Write final CSV
-    write_csv(csv_file, checksums)
+            stat_cache.pop(f, None)
+
+    if journal:
+        # Write the final CSV under the lock, keeping the values compacted by
+        # others meanwhile and folding in the sync journal, then drop our
+        # journal (still flocked, so nobody else claimed it)
+        with csv_lock(csv_file):
+            _merge_concurrent_changes(checksums, initial, read_csv(csv_file))
+            claimed = _claim_journals(csv_file, [sync_journal_path(csv_file)])
+            for claimed_file in claimed:
+                _fold_journal(claimed_file, checksums)
+            write_csv(csv_file, checksums)
+            _remove_claims(claimed)
+            os.remove(journal_path(csv_file))
+        journal.close()
+    else:
+        write_csv(csv_file, checksums)
+    refresh_index(csv_file)
+    if use_stat_cache:
+        # Forget files that no longer exist so stale entries never match
+        for f in [f for f in stat_cache if f not in file_stats]:
+            del stat_cache[f]
+        save_stat_cache(csv_file, stat_cache)
 
     if updated:
         print(f"Updated CSV file: {csv_file}")
@@ -465,65 +1148,162 @@ def update_csv_with_level(directory, csv_file, level, dry_run=False, ssh_host=No
     return checksums
 
 
-def compare_checksums_all_levels(csv_file1, csv_file2, verbose=False):
-    """
-    Compare two CSV files at all levels (L1, L2, L3).
+# Comparison level -> (CSV field, label)
+LEVEL_FIELDS = {
+    'L1': ('filesize', 'file size'),
+    'L2': ('8k_sha256sum', '8K hash'),
+    'L3': ('sha256sum', 'SHA256'),
+}
 
-    Args:
-        csv_file1: First CSV file (typically from server being checked)
-        csv_file2: Second CSV file (source of truth)
-        verbose: If True, show detailed output
+# Files listed in the verbose "not computed in either file" section
+MISSING_IN_BOTH_SAMPLE = 10
 
-    Returns:
-        bool: True if differences found at any level
-    """
-    checksums1 = read_csv(csv_file1)
-    checksums2 = read_csv(csv_file2)
-
-    levels_config = [
-        ('L1', 'filesize', 'file size'),
-        ('L2', '8k_sha256sum', '8K hash'),
-        ('L3', 'sha256sum', 'SHA256'),
-    ]
+# One difference between a checked CSV and the source of truth at one level.
+#   kind: 'missing'  - no value in the checked CSV (file must be downloaded)
+#         'mismatch' - both have a value and they differ
+#         'extra'    - value only in the checked CSV (not in source of truth)
+#   local_value / reference_value: the values as strings ('' when absent)
+ChecksumDiff = namedtuple('ChecksumDiff', ['level', 'filename', 'kind', 'local_value', 'reference_value'])
 
-    all_files = sorted(set(checksums1.keys()) | set(checksums2.keys()))
-    all_diff_files = set()
-    level_results = {}
 
-    for level_name, field, field_label in levels_config:
-        files_to_download = []
-        files_with_mismatch = []
-        missing_in_source = []
+def _classify_rows(joined_rows, levels):
+    """
+    Classify joined rows at several levels in a single pass.
 
-        for filename in all_files:
-            data1 = checksums1.get(filename, {})
-            data2 = checksums2.get(filename, {})
+    Args:
+        joined_rows: Iterable of (filename, data1, data2) in filename order
+        levels: Level names to compare (keys of LEVEL_FIELDS)
 
+    Returns:
+        tuple: (level_results, diff_files) where level_results maps each level to
+               its 'to_download', 'mismatch', 'missing_in_source' lists of
+               ChecksumDiff and the 'missing_in_both' count/sample, and diff_files lists (in order) the
+               files missing or mismatched at any level
+    """
+    level_results = {
+        level: {
+            'field_label': LEVEL_FIELDS[level][1],
+            'to_download': [],
+            'mismatch': [],
+            'missing_in_source': [],
+            'missing_in_both': 0,
+            'missing_in_both_sample': [],
+            'diff_count': 0
+        }
+        for level in levels
+    }
+    fields = [(level, level_results[level], LEVEL_FIELDS[level][0]) for level in levels]
+    diff_files = []
+
+    for filename, data1, data2 in joined_rows:
+        is_diff = False
+        for level, result, field in fields:
             val1 = data1.get(field, '')
             val2 = data2.get(field, '')
 
+            # Convert to string for comparison
             val1_str = str(val1) if val1 else ''
             val2_str = str(val2) if val2 else ''
 
             if not val1_str and not val2_str:
-                pass  # Field missing in both, skip
+                # Field missing in both
+                result['missing_in_both'] += 1
+                if len(result['missing_in_both_sample']) < MISSING_IN_BOTH_SAMPLE:
+                    result['missing_in_both_sample'].append(filename)
             elif not val1_str:
-                files_to_download.append(filename)
+                # Missing in first file - need to download from source
+                result['to_download'].append(ChecksumDiff(level, filename, 'missing', val1_str, val2_str))
+                result['diff_count'] += 1
+                is_diff = True
             elif not val2_str:
-                missing_in_source.append(filename)
+                # Missing in source of truth
+                result['missing_in_source'].append(ChecksumDiff(level, filename, 'extra', val1_str, val2_str))
             elif val1_str != val2_str:
-                files_with_mismatch.append((filename, val1_str, val2_str))
-
-        diff_files = set(files_to_download + [f for f, _, _ in files_with_mismatch])
-        all_diff_files.update(diff_files)
-        level_results[level_name] = {
-            'field_label': field_label,
-            'to_download': files_to_download,
-            'mismatch': files_with_mismatch,
-            'missing_in_source': missing_in_source,
-            'diff_count': len(diff_files)
-        }
+                # Values don't match
+                result['mismatch'].append(ChecksumDiff(level, filename, 'mismatch', val1_str, val2_str))
+                result['diff_count'] += 1
+                is_diff = True
+        if is_diff:
+            diff_files.append(filename)
+
+    return level_results, diff_files
+
+
+def compare_csv_levels(csv_file1, csv_file2, levels):
+    """
+    Compare two CSV files at the given levels in one pass.
+
+    Uses the streaming merge-join when both files are sorted by filename and
+    falls back to loading both into memory when they are not.
+
+    Returns:
+        tuple: See _classify_rows()
+    """
+    try:
+        return _classify_rows(merge_join_checksums(csv_file1, csv_file2), levels)
+    except UnsortedCSVError as e:
+        print(f"Warning: {e}; comparing in memory", file=sys.stderr)
+        return _classify_rows(_dict_join_checksums(csv_file1, csv_file2), levels)
+
+
+def _levels_for(level):
+    """Level names compared for a CLI level ('ALL' -> L1, L2, L3; unknown -> L3)."""
+    if level == 'ALL':
+        return ['L1', 'L2', 'L3']
+    return [level if level in LEVEL_FIELDS else 'L3']
+
+
+def diff_checksums(csv_file1, csv_file2, level='L3'):
+    """
+    Compare two CSV files and return the differences.
+
+    Args:
+        csv_file1: First CSV file (typically from server being checked)
+        csv_file2: Second CSV file (source of truth)
+        level: Comparison level ('L1', 'L2', 'L3', or 'ALL')
+
+    Returns:
+        list: ChecksumDiff entries sorted by filename, then level
+    """
+    levels = _levels_for(level)
+    level_results, _ = compare_csv_levels(csv_file1, csv_file2, levels)
+    diffs = []
+    for level_name in levels:
+        result = level_results[level_name]
+        diffs.extend(result['to_download'])
+        diffs.extend(result['mismatch'])
+        diffs.extend(result['missing_in_source'])
+    diffs.sort(key=lambda diff: (diff.filename, diff.level))
+    return diffs
+
+
+def files_to_fix(diffs):
+    """
+    Filenames that are missing or mismatched in the checked CSV.
+
+    Args:
+        diffs: ChecksumDiff entries from diff_checksums()
+
+    Returns:
+        list: Sorted unique filenames (entries only in the checked CSV are ignored)
+    """
+    return sorted({diff.filename for diff in diffs if diff.kind in ('missing', 'mismatch')})
 
+
+def compare_checksums_all_levels(csv_file1, csv_file2, verbose=False):
+    """
+    Compare two CSV files at all levels (L1, L2, L3).
+
+    Args:
+        csv_file1: First CSV file (typically from server being checked)
+        csv_file2: Second CSV file (source of truth)
+        verbose: If True, show detailed output
+
+    Returns:
+        bool: True if differences found at any level
+    """
+    levels = _levels_for('ALL')
+    level_results, all_diff_files = compare_csv_levels(csv_file1, csv_file2, levels)
     differences_found = bool(all_diff_files)
 
     if verbose:
@@ -531,16 +1311,17 @@ def compare_checksums_all_levels(csv_file1, csv_file2, verbose=False):
         print(f"CSV 1: {csv_file1}")
         print(f"CSV 2: {csv_file2} (source of truth)")
 
-        for level_name, field, field_label in levels_config:
+        for level_name in levels:
             result = level_results[level_name]
+            field_label = result['field_label']
             print(f"\n--- {level_name} ({field_label}) ---")
 
             if result['to_download']:
                 print(f"  Missing in first: {len(result['to_download'])} file(s)")
             if result['mismatch']:
                 print(f"  Mismatch: {len(result['mismatch'])} file(s)")
-                for f, v1, v2 in result['mismatch'][:5]:
-                    print(f"    {f}: {v1} != {v2}")
+                for diff in result['mismatch'][:5]:
+                    print(f"    {diff.filename}: {diff.local_value} != {diff.reference_value}")
                 if len(result['mismatch']) > 5:
                     print(f"    ... and {len(result['mismatch']) - 5} more")
             if result['missing_in_source']:
@@ -551,8 +1332,8 @@ def compare_checksums_all_levels(csv_file1, csv_file2, verbose=False):
         print(f"\n=== Summary ===")
         print(f"Total files with differences: {len(all_diff_files)}")
     else:
-        # Light output mode - just list unique files with differences
-        for f in sorted(all_diff_files):
+        # Light output mode - just list unique files with differences (already sorted)
+        for f in all_diff_files:
             print(f)
 
     return differences_found
@@ -575,51 +1356,13 @@ def compare_checksums(csv_file1, csv_file2, level='L3', verbose=False):
     if level == 'ALL':
         return compare_checksums_all_levels(csv_file1, csv_file2, verbose)
 
-    checksums1 = read_csv(csv_file1)
-    checksums2 = read_csv(csv_file2)
-
-    # Determine which field to compare based on level
-    if level == 'L1':
-        field = 'filesize'
-        field_label = 'file size'
-    elif level == 'L2':
-        field = '8k_sha256sum'
-        field_label = '8K hash'
-    else:  # L3
-        field = 'sha256sum'
-        field_label = 'SHA256'
-
-    # Get all unique filenames
-    all_files = sorted(set(checksums1.keys()) | set(checksums2.keys()))
-
-    files_to_download = []
-    files_with_mismatch = []
-    missing_in_source = []
-    missing_field_in_both = []
-
-    for filename in all_files:
-        data1 = checksums1.get(filename, {})
-        data2 = checksums2.get(filename, {})
-
-        val1 = data1.get(field, '')
-        val2 = data2.get(field, '')
-
-        # Convert to string for comparison
-        val1_str = str(val1) if val1 else ''
-        val2_str = str(val2) if val2 else ''
-
-        if not val1_str and not val2_str:
-            # Field missing in both
-            missing_field_in_both.append(filename)
-        elif not val1_str:
-            # Missing in first file - need to download from source
-            files_to_download.append(filename)
-        elif not val2_str:
-            # Missing in source of truth
-            missing_in_source.append(filename)
-        elif val1_str != val2_str:
-            # Values don't match
-            files_with_mismatch.append((filename, val1_str, val2_str))
+    level_key = _levels_for(level)[0]
+    level_results, _ = compare_csv_levels(csv_file1, csv_file2, [level_key])
+    result = level_results[level_key]
+    field_label = result['field_label']
+    files_to_download = result['to_download']
+    files_with_mismatch = result['mismatch']
+    missing_in_source = result['missing_in_source']
 
     # Output results
     differences_found = bool(files_to_download or files_with_mismatch or missing_in_source)
@@ -629,41 +1372,49 @@ def compare_checksums(csv_file1, csv_file2, level='L3', verbose=False):
         print(f"CSV 1: {csv_file1}")
         print(f"CSV 2: {csv_file2} (source of truth)")
 
-        if missing_field_in_both:
-            print(f"\n-- {field_label} not computed in either file ({len(missing_field_in_both)}):")
-            for f in missing_field_in_both[:10]:
+        if result['missing_in_both']:
+            print(f"\n-- {field_label} not computed in either file ({result['missing_in_both']}):")
+            for f in result['missing_in_both_sample']:
                 print(f"  {f}")
-            if len(missing_field_in_both) > 10:
-                print(f"  ... and {len(missing_field_in_both) - 10} more")
+            if result['missing_in_both'] > MISSING_IN_BOTH_SAMPLE:
+                print(f"  ... and {result['missing_in_both'] - MISSING_IN_BOTH_SAMPLE} more")
 
         if files_to_download:
             print(f"\n-- Files missing in first directory ({len(files_to_download)}):")
-            for f in files_to_download:
-                print(f"  {f}")
+            for diff in files_to_download:
+                print(f"  {diff.filename}")
 
         if files_with_mismatch:
             print(f"\n-- Files with {field_label} mismatch ({len(files_with_mismatch)}):")
-            for f, v1, v2 in files_with_mismatch:
-                print(f"  {f}")
-                print(f"    Dir1: {v1}")
-                print(f"    Dir2: {v2}")
+            for diff in files_with_mismatch:
+                print(f"  {diff.filename}")
+                print(f"    Dir1: {diff.local_value}")
+                print(f"    Dir2: {diff.reference_value}")
 
         if missing_in_source:
             print(f"\n-- Files in first directory but not in source ({len(missing_in_source)}):")
-            for f in missing_in_source:
-                print(f"  {f}")
+            for diff in missing_in_source:
+                print(f"  {diff.filename}")
 
         if not differences_found:
             print(f"\nAll {field_label} values match!")
     else:
         # Light output mode - just list files to download/fix
-        all_needed_files = files_to_download + [f for f, _, _ in files_with_mismatch]
-        for f in all_needed_files:
-            print(f)
+        for diff in files_to_download + files_with_mismatch:
+            print(diff.filename)
 
     return differences_found
 
 
+def remote_csv_cache_path(ssh_host):
+    """Local working copy of a remote host's CSV (logs/sha256-list-{hostname}.csv)."""
+    logs_dir = Path(__file__).parent / "logs"
+    logs_dir.mkdir(exist_ok=True)
+
+    hostname = ssh_host.split('@')[-1] if '@' in ssh_host else ssh_host
+    return str(logs_dir / f"sha256-list-{hostname}.csv")
+
+
 def download_remote_csv(ssh_host, remote_path, local_csv_file):
     """Download CSV file from remote host without reusing stale local data."""
     remote_csv = f"{remote_path}/sha256-list.csv"
@@ -677,8 +1428,10 @@ def download_remote_csv(ssh_host, remote_path, local_csv_file):
 
     try:
         print(f"Downloading existing CSV from remote: {remote_csv}")
-        subprocess.run(
-            ['scp', f'{ssh_host}:{remote_csv}', local_csv_file],
+        run_scp(
+            f'{ssh_host}:{remote_csv}', local_csv_file,
+            capture_output=True,
+            text=True,
             check=True
         )
         print(f"Downloaded to: {local_csv_file}")
@@ -686,6 +1439,8 @@ def download_remote_csv(ssh_host, remote_path, local_csv_file):
     except subprocess.CalledProcessError as e:
         local_csv_path.unlink(missing_ok=True)
         print(f"Error downloading remote CSV: {e}")
+        if e.stderr and e.stderr.strip():
+            print(f"  {e.stderr.strip()}")
         return False
 
 
@@ -694,8 +1449,8 @@ def upload_csv_to_remote(ssh_host, remote_path, local_csv_file):
     remote_csv = f"{remote_path}/sha256-list.csv"
     try:
         print(f"Uploading CSV to remote: {remote_csv}")
-        subprocess.run(
-            ['scp', local_csv_file, f'{ssh_host}:{remote_csv}'],
+        run_scp(
+            local_csv_file, f'{ssh_host}:{remote_csv}',
             capture_output=True,
             text=True,
             check=True
@@ -707,31 +1462,44 @@ def upload_csv_to_remote(ssh_host, remote_path, local_csv_file):
         return False
 
 
-def query_csv_entries(csv_file, filenames):
+def query_csv_entries(csv_file, filenames, build_index=False):
     """
     Query and display CSV entries for specific filenames.
 
+    Uses the indexed sidecar (sha256-list.index.sqlite) when it is current,
+    so lookups do not parse the whole CSV.
+
     Args:
         csv_file: Path to CSV file
         filenames: List of filenames to query
+        build_index: If True, create or refresh the index when missing or stale
 
     Returns:
         dict: Queried entries {filename: data}
     """
-    checksums = read_csv(csv_file)
+    index = open_index(csv_file, build=build_index)
+    if index:
+        with index:
+            if not len(index):
+                print(f"Error: CSV file is empty or not found: {csv_file}")
+                return {}
+            results = index.lookup(filenames)
+        not_found = [f for f in filenames if f not in results]
+    else:
+        checksums = read_csv(csv_file)
 
-    if not checksums:
-        print(f"Error: CSV file is empty or not found: {csv_file}")
-        return {}
+        if not checksums:
+            print(f"Error: CSV file is empty or not found: {csv_file}")
+            return {}
 
-    results = {}
-    not_found = []
+        results = {}
+        not_found = []
 
-    for filename in filenames:
-        if filename in checksums:
-            results[filename] = checksums[filename]
-        else:
-            not_found.append(filename)
+        for filename in filenames:
+            if filename in checksums:
+                results[filename] = checksums[filename]
+            else:
+                not_found.append(filename)
 
     # Display results
     if results:
@@ -790,11 +1558,88 @@ def initialize_csv_from_directory(directory, csv_file, dry_run=False, ssh_host=N
         print(f"Created CSV with {len(tensordata_files)} files")
 
 
+def update_directory(dir_arg, level='L3', dry_run=False, force=False, specific_files=None, remote_scripts_dir=None, jobs=None, use_stat_cache=True, build_index=False):
+    """
+    Update the sha256-list.csv of a local or remote directory.
+
+    Remote CSVs are downloaded to logs/sha256-list-{hostname}.csv, updated
+    there and uploaded back.
+
+    Args:
+        dir_arg: Local directory or remote "user@host:/path"
+        level: 'L1', 'L2', 'L3' or 'ALL' (L1, L2 and L3 in turn)
+        dry_run: Print what would be done without writing files
+        force: Recalculate values even if they exist (subject to the stat cache)
+        specific_files: Optional list of filenames to update
+        remote_scripts_dir: Scripts directory on the remote server
+        jobs: Files hashed in parallel for L3
+        use_stat_cache: Read and update the stat cache
+        build_index: Create/refresh the SQLite index sidecar afterwards
+
+    Returns:
+        str or None: Path of the (local copy of the) updated CSV, or None on error
+    """
+    # Parse the directory argument (could be remote)
+    is_remote, ssh_host, dir_path = parse_remote_path(dir_arg)
+
+    # Determine which levels to process
+    levels_to_process = _levels_for(level)
+
+    if is_remote:
+        print(f"Remote directory mode: {ssh_host}:{dir_path}")
+        print(f"Level: {level}")
+
+        # Create a local CSV file based on the remote hostname
+        csv_file1 = remote_csv_cache_path(ssh_host)
+
+        # Always download the remote CSV to get accurate state. A missing
+        # manifest is fatal so a path change cannot silently turn an
+        # incremental update into a full sync.
+        csv_downloaded = download_remote_csv(ssh_host, dir_path, csv_file1)
+        if not csv_downloaded:
+            print(f"Error: Required remote CSV is missing or inaccessible: {ssh_host}:{dir_path}/sha256-list.csv")
+            return None
+
+        initialize_csv_from_directory(None, csv_file1, dry_run, ssh_host, dir_path)
+
+        for lvl in levels_to_process:
+            update_csv_with_level(None, csv_file1, lvl, dry_run, ssh_host, dir_path, force, specific_files, remote_scripts_dir, jobs, use_stat_cache)
+
+        if not dry_run:
+            upload_csv_to_remote(ssh_host, dir_path, csv_file1)
+    else:
+        dir1 = dir_path
+
+        if not os.path.isdir(dir1):
+            print(f"Error: {dir1} is not a valid directory")
+            return None
+
+        csv_file1 = os.path.join(dir1, 'sha256-list.csv')
+
+        initialize_csv_from_directory(dir1, csv_file1, dry_run)
+
+        for lvl in levels_to_process:
+            update_csv_with_level(dir1, csv_file1, lvl, dry_run, force=force, specific_files=specific_files, jobs=jobs, use_stat_cache=use_stat_cache)
+
+    if build_index and not dry_run:
+        index = open_index(csv_file1, build=True)
+        if index:
+            index.close()
+
+    if dry_run:
+        print("\nDry-run completed (no files modified)")
+    else:
+        print(f"\nLevel {level} processing completed successfully")
+    return csv_file1
+
+
 def main():
     # Check for flags
     dry_run = '--dry-run' in sys.argv
     verbose = '--verbose' in sys.argv or '-v' in sys.argv
     force = '--force' in sys.argv
+    use_stat_cache = '--no-stat-cache' not in sys.argv
+    build_index = '--index' in sys.argv
 
     # Parse level flag
     level = 'L3'  # Default
@@ -810,6 +1655,9 @@ def main():
     specific_files = []
     args_to_filter = []
     remote_scripts_dir = None
+    jobs = None
+    jobs_arg = None
+    invalid_jobs = None
     i = 1
     while i < len(sys.argv):
         arg = sys.argv[i]
@@ -837,15 +1685,36 @@ def main():
             remote_scripts_dir = arg.split('=', 1)[1]
             args_to_filter.append(arg)
             i += 1
+        elif arg == '--jobs' and i + 1 < len(sys.argv):
+            # Handle --jobs N format
+            jobs_arg = sys.argv[i + 1]
+            args_to_filter.extend([arg, sys.argv[i + 1]])
+            i += 2
+        elif arg.startswith('--jobs='):
+            # Handle --jobs=N format
+            jobs_arg = arg.split('=', 1)[1]
+            args_to_filter.append(arg)
+            i += 1
         else:
             i += 1
 
-    args = [arg for arg in sys.argv[1:] if arg not in ['--dry-run', '--verbose', '-v', '--force', 'L1', 'L2', 'L3', 'l1', 'l2', 'l3', 'all', 'ALL', 'query'] + args_to_filter and not arg.startswith('--level=') and not arg.startswith('--file=') and not arg.startswith('--remote-scripts-dir=')]
+    if jobs_arg is not None:
+        try:
+            jobs = max(1, int(jobs_arg))
+        except ValueError:
+            invalid_jobs = jobs_arg
+
+    args = [arg for arg in sys.argv[1:] if arg not in ['--dry-run', '--verbose', '-v', '--force', '--no-stat-cache', '--index', 'L1', 'L2', 'L3', 'l1', 'l2', 'l3', 'all', 'ALL', 'query', 'compact'] + args_to_filter and not arg.startswith('--level=') and not arg.startswith('--file=') and not arg.startswith('--remote-scripts-dir=') and not arg.startswith('--jobs=')]
 
-    # Check for query mode
+    # Check for query and compact modes
     query_mode = 'query' in sys.argv
+    compact_mode = 'compact' in sys.argv
+
+    if invalid_jobs is not None:
+        print(f"Error: --jobs must be an integer, got '{invalid_jobs}'")
+        print()
 
-    if len(args) < 1 or len(args) > 2:
+    if invalid_jobs is not None or len(args) < 1 or len(args) > 2:
         print("Usage: python compare_checksums.py [options] <directory|csv1> [csv2]")
         print()
         print("Options:")
@@ -862,9 +1731,17 @@ def main():
         print("  --dry-run: Print what would be done without writing files")
         print("  --verbose, -v: Show detailed output in comparison mode")
         print("  --force: Recalculate all values even if they exist")
+        print("       Files whose (inode, size, mtime) match the stat cache recorded when")
+        print("       the value was computed are not rehashed")
+        print("  --no-stat-cache: Do not read or update the stat cache (sha256-list.statcache.json);")
+        print("       with --force, rehash every file")
+        print("  --index: Create/refresh the indexed sidecar (sha256-list.index.sqlite) for the CSV.")
+        print("       Once it exists it is kept current and used for query lookups")
         print("  --remote-scripts-dir=<path>: Path to scripts directory on remote server")
         print("       Default: /root/utils/UpdateModels")
         print("       Used for L2 (8K hash) calculation on remote servers")
+        print(f"  --jobs=<n>: Files hashed in parallel for L3 (default: {DEFAULT_L3_JOBS})")
+        print("       Local: thread pool; remote: one SSH session running parallel sha256sum")
         print()
         print("CSV format: filename, sha256sum, 8k_sha256sum, filesize")
         print()
@@ -883,6 +1760,9 @@ def main():
         print("     Local:  ./compare_checksums.py query /path/to/dir --file=model.ckpt")
         print("     Remote: ./compare_checksums.py query root@host:/path --file=model.ckpt")
         print()
+        print("  4. Compact mode: Apply sha256-list.csv.journal and .sync-journal to the CSV (local directory)")
+        print("     ./compare_checksums.py compact /path/to/dir")
+        print()
         print("Examples:")
         print("  # Update file sizes (L1) for local directory")
         print("  ./compare_checksums.py L1 /mnt/models/official-models")
@@ -902,6 +1782,9 @@ def main():
         print("  # Update L3 for specific files on remote server")
         print("  ./compare_checksums.py L3 --file=model.ckpt root@server:/mnt/models")
         print()
+        print("  # Update L3 on remote server with 8 parallel hashing workers")
+        print("  ./compare_checksums.py L3 --jobs=8 root@server:/mnt/models")
+        print()
         print("  # Update L2 on remote server with custom scripts directory")
         print("  ./compare_checksums.py L2 --remote-scripts-dir=/opt/scripts root@server:/mnt/models")
         print()
@@ -920,6 +1803,17 @@ def main():
 
     first_arg = args[0]
 
+    # Handle compact mode
+    if compact_mode:
+        is_remote, _, dir_path = parse_remote_path(first_arg)
+        if is_remote or not os.path.isdir(dir_path):
+            print(f"Error: Compact mode requires a local directory: {first_arg}")
+            sys.exit(1)
+        csv_file = os.path.join(dir_path, 'sha256-list.csv')
+        if not dry_run:
+            compact_journal(csv_file)
+        sys.exit(0)
+
     # Handle query mode
     if query_mode:
         if not specific_files:
@@ -932,12 +1826,7 @@ def main():
 
         if is_remote:
             # Download remote CSV to local temp location
-            script_dir = Path(__file__).parent
-            logs_dir = script_dir / "logs"
-            logs_dir.mkdir(exist_ok=True)
-
-            hostname = ssh_host.split('@')[-1] if '@' in ssh_host else ssh_host
-            csv_file = str(logs_dir / f"sha256-list-{hostname}.csv")
+            csv_file = remote_csv_cache_path(ssh_host)
 
             print(f"Query mode: {ssh_host}:{dir_path}")
             if not download_remote_csv(ssh_host, dir_path, csv_file):
@@ -951,7 +1840,7 @@ def main():
                 print(f"Error: CSV file not found: {csv_file}")
                 sys.exit(1)
 
-        results = query_csv_entries(csv_file, specific_files)
+        results = query_csv_entries(csv_file, specific_files, build_index)
         sys.exit(0 if results else 1)
 
     # Check if second argument is provided
@@ -982,64 +1871,11 @@ def main():
             sys.exit(1)
     else:
         # Single directory mode (local or remote)
-        dir_arg = first_arg
-
-        # Parse the directory argument (could be remote)
-        is_remote, ssh_host, dir_path = parse_remote_path(dir_arg)
-
-        # Determine which levels to process
-        if level == 'ALL':
-            levels_to_process = ['L1', 'L2', 'L3']
-        else:
-            levels_to_process = [level]
-
-        if is_remote:
-            print(f"Remote directory mode: {ssh_host}:{dir_path}")
-            print(f"Level: {level}")
-
-            # Create a local CSV file based on the remote hostname
-            script_dir = Path(__file__).parent
-            logs_dir = script_dir / "logs"
-            logs_dir.mkdir(exist_ok=True)
-
-            hostname = ssh_host.split('@')[-1] if '@' in ssh_host else ssh_host
-            csv_file1 = str(logs_dir / f"sha256-list-{hostname}.csv")
-
-            # Always download the remote CSV to get accurate state. A missing
-            # manifest is fatal so a path change cannot silently turn an
-            # incremental update into a full sync.
-            csv_downloaded = download_remote_csv(ssh_host, dir_path, csv_file1)
-            if not csv_downloaded:
-                print(f"Error: Required remote CSV is missing or inaccessible: {ssh_host}:{dir_path}/sha256-list.csv")
-                sys.exit(1)
-
-            initialize_csv_from_directory(None, csv_file1, dry_run, ssh_host, dir_path)
-
-            for lvl in levels_to_process:
-                update_csv_with_level(None, csv_file1, lvl, dry_run, ssh_host, dir_path, force, specific_files if specific_files else None, remote_scripts_dir)
-
-            if not dry_run:
-                upload_csv_to_remote(ssh_host, dir_path, csv_file1)
-        else:
-            dir1 = dir_path
-
-            if not os.path.isdir(dir1):
-                print(f"Error: {dir1} is not a valid directory")
-                sys.exit(1)
-
-            csv_file1 = os.path.join(dir1, 'sha256-list.csv')
-
-            initialize_csv_from_directory(dir1, csv_file1, dry_run)
-
-            for lvl in levels_to_process:
-                update_csv_with_level(dir1, csv_file1, lvl, dry_run, force=force, specific_files=specific_files if specific_files else None)
-
-        if dry_run:
-            print("\nDry-run completed (no files modified)")
-        else:
-            print(f"\nLevel {level} processing completed successfully")
-        sys.exit(0)
-
+        csv_file1 = update_directory(
+            first_arg, level, dry_run, force, specific_files if specific_files else None,
+            remote_scripts_dir, jobs, use_stat_cache, build_index
+        )
+        sys.exit(0 if csv_file1 else 1)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Seed registry for peer-to-peer model fan-out.
+
+With sync_models_multi_server.py --fanout, a GPU server that holds a file
+verified against the NAS CSV runs fanout_seed_server.py and becomes a
+seed for that file. Other servers in the same group (rack or subnet)
+download it from a seed instead of the NAS:
+
+  - the first server in a group that needs a file, with no seed for it yet,
+    pulls it from the NAS; the others wait for it instead of also pulling
+    it, so NAS egress is one copy per file per group
+  - every server that has downloaded and verified a file becomes a seed
+    for it, and each seed serves at most uploads_per_seed peers at once,
+    so the copies spread as a tree (1 -> k -> k^2 ...)
+  - a peer that fails (unreachable, hash mismatch) is dropped as a seed for
+    that file and the next source is tried, down to the NAS
+
+Groups come from the optional 5th column of gpu_servers.csv; without it,
+a server's group is its hostname without the last "-" component
+(dfw-043-003 -> dfw-043) plus the NAS it uses.
+
+Usage:
+  registry = SeedRegistry(uploads_per_seed=2)
+  seed = registry.acquire(group, filename, host)
+  if seed is None:
+      ... download from the NAS ...
+      registry.finish_pull(group, filename, host)
+  else:
+      ... download from the seed ...
+      registry.release_upload(seed)
+  registry.add_seed(group, filename, host)  # once verified
+
+A server whose sync is cancelled (see ssh_pool.cancel_host()) is passed to
+registry.cancel_host(), which makes its waiting and later acquire() calls
+raise HostCancelled.
+"""
+
+import threading
+
+from ssh_pool import HostCancelled
+
+
+# Concurrent uploads per seed (the fan-out degree of the copy tree)
+DEFAULT_UPLOADS_PER_SEED = 2
+
+# Seconds between checks for cancellation while acquire() waits
+ACQUIRE_POLL_SECONDS = 5
+
+
+def default_group(remote_host, nas_url=None):
+    """
+    Fan-out group of a server without an explicit group.
+
+    Args:
+        remote_host: user@hostname
+        nas_url: Custom NAS "ip:port" of the server (None for the default NAS)
+
+    Returns:
+        str: Hostname prefix (dfw-043-003 -> dfw-043), qualified by a custom NAS
+    """
+    hostname = remote_host.split('@')[-1]
+    prefix = hostname.rsplit('-', 1)[0] if '-' in hostname else hostname
+    return f"{prefix}@{nas_url}" if nas_url else prefix
+
+
+class SeedRegistry:
+    """Tracks which servers seed which files and plans who downloads from whom."""
+
+    def __init__(self, uploads_per_seed=DEFAULT_UPLOADS_PER_SEED):
+        self.uploads_per_seed = max(1, uploads_per_seed)
+        self.condition = threading.Condition()
+        self.seeds = {}     # {(group, filename): {seed_host, ...}}
+        self.pulling = {}   # {(group, filename): host pulling it from the NAS}
+        self.uploads = {}   # {seed_host: active uploads}
+        self.cancelled = set()  # Hosts passed to cancel_host()
+
+    def add_seed(self, group, filename, host):
+        """Register host as holding a verified copy of filename."""
+        self.add_seeds(group, [filename], host)
+
+    def add_seeds(self, group, filenames, host):
+        """Register host as holding verified copies of several files."""
+        with self.condition:
+            for filename in filenames:
+                self.seeds.setdefault((group, filename), set()).add(host)
+            self.condition.notify_all()
+
+    def remove_seed(self, group, filename, host):
+        """Stop offering host as a seed for filename (e.g. after a failed transfer)."""
+        with self.condition:
+            self.seeds.get((group, filename), set()).discard(host)
+            self.condition.notify_all()
+
+    def acquire(self, group, filename, host):
+        """
+        Pick the source for one download, waiting while another server of the
+        group is pulling the file from the NAS or every seed is busy.
+
+        Args:
+            group: Fan-out group of the downloading server
+            filename: File to download
+            host: Downloading server (never picked as its own seed)
+
+        Returns:
+            str or None: Seed host to download from (release with
+                release_upload()), or None if the caller should pull from the
+                NAS (report with finish_pull())
+
+        Raises:
+            HostCancelled: host was passed to cancel_host()
+        """
+        key = (group, filename)
+        with self.condition:
+            while True:
+                if host in self.cancelled:
+                    raise HostCancelled(f"Cancelled: {host}")
+                candidates = self.seeds.get(key, set()) - {host}
+                available = [seed for seed in candidates
+                             if self.uploads.get(seed, 0) < self.uploads_per_seed]
+                if available:
+                    seed = min(available, key=lambda seed: (self.uploads.get(seed, 0), seed))
+                    self.uploads[seed] = self.uploads.get(seed, 0) + 1
+                    return seed
+                if not candidates and key not in self.pulling:
+                    self.pulling[key] = host
+                    return None
+                # A seed frees up, a new seed appears, the NAS pull ends or
+                # host is cancelled (the timeout is a safety net)
+                self.condition.wait(ACQUIRE_POLL_SECONDS)
+
+    def release_upload(self, seed):
+        """Return an upload slot obtained from acquire()."""
+        with self.condition:
+            self.uploads[seed] -= 1
+            self.condition.notify_all()
+
+    def cancel_host(self, host):
+        """Make host's waiting and later acquire() calls raise HostCancelled."""
+        with self.condition:
+            self.cancelled.add(host)
+            self.condition.notify_all()
+
+    def finish_pull(self, group, filename, host):
+        """End a NAS pull claimed by acquire(), whether it succeeded or not."""
+        with self.condition:
+            if self.pulling.get((group, filename)) == host:
+                del self.pulling[(group, filename)]
+            self.condition.notify_all()
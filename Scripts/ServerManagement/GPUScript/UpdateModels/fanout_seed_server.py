@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Temporary HTTP seed server for peer-to-peer model fan-out.
+
+Runs on a GPU server during sync_models_multi_server.py --fanout and
+serves that server's model files to peers, so a new model is pulled from
+the NAS once per group and then copied between GPU servers.
+
+Only plain file names are served (no directories, listings or hidden
+files); each name is looked up in the given roots in order, so files moved
+to the overflow path are still found. GET and HEAD are supported,
+including single byte-range requests, so segmented_download.py can fetch
+from a seed as well as from the NAS.
+
+The server exits when its stdin is closed: the orchestrator starts it over
+SSH and closing the SSH session stops it, even if the orchestrator dies.
+
+Only the standard library is used (deployed with the other UpdateModels
+scripts).
+
+Usage: python3 fanout_seed_server.py [--port=N] [--bind=ADDR] <root> [<root> ...]
+Prints "Serving <roots> on <addr>:<port>" once it is listening.
+"""
+
+import os
+import re
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# Default listening port (sync_models_multi_server.py --fanout-port)
+DEFAULT_PORT = 61768
+
+# Single byte range: bytes=<start>-[<end>] or bytes=-<suffix length>
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class SeedRequestHandler(BaseHTTPRequestHandler):
+    """Serves files from server.roots by name."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass  # Quiet; the orchestrator logs transfers on the receiving side
+
+    def _resolve(self):
+        """Path of the requested file, or None if it is not served."""
+        name = self.path.split('?', 1)[0].lstrip('/')
+        if not name or '/' in name or '\\' in name or name.startswith('.'):
+            return None
+        for root in self.server.roots:
+            path = os.path.join(root, name)
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def _send_empty(self, status):
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def _handle(self, send_body):
+        path = self._resolve()
+        if path is None:
+            self._send_empty(404)
+            return
+
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            self._send_empty(404)
+            return
+
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            start, end = 0, size - 1
+            range_header = self.headers.get('Range')
+            match = RANGE_RE.match(range_header.strip()) if range_header else None
+            if range_header and (not match or match.groups() == ('', '')):
+                match = None  # Unsupported range forms get the whole file
+            if match:
+                first, last = match.groups()
+                if first:
+                    start = int(first)
+                    end = min(int(last), size - 1) if last else size - 1
+                else:
+                    start = max(size - int(last), 0)
+                if start >= size or start > end:
+                    self.send_response(416)
+                    self.send_header('Content-Range', f'bytes */{size}')
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(206)
+                self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+            else:
+                self.send_response(200)
+            length = max(end - start + 1, 0)
+            self.send_header('Content-Type', 'application/octet-stream')
+            self.send_header('Content-Length', str(length))
+            self.send_header('Accept-Ranges', 'bytes')
+            self.end_headers()
+
+            if send_body and length:
+                self.wfile.flush()
+                try:
+                    self.connection.sendfile(f, start, length)
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True  # Peer gave up (it retries or falls back)
+
+    def do_HEAD(self):
+        self._handle(send_body=False)
+
+    def do_GET(self):
+        self._handle(send_body=True)
+
+
+def serve(roots, port=DEFAULT_PORT, bind='0.0.0.0'):
+    """
+    Serve files from roots until stdin is closed.
+
+    Args:
+        roots: Directories searched in order for each requested name
+        port: TCP port to listen on
+        bind: Address to bind to
+    """
+    server = ThreadingHTTPServer((bind, port), SeedRequestHandler)
+    server.daemon_threads = True
+    server.roots = list(roots)
+
+    def watch_stdin():
+        # EOF means the controlling SSH session is gone
+        while sys.stdin.buffer.read(65536):
+            pass
+        server.shutdown()
+
+    threading.Thread(target=watch_stdin, daemon=True).start()
+    print(f"Serving {' '.join(server.roots)} on {bind}:{port}", flush=True)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    port = DEFAULT_PORT
+    bind = '0.0.0.0'
+    roots = []
+    for arg in sys.argv[1:]:
+        if arg.startswith('--port='):
+            port = int(arg.split('=', 1)[1])
+        elif arg.startswith('--bind='):
+            bind = arg.split('=', 1)[1]
+        else:
+            roots.append(arg)
+
+    if not roots:
+        print(f"Usage: {sys.argv[0]} [--port=N] [--bind=ADDR] <root> [<root> ...]", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        serve(roots, port, bind)
+    except OSError as e:
+        print(f"Error: Cannot listen on {bind}:{port}: {e}", file=sys.stderr)
+        sys.exit(1)
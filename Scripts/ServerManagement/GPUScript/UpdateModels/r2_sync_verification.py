@@ -18,6 +18,10 @@ import schedule
 import subprocess
 import shutil
 
+from hashing import ThroughputCounter, sha256_file
+from segmented_download import (DEFAULT_MIN_SIZE as SEGMENTED_MIN_SIZE, SegmentedDownloadError,
+                                resume_map_path, segmented_download)
+
 class R2ModelSync:
     def __init__(self, account_id, access_key_id, secret_access_key, bucket_name, target_dir,
                  enable_cleanup=False, max_retries=3, size_tolerance_mb=10, exclude_suffix=None):
@@ -30,6 +34,7 @@ class R2ModelSync:
         self.size_tolerance_mb = size_tolerance_mb  # Size tolerance in MB
         self.size_tolerance_bytes = size_tolerance_mb * 1024 * 1024  # Convert to bytes
         self.exclude_suffix = exclude_suffix
+        self.hash_counter = ThroughputCounter()  # Bytes verified across all download threads
         self.r2_client = self._setup_r2_client(account_id, access_key_id, secret_access_key)
         self.sha256_dict = self._get_sha256_dict()
 
@@ -64,24 +69,16 @@ class R2ModelSync:
         return sha256_dict
         
     def _calculate_sha256(self, filepath):
-        """Calculate SHA256 hash of file in chunks with progress bar"""
-        sha256_hash = hashlib.sha256()
-        chunk_size = 1024 * 1024  # 1MB chunks
+        """Calculate SHA256 hash of file with large read-ahead reads and a progress bar"""
         file_size = os.path.getsize(filepath)
         
         try:
-            with open(filepath, 'rb') as f:
-                with tqdm(total=file_size, 
-                         unit='iB', 
-                         unit_scale=True, 
-                         desc=f"Calculating SHA256 for {os.path.basename(filepath)}") as pbar:
-                    while True:
-                        chunk = f.read(chunk_size)
-                        if not chunk:
-                            break
-                        sha256_hash.update(chunk)
-                        pbar.update(len(chunk))
-            return sha256_hash.hexdigest()
+            with tqdm(total=file_size,
+                     unit='iB',
+                     unit_scale=True,
+                     desc=f"Calculating SHA256 for {os.path.basename(filepath)}") as pbar:
+                digest = sha256_file(filepath, counter=self.hash_counter, progress=pbar.update)
+            return digest
         except Exception as e:
             logging.error(f"Failed to calculate SHA256 for {filepath}: {str(e)}")
             return None
@@ -224,6 +221,9 @@ class R2ModelSync:
         
         url = f"{self.base_url}/{key}"
         download_id = os.path.basename(key)
+        # Large files are fetched over parallel Range requests, resumable
+        # through a segment map next to the temp file
+        segmented = remote_info['size'] >= SEGMENTED_MIN_SIZE
         
         # Create a lock for console output if it doesn't exist
         if not hasattr(self.__class__, '_console_lock'):
@@ -231,8 +231,9 @@ class R2ModelSync:
         
         for attempt in range(self.max_retries):
             try:
-                # Check if we can resume a previous download
-                if os.path.exists(temp_path):
+                # Check if we can resume a previous download (a segmented temp
+                # file is preallocated to full size and resumed via its map)
+                if not segmented and os.path.exists(temp_path):
                     current_size = os.path.getsize(temp_path)
                     if current_size >= remote_info['size']:
                         # File is already complete or larger than expected, remove and restart
@@ -263,37 +264,60 @@ class R2ModelSync:
                             size_str = f"{size_mb:.2f} MB"
                         logging.info(f"[{download_id}] Resuming from {size_str}")
                 
-                # Run wget with its output prefixed
-                try:
-                    # Start the wget process
-                    process = subprocess.Popen(
-                        wget_cmd,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.STDOUT,
-                        text=True,
-                        bufsize=1
-                    )
-                    
-                    # Read and prefix each line of output
-                    for line in process.stdout:
-                        if line.strip():
-                            # Add file identifier prefix to each line
+                streamed_sha256 = None
+                if segmented:
+                    last_report = [0.0]
+
+                    def report(downloaded, total):
+                        now = time.monotonic()
+                        if now - last_report[0] >= 30 or downloaded >= total:
+                            last_report[0] = now
                             with self.__class__._console_lock:
-                                print(f"[{download_id}] {line.strip()}")
-                    
-                    # Wait for process to complete
-                    return_code = process.wait()
-                    
-                    if return_code != 0:
-                        raise ValueError(f"wget failed with exit code {return_code}")
-                    
-                    # Download completed successfully
+                                print(f"[{download_id}] {downloaded * 100 // max(total, 1)}% of {total / (1024 * 1024):.2f} MB")
+
+                    with self.__class__._console_lock:
+                        print(f"[{download_id}] Segmented download")
+                    try:
+                        # The digest is computed while the segments land
+                        streamed_sha256 = segmented_download(url, temp_path, progress=report)
+                    except SegmentedDownloadError as e:
+                        raise ValueError(f"Segmented download failed: {e}")
+
                     with self.__class__._console_lock:
                         print(f"[{download_id}] ✓ Download completed")
                     logging.info(f"[{download_id}] Download completed")
+                else:
+                    # Run wget with its output prefixed
+                    try:
+                        # Start the wget process
+                        process = subprocess.Popen(
+                            wget_cmd,
+                            stdout=subprocess.PIPE,
+                            stderr=subprocess.STDOUT,
+                            text=True,
+                            bufsize=1
+                        )
                     
-                except subprocess.CalledProcessError as e:
-                    raise ValueError(f"wget failed with exit code {e.returncode}")
+                        # Read and prefix each line of output
+                        for line in process.stdout:
+                            if line.strip():
+                                # Add file identifier prefix to each line
+                                with self.__class__._console_lock:
+                                    print(f"[{download_id}] {line.strip()}")
+
+                        # Wait for process to complete
+                        return_code = process.wait()
+
+                        if return_code != 0:
+                            raise ValueError(f"wget failed with exit code {return_code}")
+
+                        # Download completed successfully
+                        with self.__class__._console_lock:
+                            print(f"[{download_id}] ✓ Download completed")
+                        logging.info(f"[{download_id}] Download completed")
+
+                    except subprocess.CalledProcessError as e:
+                        raise ValueError(f"wget failed with exit code {e.returncode}")
                 
                 # Verify downloaded file exists and size is reasonable
                 if not os.path.exists(temp_path):
@@ -337,7 +361,10 @@ class R2ModelSync:
                         print(f"[{download_id}] Verifying SHA256...")
                     logging.info(f"[{download_id}] Starting SHA256 verification...")
                     
-                    actual_sha256 = self._calculate_sha256(local_path)
+                    if streamed_sha256:
+                        actual_sha256 = streamed_sha256
+                    else:
+                        actual_sha256 = self._calculate_sha256(local_path)
                     
                     if actual_sha256 == expected_sha256:
                         with self.__class__._console_lock:
@@ -385,8 +412,10 @@ class R2ModelSync:
         for root, _, files in os.walk(self.target_dir):
             for file in files:
                 if file.endswith('.temp'):
+                    filepath = os.path.join(root, file)
+                    if os.path.exists(resume_map_path(filepath)):
+                        continue  # Segmented download, resumed from its map
                     try:
-                        filepath = os.path.join(root, file)
                         os.remove(filepath)
                         count += 1
                     except OSError as e:
@@ -519,6 +548,8 @@ class R2ModelSync:
             logging.info(f"  - Failed downloads: {failed}")
             if size_mismatches:
                 logging.info(f"  - Size mismatches resolved: {len([sm for sm in size_mismatches if any(f.result() for f in futures)])}")
+            if self.hash_counter.total_files:
+                logging.info(f"  - SHA256 verified: {self.hash_counter.summary()}")
         
         # Handle cleanup if enabled
         if self.enable_cleanup:
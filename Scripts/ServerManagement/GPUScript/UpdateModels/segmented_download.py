@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Segmented HTTP downloader for large model files.
+
+A single HTTP stream tops out well below the NIC speed for multi-GB files,
+so the file is split into fixed-size segments that are fetched with HTTP
+Range requests over several connections and written with pwrite() into a
+preallocated destination file.
+
+Completed segments are recorded in a resume map (<dest>.segments.json);
+an interrupted download started again with the same URL and destination
+only fetches the missing segments. The map is removed once the file is
+complete.
+
+The whole-file SHA256 is computed in file order while the download runs:
+as soon as the next segment in order has landed it is read back (usually
+still in the page cache) and hashed, so no separate full read is needed
+at the end.
+
+Servers without Range support, and files below the minimum size, are
+fetched as a single segment over one connection.
+
+Only the standard library is used, so the script can run on the GPU
+servers (deployed with the other UpdateModels scripts).
+
+Usage: python3 segmented_download.py [options] <url> <dest>
+Options:
+  --connections=N       Parallel connections (default: 8)
+  --segment-size=MB     Segment size in MB (default: 256)
+  --min-size=MB         Files smaller than this use one connection (default: 1024)
+  --expected-sha256=HEX Exit with code 2 if the digest differs
+  --restart             Ignore any resume map and download everything again
+  --limit-rate=BYTES    Cap the combined rate of all connections (bytes/sec)
+  --report-bytes        Also print "downloaded <bytes>" on stdout (bytes fetched by
+                        this run, without resumed segments), also after an error
+Output: sha256sum-compatible "<hash>  <dest>" on stdout; progress on stderr.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from hashing import ThroughputCounter, format_bytes
+
+
+MB = 1024 * 1024
+
+# Parallel connections per file
+DEFAULT_CONNECTIONS = 8
+
+# Bytes per Range request; each completed segment is one resume map entry
+DEFAULT_SEGMENT_SIZE = 256 * MB
+
+# Files smaller than this are fetched over a single connection
+DEFAULT_MIN_SIZE = 1024 * MB
+
+# Attempts per segment before the download fails
+SEGMENT_ATTEMPTS = 3
+
+# Socket timeout for each HTTP request (seconds)
+HTTP_TIMEOUT_SECONDS = 60
+
+# Bytes per read()/pwrite() and per hashing read
+IO_BLOCK_SIZE = 4 * MB
+
+# Resume map suffix, appended to the destination path
+RESUME_MAP_SUFFIX = '.segments.json'
+
+
+class SegmentedDownloadError(Exception):
+    """Raised when a file cannot be downloaded completely."""
+
+
+class RateLimiter:
+    """Caps the combined throughput of several threads (bytes/sec)."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.lock = threading.Lock()
+        self.next_time = time.monotonic()
+
+    def consume(self, byte_count):
+        """Account for byte_count transferred bytes, sleeping to stay under the rate."""
+        with self.lock:
+            now = time.monotonic()
+            self.next_time = max(self.next_time, now) + byte_count / self.rate
+            delay = self.next_time - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+def resume_map_path(dest):
+    """Path of the resume map for a destination file."""
+    return f"{dest}{RESUME_MAP_SUFFIX}"
+
+
+def probe(url, timeout=HTTP_TIMEOUT_SECONDS):
+    """
+    Get the size of a remote file and whether the server accepts Range requests.
+
+    Returns:
+        tuple: (size, accepts_ranges)
+
+    Raises:
+        SegmentedDownloadError: If the server does not report a size
+    """
+    request = urllib.request.Request(url, method='HEAD')
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            length = response.headers.get('Content-Length')
+            accepts_ranges = response.headers.get('Accept-Ranges', '').lower() == 'bytes'
+    except (urllib.error.URLError, OSError) as e:
+        raise SegmentedDownloadError(f"HEAD {url} failed: {e}") from e
+    if length is None:
+        raise SegmentedDownloadError(f"HEAD {url}: no Content-Length")
+    return int(length), accepts_ranges
+
+
+def _load_resume_map(dest, url, size, segment_size):
+    """Indices of segments already completed, if the map matches this download."""
+    try:
+        with open(resume_map_path(dest), 'r') as f:
+            resume = json.load(f)
+        if (resume.get('url') != url or resume.get('size') != size
+                or resume.get('segment_size') != segment_size
+                or os.path.getsize(dest) != size):
+            return set()
+        return set(resume.get('done', []))
+    except (OSError, ValueError):
+        return set()
+
+
+def _save_resume_map(dest, url, size, segment_size, done):
+    temp_file = f"{resume_map_path(dest)}.tmp"
+    with open(temp_file, 'w') as f:
+        json.dump({'url': url, 'size': size, 'segment_size': segment_size, 'done': sorted(done)}, f)
+    os.replace(temp_file, resume_map_path(dest))
+
+
+def _fetch_segment(url, fd, start, length, ranged, counter=None, limiter=None, timeout=HTTP_TIMEOUT_SECONDS):
+    """
+    Fetch bytes [start, start + length) and pwrite them at the same offset.
+
+    Raises:
+        SegmentedDownloadError: On HTTP errors or a short/unexpected response
+    """
+    request = urllib.request.Request(url)
+    if ranged:
+        request.add_header('Range', f"bytes={start}-{start + length - 1}")
+
+    buffer = bytearray(IO_BLOCK_SIZE)
+    view = memoryview(buffer)
+    offset = start
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            if ranged and response.status != 206:
+                raise SegmentedDownloadError(f"expected 206 Partial Content, got {response.status}")
+            remaining = length
+            while remaining > 0:
+                read_count = response.readinto(view[:min(IO_BLOCK_SIZE, remaining)])
+                if not read_count:
+                    break
+                written = 0
+                while written < read_count:
+                    written += os.pwrite(fd, view[written:read_count], offset + written)
+                offset += read_count
+                remaining -= read_count
+                if counter:
+                    counter.add(read_count)
+                if limiter:
+                    limiter.consume(read_count)
+    except (urllib.error.URLError, OSError) as e:
+        raise SegmentedDownloadError(f"bytes {start}-{start + length - 1}: {e}") from e
+
+    if offset != start + length:
+        raise SegmentedDownloadError(f"bytes {start}-{start + length - 1}: short read ({offset - start} bytes)")
+
+
+def _hash_segment(sha256_hash, fd, start, length):
+    """Add bytes [start, start + length) of the file to the hash."""
+    offset = start
+    end = start + length
+    while offset < end:
+        data = os.pread(fd, min(IO_BLOCK_SIZE, end - offset), offset)
+        if not data:
+            raise SegmentedDownloadError(f"unexpected end of file at byte {offset}")
+        sha256_hash.update(data)
+        offset += len(data)
+
+
+def segmented_download(url, dest, connections=DEFAULT_CONNECTIONS, segment_size=DEFAULT_SEGMENT_SIZE,
+                       min_size=DEFAULT_MIN_SIZE, restart=False, counter=None, progress=None, limit_rate=0):
+    """
+    Download url to dest over parallel Range requests and return its SHA256.
+
+    Args:
+        url: HTTP(S) URL of the file
+        dest: Destination path (preallocated to the full size)
+        connections: Number of segments fetched at once
+        segment_size: Bytes per segment
+        min_size: Files smaller than this are fetched as one segment
+        restart: Ignore an existing resume map
+        counter: Optional ThroughputCounter for downloaded bytes
+        progress: Optional callable invoked as progress(downloaded_bytes, total_bytes)
+        limit_rate: Combined bytes/sec cap for all connections (0: unlimited)
+
+    Returns:
+        str: Hex SHA256 digest of the complete file
+
+    Raises:
+        SegmentedDownloadError: If the file could not be downloaded; completed
+            segments are kept in the resume map for the next attempt
+    """
+    size, accepts_ranges = probe(url)
+    ranged = accepts_ranges and size >= min_size
+    if not ranged:
+        segment_size = max(size, 1)
+    segment_count = (size + segment_size - 1) // segment_size
+    counter = counter or ThroughputCounter()
+    limiter = RateLimiter(limit_rate) if limit_rate > 0 else None
+
+    done = set() if restart else _load_resume_map(dest, url, size, segment_size)
+    if not done and os.path.exists(resume_map_path(dest)):
+        os.remove(resume_map_path(dest))
+
+    fd = os.open(dest, os.O_RDWR | os.O_CREAT | (0 if done else os.O_TRUNC), 0o644)
+    try:
+        if not done and size:
+            # Preallocate so segments can be written anywhere without sparse growth
+            if hasattr(os, 'posix_fallocate'):
+                try:
+                    os.posix_fallocate(fd, 0, size)
+                except OSError:
+                    os.ftruncate(fd, size)
+            else:
+                os.ftruncate(fd, size)
+
+        def segment_bounds(index):
+            start = index * segment_size
+            return start, min(segment_size, size - start)
+
+        sha256_hash = hashlib.sha256()
+        next_to_hash = 0
+        map_lock = threading.Lock()
+        pending = [i for i in range(segment_count) if i not in done]
+        downloaded_before = sum(segment_bounds(i)[1] for i in done)
+
+        def fetch(index):
+            start, length = segment_bounds(index)
+            for attempt in range(1, SEGMENT_ATTEMPTS + 1):
+                try:
+                    _fetch_segment(url, fd, start, length, ranged, counter, limiter)
+                    break
+                except SegmentedDownloadError:
+                    if attempt == SEGMENT_ATTEMPTS:
+                        raise
+                    time.sleep(attempt)
+            with map_lock:
+                done.add(index)
+                if ranged:
+                    _save_resume_map(dest, url, size, segment_size, done)
+            return index
+
+        with ThreadPoolExecutor(max_workers=max(1, min(connections, len(pending) or 1))) as executor:
+            futures = {executor.submit(fetch, index) for index in pending}
+            try:
+                while True:
+                    # Hash every segment that is now contiguous with the hashed prefix
+                    while next_to_hash < segment_count:
+                        with map_lock:
+                            if next_to_hash not in done:
+                                break
+                        _hash_segment(sha256_hash, fd, *segment_bounds(next_to_hash))
+                        next_to_hash += 1
+                    if progress:
+                        progress(min(downloaded_before + counter.total_bytes, size), size)
+                    if not futures:
+                        break
+                    finished, futures = wait(futures, timeout=5, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        future.result()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+    if os.path.exists(resume_map_path(dest)):
+        os.remove(resume_map_path(dest))
+    counter.add_file()
+    return sha256_hash.hexdigest()
+
+
+if __name__ == '__main__':
+    connections = DEFAULT_CONNECTIONS
+    segment_size = DEFAULT_SEGMENT_SIZE
+    min_size = DEFAULT_MIN_SIZE
+    expected_sha256 = None
+    restart = False
+    limit_rate = 0
+    report_bytes = False
+    positional = []
+    for arg in sys.argv[1:]:
+        if arg.startswith('--connections='):
+            connections = int(arg.split('=', 1)[1])
+        elif arg.startswith('--segment-size='):
+            segment_size = int(arg.split('=', 1)[1]) * MB
+        elif arg.startswith('--min-size='):
+            min_size = int(arg.split('=', 1)[1]) * MB
+        elif arg.startswith('--expected-sha256='):
+            expected_sha256 = arg.split('=', 1)[1].strip().lower()
+        elif arg == '--restart':
+            restart = True
+        elif arg.startswith('--limit-rate='):
+            limit_rate = int(arg.split('=', 1)[1])
+        elif arg == '--report-bytes':
+            report_bytes = True
+        else:
+            positional.append(arg)
+
+    if len(positional) != 2:
+        print(f"Usage: {sys.argv[0]} [--connections=N] [--segment-size=MB] [--min-size=MB] "
+              f"[--expected-sha256=HEX] [--restart] [--limit-rate=BYTES] [--report-bytes] <url> <dest>", file=sys.stderr)
+        sys.exit(1)
+
+    url, dest = positional
+    counter = ThroughputCounter()
+    last_report = [0.0]
+
+    def report(downloaded, total):
+        now = time.monotonic()
+        if now - last_report[0] >= 5 or downloaded >= total:
+            last_report[0] = now
+            print(f"  {format_bytes(downloaded)} / {format_bytes(total)} "
+                  f"({format_bytes(counter.rate())}/s)", file=sys.stderr, flush=True)
+
+    try:
+        digest = segmented_download(url, dest, connections, segment_size, min_size, restart, counter, report,
+                                    limit_rate)
+    except (SegmentedDownloadError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        if report_bytes:
+            print(f"downloaded {counter.total_bytes}", flush=True)
+        sys.exit(1)
+
+    print(f"{digest}  {dest}", flush=True)
+    if report_bytes:
+        print(f"downloaded {counter.total_bytes}", flush=True)
+    print(f"Downloaded {counter.summary()}", file=sys.stderr)
+    if expected_sha256 and digest != expected_sha256:
+        print(f"Error: SHA256 mismatch (expected {expected_sha256})", file=sys.stderr)
+        sys.exit(2)
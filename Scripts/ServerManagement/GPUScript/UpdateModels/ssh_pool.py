@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+Shared SSH/SCP execution for the UpdateModels scripts.
+
+Every ssh and scp command goes through one OpenSSH ControlMaster per host:
+the first command to a host opens a multiplexed master connection and
+every later command (including scp) reuses it, so only one TCP connection
+and key exchange is paid per host per process. The masters live in a
+private per-process socket directory and are shut down at exit.
+
+All commands get the same non-interactive defaults (BatchMode, connect
+timeout, keepalives). Callers pass extra ssh options (e.g. host-key
+policy) and subprocess arguments (e.g. timeout) as needed.
+
+sshd limits the sessions per connection (MaxSessions, default 10); a
+command beyond that limit falls back to a separate connection.
+
+Remote commands run by run_ssh() and popen_ssh() are killed with their whole
+process group when their SSH session goes away (timeout, cancel_host(), a dropped
+connection or the caller exiting), so a killed ssh never leaves a wget or
+sha256sum pipeline running on the server. cancel_host() kills every ssh/scp
+client of a host and makes later commands to it raise HostCancelled.
+
+The ssh and scp clients can be replaced through the UPDATEMODELS_SSH and
+UPDATEMODELS_SCP environment variables (a command line, read at import),
+e.g. by bench_fake_fleet.py's shims that run everything locally.
+
+Usage:
+  from ssh_pool import run_ssh, run_scp
+
+  result = run_ssh('root@host', 'ls /mnt/models', capture_output=True, text=True)
+  run_scp('root@host:/mnt/models/sha256-list.csv', 'local.csv', check=True)
+"""
+
+import atexit
+import os
+import shlex
+import shutil
+import subprocess
+import tempfile
+import threading
+
+
+# Seconds to wait for the TCP connection and SSH handshake
+SSH_CONNECT_TIMEOUT_SECONDS = 10
+
+# Seconds an idle master connection is kept open
+CONTROL_PERSIST_SECONDS = 600
+
+# Keepalive interval; a master is dropped after 3 unanswered keepalives
+SERVER_ALIVE_INTERVAL_SECONDS = 15
+
+# Client commands (see module docstring)
+SSH_COMMAND = shlex.split(os.environ.get('UPDATEMODELS_SSH', 'ssh'))
+SCP_COMMAND = shlex.split(os.environ.get('UPDATEMODELS_SCP', 'scp'))
+
+_LOCK = threading.Lock()
+_CONTROL_DIR = None
+_HOSTS = set()
+_PROCESSES = {}    # {host: {Popen, ...}} ssh/scp clients that may still be running
+_CANCELLED = set()  # Hosts passed to cancel_host()
+_HANGUPS = {}      # {Popen: write end of the client's stdin pipe} for run_ssh()/popen_ssh()/run_scp()
+
+
+class HostCancelled(subprocess.SubprocessError):
+    """Raised for commands to a host whose work was cancelled with cancel_host()."""
+
+
+def _control_dir():
+    """Private directory for this process's master sockets (created on first use)."""
+    global _CONTROL_DIR
+    with _LOCK:
+        if _CONTROL_DIR is None:
+            # Short prefix: socket paths are limited to ~100 characters
+            _CONTROL_DIR = tempfile.mkdtemp(prefix='ssh-mux-')
+        return _CONTROL_DIR
+
+
+def _control_options():
+    return [
+        '-o', 'ControlMaster=auto',
+        '-o', f'ControlPath={_control_dir()}/%C',
+        '-o', f'ControlPersist={CONTROL_PERSIST_SECONDS}',
+    ]
+
+
+def ssh_options():
+    """Common ssh/scp options: connection sharing plus non-interactive defaults."""
+    return _control_options() + [
+        '-o', 'BatchMode=yes',
+        '-o', f'ConnectTimeout={SSH_CONNECT_TIMEOUT_SECONDS}',
+        '-o', f'ServerAliveInterval={SERVER_ALIVE_INTERVAL_SECONDS}',
+        '-o', 'ServerAliveCountMax=3',
+    ]
+
+
+def _register_host(host):
+    with _LOCK:
+        _HOSTS.add(host)
+
+
+def ssh_command(host, command, extra_options=None):
+    """
+    Build the argv for running a command on a host.
+
+    Args:
+        host: SSH destination (user@host or host)
+        command: Remote shell command
+        extra_options: Additional ssh arguments placed before the host (e.g. ['-T'])
+
+    Returns:
+        list: Arguments for subprocess
+    """
+    _register_host(host)
+    return SSH_COMMAND + ssh_options() + list(extra_options or []) + [host, command]
+
+
+def _scp_hosts(source, destination):
+    hosts = []
+    for spec in (source, destination):
+        host, separator, _ = spec.partition(':')
+        if separator and '/' not in host:
+            hosts.append(host)
+    return hosts
+
+
+def scp_command(source, destination, extra_options=None):
+    """
+    Build the argv for copying a file; either side may be "host:path".
+
+    Returns:
+        list: Arguments for subprocess
+    """
+    for host in _scp_hosts(source, destination):
+        _register_host(host)
+    return SCP_COMMAND + ssh_options() + list(extra_options or []) + [source, destination]
+
+
+def hangup_on_close(command, input_size=None):
+    """
+    Wrap a remote command so it is killed when its SSH session goes away.
+
+    sshd only signals commands that run on a pty, so without this a killed
+    ssh leaves the remote pipeline running. The command runs in its own
+    process group while a watcher reads the session's stdin; at EOF (ssh
+    killed, connection lost, or the caller closed its end) the whole group
+    gets SIGTERM. Output and exit status are passed through unchanged.
+
+    Stdin carries the hangup, so the command's own input (input_size bytes)
+    is sent first: it is read into a remote temp file that becomes the
+    command's stdin, and only the rest of the stream is watched.
+
+    Args:
+        command: Remote shell command
+        input_size: Bytes of input for the command at the start of stdin
+            (None: the command gets /dev/null)
+
+    Returns:
+        str: Wrapped remote command
+    """
+    # Background jobs get /dev/null as stdin, so the watcher reads it via fd 3
+    if input_size is None:
+        script = f'exec 3<&0; setsid bash -c {shlex.quote(command)} </dev/null 3<&- & pid=$!; '
+    else:
+        script = (f'exec 3<&0; input=$(mktemp) || exit 1; trap \'rm -f "$input"\' EXIT; '
+                  f'head -c {int(input_size)} <&3 >"$input"; '
+                  f'[ "$(wc -c <"$input")" -eq {int(input_size)} ] || exit 1; '
+                  f'setsid bash -c {shlex.quote(command)} <"$input" 3<&- & pid=$!; ')
+    script += (f'{{ cat >/dev/null; kill -TERM -- -$pid; }} <&3 >/dev/null 2>&1 & watcher=$!; exec 3<&-; '
+               f'wait $pid; status=$?; kill $watcher 2>/dev/null; exit $status')
+    return f'bash -c {shlex.quote(script)}'
+
+
+def _start(hosts, argv, **kwargs):
+    """Popen() a client and track it under its hosts (HostCancelled if one is cancelled)."""
+    with _LOCK:
+        cancelled = _CANCELLED.intersection(hosts)
+    if cancelled:
+        raise HostCancelled(f"Cancelled: {', '.join(sorted(cancelled))}")
+
+    process = subprocess.Popen(argv, **kwargs)
+    with _LOCK:
+        for host in hosts:
+            running = {p for p in _PROCESSES.get(host, ()) if p.poll() is None}
+            running.add(process)
+            _PROCESSES[host] = running
+        cancelled = _CANCELLED.intersection(hosts)
+    if cancelled:
+        # cancel_host() ran while this client was starting
+        process.kill()
+    return process
+
+
+def _forget(hosts, process):
+    with _LOCK:
+        for host in hosts:
+            _PROCESSES.get(host, set()).discard(process)
+
+
+def _hang_up(process):
+    """Close a client's stdin pipe so its remote command is killed (see hangup_on_close())."""
+    with _LOCK:
+        hangup = _HANGUPS.pop(process, None)
+    if hangup is not None:
+        try:
+            hangup.close()
+        except OSError:
+            pass  # Unsent input (the client is gone)
+
+
+def _run(hosts, argv, timeout=None, check=False, capture_output=False, **kwargs):
+    """
+    subprocess.run() equivalent for ssh/scp clients.
+
+    The client's stdin is a pipe held open until it exits, so the remote side
+    of a hangup_on_close() command sees EOF as soon as the client is killed
+    (timeout, cancel_host()) or this process dies.
+    """
+    if capture_output:
+        kwargs['stdout'] = subprocess.PIPE
+        kwargs['stderr'] = subprocess.PIPE
+
+    stdin_read, stdin_write = os.pipe()
+    hangup = os.fdopen(stdin_write, 'wb')
+    try:
+        process = _start(hosts, argv, stdin=stdin_read, **kwargs)
+    except BaseException:
+        hangup.close()
+        raise
+    finally:
+        os.close(stdin_read)
+    with _LOCK:
+        _HANGUPS[process] = hangup
+
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        _hang_up(process)
+        process.kill()
+        stdout, stderr = process.communicate()
+        raise subprocess.TimeoutExpired(process.args, timeout, output=stdout, stderr=stderr)
+    except BaseException:
+        _hang_up(process)
+        process.kill()
+        process.wait()
+        raise
+    finally:
+        _hang_up(process)
+        _forget(hosts, process)
+
+    with _LOCK:
+        cancelled = _CANCELLED.intersection(hosts)
+    if cancelled and process.returncode != 0:
+        raise HostCancelled(f"Cancelled: {', '.join(sorted(cancelled))}")
+    if check and process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, process.args, output=stdout, stderr=stderr)
+    return subprocess.CompletedProcess(process.args, process.returncode, stdout, stderr)
+
+
+def run_ssh(host, command, extra_options=None, **kwargs):
+    """subprocess.run() a command on a host over the shared connection (see hangup_on_close())."""
+    return _run([host], ssh_command(host, hangup_on_close(command), extra_options), **kwargs)
+
+
+def popen_ssh(host, command, extra_options=None, input=None, hangup=True, **kwargs):
+    """
+    subprocess.Popen() a command on a host over the shared connection.
+
+    Like run_ssh(), the remote command is killed when the client goes away
+    (see hangup_on_close()): the client's stdin is a pipe held open until
+    it exits, and the command's input is passed as input instead of being
+    written to process.stdin.
+
+    Args:
+        host: SSH destination (user@host or host)
+        command: Remote shell command
+        extra_options: Additional ssh arguments placed before the host
+        input: Bytes fed to the command's stdin (None: /dev/null)
+        hangup: False to run the command as is, with stdin passed through
+            (for commands that watch stdin themselves)
+        **kwargs: subprocess.Popen() arguments (no stdin unless hangup=False)
+
+    Returns:
+        subprocess.Popen: The ssh client
+    """
+    if not hangup:
+        return _start([host], ssh_command(host, command, extra_options), **kwargs)
+
+    wrapped = hangup_on_close(command, None if input is None else len(input))
+    stdin_read, stdin_write = os.pipe()
+    stdin = os.fdopen(stdin_write, 'wb')
+    try:
+        process = _start([host], ssh_command(host, wrapped, extra_options), stdin=stdin_read, **kwargs)
+    except BaseException:
+        stdin.close()
+        raise
+    finally:
+        os.close(stdin_read)
+    with _LOCK:
+        _HANGUPS[process] = stdin
+
+    def hang_up_at_exit():
+        process.wait()
+        _hang_up(process)
+
+    threading.Thread(target=hang_up_at_exit, daemon=True).start()
+    if input:
+        try:
+            # The remote side reads all input before the command starts
+            stdin.write(input)
+            stdin.flush()
+        except (OSError, ValueError):
+            _hang_up(process)
+            process.kill()
+            raise OSError(f"Lost connection to {host} while sending input")
+    return process
+
+
+def run_scp(source, destination, extra_options=None, **kwargs):
+    """subprocess.run() scp over the shared connection."""
+    return _run(_scp_hosts(source, destination), scp_command(source, destination, extra_options), **kwargs)
+
+
+def ssh_config(host):
+    """
+    Effective ssh configuration for a host, as printed by ssh -G (no connection is made).
+
+    Returns:
+        dict: {lowercase option: value}, empty if ssh -G failed
+    """
+    try:
+        result = subprocess.run(SSH_COMMAND + ['-G', host], capture_output=True, text=True,
+                                timeout=SSH_CONNECT_TIMEOUT_SECONDS)
+    except (subprocess.TimeoutExpired, OSError):
+        return {}
+    if result.returncode != 0:
+        return {}
+    config = {}
+    for line in result.stdout.splitlines():
+        option, _, value = line.partition(' ')
+        config.setdefault(option.lower(), value.strip())
+    return config
+
+
+def host_key_known(host):
+    """
+    Check whether a host's key is already in the known_hosts files ssh would use for it.
+
+    The name ssh looks up (HostKeyAlias or HostName, as [name]:port for
+    non-default ports) is resolved with ssh -G and searched with
+    ssh-keygen -F, which also matches hashed entries. Errors count as
+    unknown.
+
+    Args:
+        host: SSH destination (user@host or host)
+
+    Returns:
+        bool: True if a key for the host is known
+    """
+    config = ssh_config(host)
+    alias = config.get('hostkeyalias', 'none')
+    name = alias if alias != 'none' else config.get('hostname', host.split('@')[-1])
+    port = config.get('port', '22')
+    if port != '22':
+        name = f'[{name}]:{port}'
+
+    files = (config.get('userknownhostsfile', '~/.ssh/known_hosts') + ' ' +
+             config.get('globalknownhostsfile', '')).split()
+    for path in files:
+        path = os.path.expanduser(path)
+        if not os.path.isfile(path):
+            continue
+        try:
+            result = subprocess.run(['ssh-keygen', '-F', name, '-f', path], capture_output=True, text=True,
+                                    timeout=SSH_CONNECT_TIMEOUT_SECONDS)
+        except (subprocess.TimeoutExpired, OSError):
+            return False
+        if result.returncode == 0 and result.stdout.strip():
+            return True
+    return False
+
+
+def cancel_host(host):
+    """
+    Stop all work on a host.
+
+    Kills its running ssh/scp clients (their remote commands are killed when
+    the sessions close) and makes every later run_ssh(), popen_ssh() and
+    run_scp() to the host raise HostCancelled. The master connection is left
+    to close_all().
+
+    Args:
+        host: SSH destination as passed to run_ssh()
+    """
+    with _LOCK:
+        _CANCELLED.add(host)
+        processes = _PROCESSES.pop(host, set())
+    for process in processes:
+        _hang_up(process)
+        if process.poll() is None:
+            try:
+                process.kill()
+            except OSError:
+                pass  # Exited meanwhile
+
+
+def close_all():
+    """Shut down every master connection opened by this process."""
+    global _CONTROL_DIR
+    with _LOCK:
+        hosts = sorted(_HOSTS)
+        _HOSTS.clear()
+        control_dir = _CONTROL_DIR
+        _CONTROL_DIR = None
+    if control_dir is None:
+        return
+
+    for host in hosts:
+        try:
+            subprocess.run(
+                SSH_COMMAND + ['-o', f'ControlPath={control_dir}/%C', '-O', 'exit', host],
+                capture_output=True,
+                timeout=SSH_CONNECT_TIMEOUT_SECONDS
+            )
+        except (subprocess.TimeoutExpired, OSError):
+            pass  # Master already gone; ControlPersist closes it anyway
+    shutil.rmtree(control_dir, ignore_errors=True)
+
+
+atexit.register(close_all)
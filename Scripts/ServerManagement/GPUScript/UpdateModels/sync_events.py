@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Structured events and Prometheus metrics for sync_models_multi_server.py.
+
+Every event is appended to logs/sync-events.jsonl as one JSON object per
+line, so runs can be analysed without parsing the per-server logs:
+
+  {"ts": 1760000000.123, "run": "20251009-120000", "event": "transfer",
+   "server": "gpu-01", "file": "model.ckpt", "bytes": 123, "seconds": 4.5, ...}
+
+Events written by the sync:
+  run_start / run_end    one per run (run_end has the success count)
+  phase_start / phase_end per server phase (phase_end has "seconds")
+  server_end             final status of a server ("completed"/"failed", "seconds");
+                         a timed-out server reports again with the timeout as "error"
+  transfer               one download attempt ("bytes" actually downloaded, "seconds", "source", "ok";
+                         a resumed segmented download only counts the segments it fetched)
+  hash                   a hash computed from disk ("seconds", "ok", "kind", "size" of the file)
+  hash_mismatch, retry   verification problems of a file
+  file_done, file_failed outcome of each file ("source": nas, peer or local; file_done has its "size")
+  timing                 wall time of a fine-grained phase ("phase", "seconds"; see sync_profile.py)
+
+The same events feed counters and gauges that are rendered in the
+Prometheus text format (render_metrics()), written to a file
+(write_metrics_file(), e.g. for node_exporter's textfile collector) and/or
+served over HTTP (start_metrics_server()).
+
+Usage:
+  events = EventLog('logs/sync-events.jsonl')
+  events.emit('transfer', 'gpu-01', file='model.ckpt', bytes=123, seconds=4.5, source='nas', ok=True)
+  events.write_metrics_file('/var/lib/node_exporter/textfile/model_sync.prom')
+"""
+
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# Seconds between metrics file rewrites triggered by ordinary events
+METRICS_FILE_INTERVAL_SECONDS = 10
+
+# Metric name, type and help text, in output order
+METRICS = [
+    ('model_sync_files_total', 'counter', 'Files synced, by source (nas, peer, local)'),
+    ('model_sync_file_failures_total', 'counter', 'Files that failed after all retries'),
+    ('model_sync_transferred_bytes_total', 'counter', 'Bytes downloaded by successful transfers, by source'),
+    ('model_sync_transfer_seconds_total', 'counter', 'Time spent in transfers, by source'),
+    ('model_sync_transfers_total', 'counter', 'Transfer attempts, by source and result'),
+    ('model_sync_hash_seconds_total', 'counter', 'Time spent hashing files on disk'),
+    ('model_sync_hashes_total', 'counter', 'Hashes computed from disk'),
+    ('model_sync_hash_mismatches_total', 'counter', 'Downloads whose hash did not match the NAS CSV'),
+    ('model_sync_retries_total', 'counter', 'Download retries'),
+    ('model_sync_phase_seconds_total', 'counter', 'Time spent per sync phase'),
+    ('model_sync_files_planned', 'gauge', 'Files the server has to download in this run'),
+    ('model_sync_files_synced', 'gauge', 'Files downloaded and verified so far in this run'),
+    ('model_sync_server_state', 'gauge', '1 for the current state of the server (running, completed, failed)'),
+    ('model_sync_last_event_timestamp_seconds', 'gauge', 'Unix time of the last event'),
+]
+
+
+def _format_sample(name, labels, value):
+    """One exposition line: name{label="value",...} value"""
+    if labels:
+        escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in labels)
+        name += '{' + ','.join(f'{label}="{v}"' for (label, _), v in zip(labels, escaped)) + '}'
+    if isinstance(value, float):
+        value = round(value, 3)
+    return f'{name} {value}'
+
+
+class EventLog:
+    """Thread-safe JSON-lines event writer that also aggregates metrics."""
+
+    def __init__(self, path=None, run_id=None):
+        """
+        Args:
+            path: JSON-lines file to append events to (None: metrics only)
+            run_id: Identifier written into every event (default: start time)
+        """
+        self.lock = threading.Lock()
+        self.file = open(path, 'a') if path else None
+        self.run_id = run_id or time.strftime('%Y%m%d-%H%M%S')
+        self.metrics = {}     # {(name, ((label, value), ...)): value}
+        self.phases = {}      # {server: (phase, started_at)}
+        self.started = {}     # {server: started_at}
+        self.metrics_file = None  # Rewritten as events arrive (see write_metrics_file())
+        self.metrics_written = 0.0
+
+    def _add(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        self.metrics[key] = self.metrics.get(key, 0) + value
+
+    def _set(self, name, value, **labels):
+        self.metrics[(name, tuple(sorted(labels.items())))] = value
+
+    def _aggregate(self, event, server, fields):
+        """Update metrics for one event (lock held)."""
+        source = fields.get('source', 'nas')
+        if event == 'transfer':
+            result = 'ok' if fields.get('ok') else 'failed'
+            self._add('model_sync_transfers_total', 1, server=server, source=source, result=result)
+            self._add('model_sync_transfer_seconds_total', fields.get('seconds', 0), server=server, source=source)
+            if fields.get('ok'):
+                self._add('model_sync_transferred_bytes_total', fields.get('bytes', 0), server=server, source=source)
+        elif event == 'hash':
+            self._add('model_sync_hashes_total', 1, server=server)
+            self._add('model_sync_hash_seconds_total', fields.get('seconds', 0), server=server)
+        elif event == 'hash_mismatch':
+            self._add('model_sync_hash_mismatches_total', 1, server=server)
+        elif event == 'retry':
+            self._add('model_sync_retries_total', 1, server=server)
+        elif event == 'file_done':
+            self._add('model_sync_files_total', 1, server=server, source=source)
+        elif event == 'file_failed':
+            self._add('model_sync_file_failures_total', 1, server=server)
+        elif event == 'phase_end':
+            self._add('model_sync_phase_seconds_total', fields.get('seconds', 0), server=server, phase=fields['phase'])
+
+    def emit(self, event, server=None, **fields):
+        """
+        Record one event.
+
+        Args:
+            event: Event name (see module docstring)
+            server: Server hostname the event belongs to (None for run events)
+            **fields: JSON-serializable event fields
+        """
+        now = time.time()
+        record = {'ts': round(now, 3), 'run': self.run_id, 'event': event}
+        if server:
+            record['server'] = server
+        record.update(fields)
+        line = json.dumps(record, default=str)
+        with self.lock:
+            self._aggregate(event, server, fields)
+            self._set('model_sync_last_event_timestamp_seconds', round(now, 3))
+            if self.file:
+                self.file.write(line + '\n')
+                self.file.flush()
+            write_metrics = self.metrics_file and now - self.metrics_written >= METRICS_FILE_INTERVAL_SECONDS
+            if write_metrics:
+                self.metrics_written = now
+        if write_metrics:
+            self.write_metrics_file(self.metrics_file)
+
+    def progress(self, server, phase, status, files_synced=0, total_files=0, error_msg=None):
+        """
+        Turn a progress update into phase and server events.
+
+        Emits phase_end/phase_start when the server's phase changes and
+        server_end once it completes or fails; also updates the per-server
+        gauges. Updates within the same phase only move the gauges.
+        """
+        now = time.monotonic()
+        with self.lock:
+            previous = self.phases.get(server)
+            self.started.setdefault(server, now)
+            if status == 'running':
+                self._set('model_sync_files_synced', files_synced, server=server)
+                self._set('model_sync_files_planned', total_files, server=server)
+        if previous and previous[0] == phase and status == 'running':
+            return
+
+        if previous:
+            self.emit('phase_end', server, phase=previous[0], seconds=round(now - previous[1], 3))
+        with self.lock:
+            for state in ('running', 'completed', 'failed'):
+                self._set('model_sync_server_state', 1 if state == status else 0, server=server, state=state)
+            if status == 'running':
+                self.phases[server] = (phase, now)
+            else:
+                self.phases.pop(server, None)
+                seconds = round(now - self.started[server], 3)
+        if status == 'running':
+            self.emit('phase_start', server, phase=phase)
+        else:
+            fields = {'status': status, 'seconds': seconds, 'files_synced': files_synced, 'total_files': total_files}
+            if error_msg:
+                fields['error'] = error_msg
+            self.emit('server_end', server, **fields)
+        if self.metrics_file:
+            self.write_metrics_file(self.metrics_file)  # Phase changes are always exported
+
+    def render_metrics(self):
+        """
+        Current metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: Metrics text
+        """
+        with self.lock:
+            metrics = dict(self.metrics)
+        lines = []
+        for name, metric_type, help_text in METRICS:
+            samples = sorted((labels, value) for (metric, labels), value in metrics.items() if metric == name)
+            if not samples:
+                continue
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            lines.extend(_format_sample(name, labels, value) for labels, value in samples)
+        return '\n'.join(lines) + '\n'
+
+    def write_metrics_file(self, path):
+        """Atomically write the metrics to path (temp file + rename)."""
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w') as f:
+            f.write(self.render_metrics())
+        os.replace(temp_path, path)
+
+    def close(self):
+        """Close the event file and write the metrics file one last time."""
+        if self.metrics_file:
+            self.write_metrics_file(self.metrics_file)
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+
+
+def start_metrics_server(event_log, port, bind='0.0.0.0'):
+    """
+    Serve event_log's metrics at http://<bind>:<port>/metrics from a daemon thread.
+
+    Returns:
+        ThreadingHTTPServer: The running server (call shutdown() to stop it)
+    """
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            body = event_log.render_metrics().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((bind, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -13,13 +13,15 @@ Workflow:
 5. Download NAS sha256-list.csv as source of truth
 6. For each GPU server:
    a. Force refresh L1 (filesize) on GPU server (unless --skip-l1-refresh)
-   b. Update checksums on GPU server using compare_checksums.py
+   b. Update checksums on GPU server using compare_checksums.update_directory()
    c. Compare GPU server CSV with NAS CSV at all levels (L1, L2, L3)
    d. Download missing/corrupted files from NAS HTTP server
-      - Downloads to models_path_1 (fast NVMe)
-      - If free space < 100G, moves file to models_path_2 (overflow)
-      - Updates sha256sum in CSV immediately after each file download
-   e. Run 'compare_checksums.py all' to fill in L1/L2 checksums for downloaded files
+      - Each file is placed before download, from one free-space check of both paths:
+        models_path_1 (fast NVMe) while it keeps 100G free, models_path_2 (overflow) after that
+      - Several files transfer at once; each is hash-verified as soon as it lands
+      - Journals each verified sha256sum on the GPU server right after the download and
+        applies the journal to sha256-list.csv every 50 files and at the end
+   e. Update all levels ('all') to fill in L1/L2 checksums for downloaded files
 7. Stop NAS HTTP server
 
 Usage:
@@ -38,30 +40,117 @@ Usage:
   # Skip L1 (filesize) refresh for faster sync
   python3 sync_models_multi_server.py --skip-l1-refresh
 
+  # Download 4 files at a time per server (default: 2)
+  python3 sync_models_multi_server.py --transfers 4
+
+  # Parallel sync with at most 6 NAS transfers fleet-wide, 200 MB/s per server
+  python3 sync_models_multi_server.py --parallel --nas-transfers 6 --limit-rate 200
+
+  # Parallel sync where servers that already have a file seed it to their peers
+  python3 sync_models_multi_server.py --parallel --fanout
+
+  # Parallel sync of at most 50 servers at a time, giving up on a server after 3 hours
+  python3 sync_models_multi_server.py --parallel --server-workers 50 --server-timeout 180
+
+  # Continue an interrupted sync, skipping finished phases and verified files
+  python3 sync_models_multi_server.py --parallel --resume
+
+  # Export Prometheus metrics to a node_exporter textfile and on port 9310
+  python3 sync_models_multi_server.py --parallel --metrics-file /var/lib/node_exporter/model_sync.prom --metrics-port 9310
+
 Notes:
   - NAS HTTP server is automatically started/stopped by this script
-  - SSH access is checked sequentially before NAS startup or parallel sync
+  - SSH access is checked before NAS startup: hosts with known keys in parallel, new host
+    keys are enrolled one host at a time
   - New host keys are accepted; changed host keys are rejected
   - Passwordless SSH authentication is required
+  - One multiplexed SSH connection per host (ssh_pool.py) is reused for all commands and scp
   - Each GPU server must already have models_path_1/sha256-list.csv
   - Missing or inaccessible checksum lists fail that server without a full sync
   - In parallel mode, detailed output goes to logs/sync-{hostname}.log files
+  - Parallel mode is coordinated by an asyncio event loop: each server is a task,
+    its blocking sync runs in a pool of --server-workers threads (default: one per
+    server; beyond that the others wait in the queue without a thread, and their
+    --server-timeout starts when they begin), and progress arrives as ordered events
+  - --server-timeout, Ctrl-C and SIGTERM cancel a server's task: its ssh/scp clients
+    are killed and every remote command is killed with its process group when its
+    SSH session closes (ssh_pool.py), so no wget or sha256sum is left running
   - Terminal shows real-time progress updates every 30 seconds
-  - wget uses dot format (--progress=dot:mega) for cleaner logs
+  - Each server downloads --transfers files at once while up to --verify-workers
+    downloaded files are hashed, so transfer and verification overlap
+  - wget uses dot format (--progress=dot:mega) for cleaner logs with one transfer,
+    and --no-verbose (one line per file) with several
+  - Downloads are hashed while they stream to disk (wget | tee | sha256sum), so a
+    verified file is read only once; files are re-read from disk only to recompute
+    after a mismatch (--no-inline-hash restores the separate sha256sum pass)
+  - Transfers from one NAS are granted by a shared scheduler (transfer_scheduler.py):
+    at most --nas-transfers across all servers and --transfers per server; the most
+    starved server goes first, then the smallest file. Each server's files are
+    queued smallest first
+  - --limit-rate caps each GPU server's download bandwidth (MB/s); each transfer gets
+    what its running transfers leave of the cap (the whole cap when it runs alone),
+    at least an even split
+  - With --fanout, every GPU server runs fanout_seed_server.py (port --fanout-port)
+    and serves the files it has verified against the NAS CSV to peers in its
+    group (5th column of gpu_servers.csv, default: hostname prefix). Each file is
+    pulled from the NAS once per group and spreads from server to server as a
+    tree (--fanout-uploads peers per seed); peer copies are verified against the
+    NAS hash and fall back to the NAS on failure (fanout.py)
+  - Files whose sha256 matches a file the GPU server already holds under another
+    name (re-exports, renamed LoRAs) are not downloaded: they are reflinked,
+    hard-linked or copied (e.g. from the overflow path) from that local copy.
+    Downloads always write a new file, so hard-linked copies are never modified
+  - Files of 1 GB or more are fetched by segmented_download.py on the GPU server:
+    parallel HTTP Range requests into a preallocated file, resumable through
+    <file>.segments.json, hashed as the segments land (--segment-connections)
   - By default, L1 (filesize) is force-refreshed on each GPU server before comparison
   - Use --skip-l1-refresh to use cached filesize values (faster but may miss changes)
-  - Downloads go to models_path_1 first (fast). If free space < 100G, files are moved to models_path_2
+  - Forced refreshes only recompute files whose (inode, size, mtime) changed since the
+    value was computed (stat cache in logs/sha256-list-{hostname}.statcache.json)
+  - Verified checksums are appended to sha256-list.csv.sync-journal on the GPU server and
+    folded into the CSV in one atomic rewrite per batch (compare_checksums.py compact);
+    a journal left by an interrupted sync is applied before the next one starts
+  - Downloads are written directly to their planned path: models_path_1 (fast) while it keeps
+    100G free after the file (NAS CSV filesize), models_path_2 after that. A stale copy
+    of the same file in the other path is removed once the new one is verified
+  - compare_checksums.py is called in-process; its output goes to the server's log file
+  - Each sync records its run id, finished phases and verified files in logs/state-{hostname}.json
+    (sync_state.py). --resume continues the most recent run: it skips the checksum update and
+    the verified files when the server's state belongs to that run, did not complete and
+    matches the server and the NAS CSV (by sha256); otherwise the server starts over
+  - Every run appends structured events (phases, transfers with bytes and seconds, hash
+    times, retries, failures) to logs/sync-events.jsonl, one JSON object per line, and
+    can export the derived metrics in the Prometheus text format (--metrics-file,
+    --metrics-port); see sync_events.py
+  - The summary ends with a timing report: wall time per phase per server (L1 refresh,
+    L3 hashing, CSV comparison, download, final update), bytes and throughput, and the
+    server and phase on the critical path (sync_profile.py)
 """
 
 import os
+import re
+import shlex
 import sys
 import subprocess
 import argparse
+import asyncio
+import signal
 import threading
 import time
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from compare_checksums import DEFAULT_REMOTE_SCRIPTS_DIR, diff_checksums, files_to_fix, format_journal, read_csv, sync_journal_path, update_directory
+from segmented_download import DEFAULT_CONNECTIONS as DEFAULT_SEGMENT_CONNECTIONS, DEFAULT_MIN_SIZE as SEGMENTED_MIN_SIZE, resume_map_path
+from fanout import DEFAULT_UPLOADS_PER_SEED, SeedRegistry, default_group
+from fanout_seed_server import DEFAULT_PORT as DEFAULT_FANOUT_PORT
+from ssh_pool import cancel_host, host_key_known, popen_ssh, run_scp, run_ssh
+from sync_events import EventLog, start_metrics_server
+from sync_profile import SyncProfile
+from sync_state import SyncState, latest_run, new_run, state_path
+from transfer_scheduler import BandwidthShare, DEFAULT_MAX_ACTIVE as DEFAULT_NAS_TRANSFERS, TransferScheduler
+
 # Configuration
 NAS_HOST = "root@dt-thpc-nas01"
 NAS_IP = "64.71.166.2"
@@ -73,14 +162,82 @@ SCRIPT_DIR = Path(__file__).parent
 DRY_RUN = False
 SKIP_L1_REFRESH = False
 
-# SSH preflight configuration
-SSH_CONNECT_TIMEOUT_SECONDS = 10
+# Continue from logs/state-{hostname}.json (see sync_state.py)
+RESUME = False
+
+# (run id, start time) of this fleet sync, recorded in every state file
+RUN = new_run()
+
+# Per-server download pipeline: concurrent wget transfers and hash verifications
+DEFAULT_TRANSFERS = 2
+DEFAULT_VERIFY_WORKERS = 2
+TRANSFERS = DEFAULT_TRANSFERS
+VERIFY_WORKERS = DEFAULT_VERIFY_WORKERS
+
+# Concurrent transfers from one NAS across all GPU servers (see transfer_scheduler.py)
+NAS_TRANSFERS = DEFAULT_NAS_TRANSFERS
+
+# Download bandwidth cap per GPU server in MB/s (0 = unlimited)
+LIMIT_RATE_MBPS = 0
+
+# One scheduler per NAS URL, shared by all server threads
+TRANSFER_SCHEDULERS = {}
+TRANSFER_SCHEDULERS_LOCK = threading.Lock()
+
+# Peer-to-peer fan-out (see fanout.py): seed registry, created by --fanout
+SEED_REGISTRY = None
+FANOUT_PORT = DEFAULT_FANOUT_PORT
+FANOUT_UPLOADS = DEFAULT_UPLOADS_PER_SEED
+
+# Per-server transfer limit for peer downloads (they do not load the NAS)
+PEER_SCHEDULER = None
+
+# Fan-out group per remote host (user@host), filled by load_gpu_servers()
+SERVER_GROUPS = {}
+
+# Running seed servers: {user@host: Popen or None if it failed to start}
+SEED_SERVERS = {}
+SEED_SERVERS_LOCK = threading.Lock()
+
+# Hash downloads while they stream to disk (see --no-inline-hash)
+INLINE_HASH = True
+
+# Parallel HTTP Range connections for files >= SEGMENTED_MIN_SIZE (<= 1 disables)
+SEGMENT_CONNECTIONS = DEFAULT_SEGMENT_CONNECTIONS
+
+# SSH preflight configuration (connect timeout and BatchMode come from ssh_pool)
 SSH_COMMAND_TIMEOUT_SECONDS = 20
 
+# Hosts looked up / probed at once by the SSH preflight (new host keys are enrolled one at a time)
+SSH_PREFLIGHT_WORKERS = 32
+
+# Parallel mode: servers whose blocking sync runs at once (one worker thread
+# each; 0 = all servers at once)
+DEFAULT_SERVER_WORKERS = 0
+SERVER_WORKERS = DEFAULT_SERVER_WORKERS
+
+# Parallel mode: minutes before a server's sync is cancelled (0 = no limit)
+SERVER_TIMEOUT_MINUTES = 0
+
+# Seconds a cancelled server's worker gets to unwind after its processes are killed
+CANCEL_GRACE_SECONDS = 30
+
+# Seconds between status tables in parallel mode
+PROGRESS_INTERVAL_SECONDS = 30
+
 # Global progress tracking for parallel mode
 PROGRESS_LOCK = threading.Lock()
 PROGRESS_DATA = {}  # {server: {"phase": str, "files_synced": int, "total_files": int, "status": str}}
 
+# Parallel mode: callable(server, data) posting progress to the event loop (None = update PROGRESS_DATA directly)
+PROGRESS_SINK = None
+
+# Structured event log and metrics (see sync_events.py), opened by main()
+EVENT_LOG = None
+
+# Phase timers and byte counters for the end-of-run report (see sync_profile.py)
+PROFILE = None
+
 
 def print_step(step, total, message):
     """Print step header"""
@@ -100,14 +257,50 @@ def update_progress(server, phase, files_synced=0, total_files=0, status="runnin
         status: Status ("running", "completed", "failed")
         error_msg: Optional error message when status is "failed"
     """
+    data = {
+        "phase": phase,
+        "files_synced": files_synced,
+        "total_files": total_files,
+        "status": status,
+        "error_msg": error_msg
+    }
+    if EVENT_LOG:
+        EVENT_LOG.progress(server, phase, status, files_synced, total_files, error_msg)
+    sink = PROGRESS_SINK
+    if sink:
+        sink(server, data)
+        return
     with PROGRESS_LOCK:
-        PROGRESS_DATA[server] = {
-            "phase": phase,
-            "files_synced": files_synced,
-            "total_files": total_files,
-            "status": status,
-            "error_msg": error_msg
-        }
+        PROGRESS_DATA[server] = data
+
+
+def emit_event(event, hostname, **fields):
+    """Record a structured event for a server (no-op without an event log)
+
+    Args:
+        event: Event name (see sync_events.py)
+        hostname: Server as hostname or user@hostname
+        **fields: JSON-serializable event fields
+    """
+    if EVENT_LOG:
+        EVENT_LOG.emit(event, hostname.split('@')[-1], **fields)
+    if PROFILE:
+        PROFILE.record(event, hostname.split('@')[-1], **fields)
+
+
+@contextmanager
+def timed_phase(hostname, phase):
+    """Report the wall time of a phase of a server as a "timing" event
+
+    Args:
+        hostname: Server as hostname, user@hostname or user@hostname:/path
+        phase: Phase name (see sync_profile.py)
+    """
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        emit_event("timing", hostname.split(':')[0], phase=phase, seconds=round(time.monotonic() - started, 3))
 
 
 def log_print(log_file, message, also_print=False):
@@ -125,8 +318,85 @@ def log_print(log_file, message, also_print=False):
         print(message)
 
 
+class ThreadOutputRouter:
+    """File-like sys.stdout/sys.stderr replacement that routes writes per thread
+
+    Threads inside output_to_log() write to their log file; all other threads
+    write to the original stream.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def _target(self):
+        return getattr(self.local, 'target', None) or self.stream
+
+    def write(self, data):
+        return self._target().write(data)
+
+    def flush(self):
+        self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+OUTPUT_ROUTER_LOCK = threading.Lock()
+
+
+@contextmanager
+def output_to_log(log_file):
+    """Send print() output of the current thread to log_file
+
+    Used around in-process compare_checksums calls so their output lands in
+    the per-server log, as it did when they ran as child processes.
+
+    Args:
+        log_file: File object to write to (None leaves output unchanged)
+    """
+    if not log_file:
+        yield
+        return
+
+    with OUTPUT_ROUTER_LOCK:
+        if not isinstance(sys.stdout, ThreadOutputRouter):
+            sys.stdout = ThreadOutputRouter(sys.stdout)
+        if not isinstance(sys.stderr, ThreadOutputRouter):
+            sys.stderr = ThreadOutputRouter(sys.stderr)
+    routers = (sys.stdout, sys.stderr)
+
+    previous = [getattr(router.local, 'target', None) for router in routers]
+    for router in routers:
+        router.local.target = log_file
+    try:
+        yield
+    finally:
+        for router, target in zip(routers, previous):
+            router.local.target = target
+        log_file.flush()
+
+
+def get_transfer_scheduler(http_url):
+    """Get the shared transfer scheduler for a NAS URL (created on first use)
+
+    Args:
+        http_url: Base URL of the NAS HTTP server
+
+    Returns:
+        TransferScheduler: Limits NAS_TRANSFERS overall and TRANSFERS per server
+    """
+    with TRANSFER_SCHEDULERS_LOCK:
+        if http_url not in TRANSFER_SCHEDULERS:
+            TRANSFER_SCHEDULERS[http_url] = TransferScheduler(NAS_TRANSFERS, TRANSFERS)
+        return TRANSFER_SCHEDULERS[http_url]
+
+
 def display_progress_status():
     """Display current progress status for all servers (thread-safe)"""
+    with TRANSFER_SCHEDULERS_LOCK:
+        schedulers = sorted(TRANSFER_SCHEDULERS.items())
+
     with PROGRESS_LOCK:
         if not PROGRESS_DATA:
             return
@@ -169,17 +439,27 @@ def display_progress_status():
 
             print(f"[{hostname:15}] {status_text:40} | Log: {log_file_name}")
 
+        for http_url, scheduler in schedulers:
+            active, waiting = scheduler.status()
+            print(f"NAS {http_url}: {active}/{scheduler.max_active} transfers active, {waiting} waiting")
+        if PEER_SCHEDULER:
+            active, waiting = PEER_SCHEDULER.status()
+            print(f"Peers: {active} transfers active, {waiting} waiting")
+
         print("="*70)
 
 
 def load_gpu_servers(filepath="gpu_servers.csv"):
     """Load GPU servers from CSV file
 
-    Format: remote_host, models_path_1, models_path_2 [, nas_url]
+    Format: remote_host, models_path_1, models_path_2 [, nas_url [, fanout_group]]
     Example: root@dfw-026-001, /mnt/models, /mnt/loraModels/models_extra
              root@dt-thpc-001, /mnt/models/official-models, /mnt/models/official-models, 192.168.88.14:8000
+             root@dfw-043-003, /mnt/models, /mnt/loraModels/models_extra, , rack-043
 
-    Downloads go to models_path_1 (fast). If free space < 100G, files are moved to models_path_2.
+    Downloads go to models_path_1 (fast) while it keeps 100G free, then to models_path_2.
+    The fan-out group (--fanout) of each host is stored in SERVER_GROUPS; an
+    empty nas_url means the default NAS.
 
     Lines starting with # are treated as comments.
 
@@ -216,7 +496,8 @@ def load_gpu_servers(filepath="gpu_servers.csv"):
             remote_host = row[0]
             models_path_1 = row[1]
             models_path_2 = row[2]
-            custom_nas_url = row[3] if len(row) >= 4 else None
+            custom_nas_url = row[3] if len(row) >= 4 and row[3] else None
+            fanout_group = row[4] if len(row) >= 5 and row[4] else default_group(remote_host, custom_nas_url)
 
             # Validate format: user@hostname
             if '@' not in remote_host:
@@ -235,6 +516,7 @@ def load_gpu_servers(filepath="gpu_servers.csv"):
 
             server_with_path = f"{remote_host}:{models_path_1}"
             servers.append((server_with_path, models_path_2, custom_nas_url))
+            SERVER_GROUPS[remote_host] = fanout_group
 
     print(f"✅ Loaded {len(servers)} GPU server(s)")
 
@@ -254,11 +536,50 @@ def load_gpu_servers(filepath="gpu_servers.csv"):
     return servers
 
 
+def probe_ssh_access(remote_host):
+    """Run a no-op command on a host with BatchMode and accept-new host keys
+
+    This also opens the shared connection reused by the rest of the sync.
+
+    Args:
+        remote_host: SSH destination (user@host)
+
+    Returns:
+        str or None: Error message, or None if access works
+    """
+    extra_options = [
+        '-T',
+        '-o', 'StrictHostKeyChecking=accept-new',
+        '-o', 'ConnectionAttempts=1',
+    ]
+    try:
+        result = run_ssh(
+            remote_host,
+            'true',
+            extra_options,
+            capture_output=True,
+            text=True,
+            timeout=SSH_COMMAND_TIMEOUT_SECONDS
+        )
+    except subprocess.TimeoutExpired:
+        return f"timed out after {SSH_COMMAND_TIMEOUT_SECONDS} seconds"
+
+    if result.returncode == 0:
+        return None
+    stderr_lines = [line.strip() for line in result.stderr.splitlines() if line.strip()]
+    return stderr_lines[-1] if stderr_lines else f"ssh exited with code {result.returncode}"
+
+
 def check_gpu_server_ssh_access(servers):
     """Verify non-interactive SSH access to every configured GPU server.
 
-    Hosts are checked sequentially so first-time host-key enrollment cannot
-    produce overlapping prompts when the actual sync runs in parallel.
+    Runs in two phases so dead or slow hosts do not add up:
+    1. All hosts are looked up in known_hosts concurrently (ssh -G and
+       ssh-keygen -F, no connection; see ssh_pool.host_key_known()).
+    2. Hosts with a known key are probed in parallel (up to
+       SSH_PREFLIGHT_WORKERS at once). Hosts that still need their key
+       enrolled are probed one after another, so first-time enrollment
+       cannot produce overlapping prompts.
     StrictHostKeyChecking=accept-new adds previously unseen keys while still
     rejecting changed keys. BatchMode verifies that later sync commands will
     not depend on password or passphrase prompts.
@@ -280,41 +601,37 @@ def check_gpu_server_ssh_access(servers):
     print("\n🔐 Checking non-interactive SSH access to GPU servers...")
     print("   New host keys will be added to ~/.ssh/known_hosts; changed keys will be rejected.")
 
+    workers = max(1, min(len(remote_hosts), SSH_PREFLIGHT_WORKERS))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        known = dict(zip(remote_hosts, executor.map(host_key_known, remote_hosts)))
+    known_hosts = [remote_host for remote_host in remote_hosts if known[remote_host]]
+    new_hosts = [remote_host for remote_host in remote_hosts if not known[remote_host]]
+
     failures = []
-    for index, remote_host in enumerate(remote_hosts, 1):
-        print(f"   [{index}/{len(remote_hosts)}] {remote_host}... ", end='', flush=True)
-        command = [
-            'ssh',
-            '-T',
-            '-o', 'BatchMode=yes',
-            '-o', 'StrictHostKeyChecking=accept-new',
-            '-o', f'ConnectTimeout={SSH_CONNECT_TIMEOUT_SECONDS}',
-            '-o', 'ConnectionAttempts=1',
-            remote_host,
-            'true'
-        ]
+    index = 0
+    if known_hosts:
+        print(f"   Probing {len(known_hosts)} host(s) with known keys in parallel...")
+        with ThreadPoolExecutor(max_workers=min(len(known_hosts), workers)) as executor:
+            errors = list(executor.map(probe_ssh_access, known_hosts))
+        for remote_host, error in zip(known_hosts, errors):
+            index += 1
+            if error is None:
+                print(f"   [{index}/{len(remote_hosts)}] {remote_host}... ✅ Access confirmed")
+            else:
+                print(f"   [{index}/{len(remote_hosts)}] {remote_host}... ❌ {error}")
+                failures.append((remote_host, error))
 
-        try:
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=True,
-                timeout=SSH_COMMAND_TIMEOUT_SECONDS
-            )
-        except subprocess.TimeoutExpired:
-            error = f"timed out after {SSH_COMMAND_TIMEOUT_SECONDS} seconds"
+    if new_hosts:
+        print(f"   Enrolling {len(new_hosts)} host(s) without a known key one at a time...")
+    for remote_host in new_hosts:
+        index += 1
+        print(f"   [{index}/{len(remote_hosts)}] {remote_host}... ", end='', flush=True)
+        error = probe_ssh_access(remote_host)
+        if error is None:
+            print("✅ Access confirmed (host key enrolled)")
+        else:
             print(f"❌ {error}")
             failures.append((remote_host, error))
-            continue
-
-        if result.returncode == 0:
-            print("✅ Access confirmed")
-            continue
-
-        stderr_lines = [line.strip() for line in result.stderr.splitlines() if line.strip()]
-        error = stderr_lines[-1] if stderr_lines else f"ssh exited with code {result.returncode}"
-        print(f"❌ {error}")
-        failures.append((remote_host, error))
 
     if failures:
         print("\n❌ SSH access check failed:")
@@ -327,6 +644,66 @@ def check_gpu_server_ssh_access(servers):
     return True
 
 
+def journal_remote_checksum(hostname, path, filename, sha256sum):
+    """Append a verified checksum to the GPU server's CSV journal (O(1) per file)
+
+    The new file's 8K hash and size are cleared so the final 'all' pass
+    recomputes them for the new content. The append holds the CSV's lock
+    file (flock(1)), so it cannot land in a journal a compaction is folding.
+
+    Args:
+        hostname: SSH hostname (user@host)
+        path: Directory holding sha256-list.csv
+        filename: Downloaded file
+        sha256sum: Verified SHA256
+
+    Returns:
+        subprocess.CompletedProcess: Result of the append
+    """
+    csv_file = f"{path}/sha256-list.csv"
+    lines = format_journal([(filename, 'sha256sum', sha256sum), (filename, '8k_sha256sum', ''), (filename, 'filesize', '')])
+    journal_cmd = f'(flock 9; printf %s {shlex.quote(lines)} >> {shlex.quote(sync_journal_path(csv_file))}) ' \
+                  f'9>>{shlex.quote(csv_file + ".lock")}'
+    return run_ssh(
+        hostname, journal_cmd,
+        text=True,
+        capture_output=True,
+        timeout=60
+    )
+
+
+def apply_remote_checksum_journal(hostname, path, log_file=None):
+    """Apply the GPU server's CSV journal to sha256-list.csv in one atomic rewrite
+
+    Runs compare_checksums.py compact on the GPU server, which writes a
+    sorted CSV to a host/process-unique temp file, fsyncs and renames it.
+    Does nothing (without starting Python) when there is no journal.
+
+    Args:
+        hostname: SSH hostname (user@host)
+        path: Directory holding sha256-list.csv
+        log_file: Optional file object to write logs to
+
+    Returns:
+        bool: True if the journal was applied or there was none
+    """
+    journal_file = sync_journal_path(f"{path}/sha256-list.csv")
+    compact_cmd = f'ls "{journal_file}"* >/dev/null 2>&1 || exit 0; ' \
+                  f'python3 "{DEFAULT_REMOTE_SCRIPTS_DIR}/compare_checksums.py" compact "{path}"'
+    result = run_ssh(
+        hostname, compact_cmd,
+        text=True,
+        capture_output=True,
+        timeout=300
+    )
+    if result.returncode != 0:
+        log_print(log_file, f"   ⚠️  Failed to apply checksum journal: {(result.stderr or result.stdout).strip()}")
+        return False
+    if result.stdout.strip():
+        log_print(log_file, f"   ✅ {result.stdout.strip()}")
+    return True
+
+
 def update_gpu_server_checksums(gpu_server, log_file=None, refresh_l1=True):
     """Update checksums on GPU server using compare_checksums.py
 
@@ -361,11 +738,12 @@ def update_gpu_server_checksums(gpu_server, log_file=None, refresh_l1=True):
             log_print(log_file, f"   ❌ Could not invalidate local checksum cache: {e}")
             return None
 
-        result = subprocess.run(
-            ['scp', remote_csv, gpu_csv_local],
-            capture_output=True,
-            text=True
-        )
+        with timed_phase(gpu_server, "fetch_csv"):
+            result = run_scp(
+                remote_csv, gpu_csv_local,
+                capture_output=True,
+                text=True
+            )
 
         if result.returncode == 0:
             log_print(log_file, f"   ✅ Downloaded existing checksums to: {gpu_csv_local}")
@@ -379,43 +757,32 @@ def update_gpu_server_checksums(gpu_server, log_file=None, refresh_l1=True):
 
         return gpu_csv_local
 
+    # Apply checksums journaled by an interrupted sync before reading the CSV
+    remote_host, server_path = gpu_server.split(':')
+    with timed_phase(gpu_server, "journal"):
+        journal_applied = apply_remote_checksum_journal(remote_host, server_path, log_file)
+    if not journal_applied:
+        return None
+
     # If refresh_l1 is True and not skipped globally, force refresh L1 (filesize)
     if refresh_l1 and not SKIP_L1_REFRESH:
         log_print(log_file, f"   🔄 Refreshing L1 (filesize) on GPU server...")
-        cmd_l1 = [
-            'python3',
-            str(SCRIPT_DIR / 'compare_checksums.py'),
-            'L1',
-            '--force',
-            gpu_server
-        ]
 
-        if log_file:
-            result = subprocess.run(cmd_l1, text=True, stdout=log_file, stderr=log_file)
-        else:
-            result = subprocess.run(cmd_l1, text=True)
+        with timed_phase(gpu_server, "l1_refresh"), output_to_log(log_file):
+            refreshed_csv = update_directory(gpu_server, 'L1', force=True)
 
-        if result.returncode != 0:
-            log_print(log_file, f"   ❌ L1 refresh failed with code {result.returncode}")
+        if refreshed_csv is None:
+            log_print(log_file, f"   ❌ L1 refresh failed")
             return None
         else:
             log_print(log_file, f"   ✅ L1 (filesize) refreshed")
 
     # Run standard checksum update (L3 by default, fills in missing values)
-    cmd = [
-        'python3',
-        str(SCRIPT_DIR / 'compare_checksums.py'),
-        gpu_server
-    ]
+    with timed_phase(gpu_server, "l3_hash"), output_to_log(log_file):
+        updated_csv = update_directory(gpu_server)
 
-    # Stream output to log file if provided, otherwise to stdout
-    if log_file:
-        result = subprocess.run(cmd, text=True, stdout=log_file, stderr=log_file)
-    else:
-        result = subprocess.run(cmd, text=True)
-
-    if result.returncode != 0:
-        log_print(log_file, f"   ❌ Checksum update failed with code {result.returncode}")
+    if updated_csv is None:
+        log_print(log_file, f"   ❌ Checksum update failed")
         return None
 
     log_print(log_file, f"   ✅ GPU server checksums updated: {gpu_csv_local}")
@@ -425,8 +792,7 @@ def update_gpu_server_checksums(gpu_server, log_file=None, refresh_l1=True):
 def get_files_to_download(gpu_csv_local, nas_csv_local, log_file=None):
     """Compare GPU server CSV with NAS CSV to get list of files to download
 
-    Uses 'all' level to compare at all levels (L1, L2, L3) for comprehensive
-    detection of missing or corrupted files.
+    Compares at L3 (sha256sum) in-process with compare_checksums.diff_checksums.
 
     Args:
         gpu_csv_local: Local path to GPU server CSV
@@ -449,22 +815,13 @@ def get_files_to_download(gpu_csv_local, nas_csv_local, log_file=None):
 
     # Use L3 (sha256sum) comparison only - this checks actual file content
     # Using 'all' would also check L2 (8k_sha256sum) which may not be populated
-    cmd = [
-        'python3',
-        str(SCRIPT_DIR / 'compare_checksums.py'),
-        'L3',
-        gpu_csv_local,
-        nas_csv_local
-    ]
+    with output_to_log(log_file):
+        diffs = diff_checksums(gpu_csv_local, nas_csv_local, 'L3')
+    files_to_download = files_to_fix(diffs)
 
-    result = subprocess.run(cmd, capture_output=True, text=True)
-
-    # Parse output - each line is a filename to download
-    files_to_download = []
-    for line in result.stdout.strip().split('\n'):
-        line = line.strip()
-        if line and not line.startswith('#'):
-            files_to_download.append(line)
+    mismatched = sum(1 for diff in diffs if diff.kind == 'mismatch')
+    if mismatched:
+        log_print(log_file, f"   ⚠️  {mismatched} file(s) with SHA256 different from NAS")
 
     if DRY_RUN:
         log_print(log_file, f"   ✅ Found {len(files_to_download)} file(s) that would be downloaded")
@@ -497,8 +854,8 @@ def start_nas_http_server():
 
     # Check if already running
     print(f"   Checking if server is already running...")
-    result = subprocess.run(
-        ['ssh', '-T', NAS_HOST, f'lsof -ti:{nas_bind_port}'],
+    result = run_ssh(
+        NAS_HOST, f'lsof -ti:{nas_bind_port}', ['-T'],
         capture_output=True,
         text=True
     )
@@ -536,8 +893,8 @@ http {{
 NGINX_EOF
 nginx -c /tmp/nginx.conf'''
 
-    subprocess.run(
-        ['ssh', '-T', NAS_HOST, start_cmd],
+    run_ssh(
+        NAS_HOST, start_cmd, ['-T'],
         capture_output=True
     )
 
@@ -548,8 +905,8 @@ nginx -c /tmp/nginx.conf'''
 
     # Verify it's listening
     print(f"   Verifying server is listening...")
-    result = subprocess.run(
-        ['ssh', '-T', NAS_HOST, f'lsof -ti:{nas_bind_port}'],
+    result = run_ssh(
+        NAS_HOST, f'lsof -ti:{nas_bind_port}', ['-T'],
         capture_output=True,
         text=True
     )
@@ -575,8 +932,8 @@ def stop_nas_http_server():
 
     # Use nginx -s stop for graceful shutdown
     print(f"   Stopping nginx...")
-    subprocess.run(
-        ['ssh', '-T', NAS_HOST, 'nginx -s stop 2>/dev/null || true'],
+    run_ssh(
+        NAS_HOST, 'nginx -s stop 2>/dev/null || true', ['-T'],
         capture_output=True,
         text=True
     )
@@ -686,6 +1043,22 @@ def load_nas_checksums(nas_csv_local):
     return checksums
 
 
+def load_nas_filesizes(nas_csv_local):
+    """Load file sizes from NAS CSV file
+
+    Args:
+        nas_csv_local: Path to NAS CSV file
+
+    Returns:
+        dict: {filename: filesize} for entries with a known size
+    """
+    return {
+        filename: data['filesize']
+        for filename, data in read_csv(nas_csv_local).items()
+        if isinstance(data['filesize'], int)
+    }
+
+
 def compute_remote_hash(hostname, filepath, log_file=None):
     """Compute SHA256 hash of a file on remote server
 
@@ -698,8 +1071,8 @@ def compute_remote_hash(hostname, filepath, log_file=None):
         str: SHA256 hash or None if failed
     """
     cmd = f'sha256sum "{filepath}" | cut -d" " -f1'
-    result = subprocess.run(
-        ['ssh', hostname, cmd],
+    result = run_ssh(
+        hostname, cmd,
         capture_output=True,
         text=True,
         timeout=600  # 10 minutes for hash computation
@@ -711,77 +1084,450 @@ def compute_remote_hash(hostname, filepath, log_file=None):
         return None
 
 
-def get_remote_free_space_gb(hostname, path, log_file=None):
-    """Get free space in GB on remote server path
+def get_remote_placement_info(hostname, paths, log_file=None):
+    """Get free space and existing files of several remote paths in one SSH call
+
+    Creates missing paths first (the overflow path may not exist yet).
 
     Args:
         hostname: SSH hostname (user@host)
-        path: Path to check
+        paths: Directories to check
         log_file: Optional file object to write logs to
 
     Returns:
-        float: Free space in GB, or -1 if failed
+        tuple: ({path: (mount_point, available_bytes)}, {path: set of filenames}),
+               or None if failed
     """
-    cmd = f'df -BG "{path}" | tail -1 | awk \'{{print $4}}\' | tr -d G'
-    result = subprocess.run(
-        ['ssh', hostname, cmd],
+    quoted_paths = ' '.join(f'"{p}"' for p in paths)
+    cmd = f'mkdir -p {quoted_paths} && df -P -B1 {quoted_paths} && echo "--" && ' \
+          f'find {quoted_paths} -maxdepth 1 -type f -printf "%h\\t%f\\n"'
+    result = run_ssh(
+        hostname, cmd,
         capture_output=True,
         text=True,
-        timeout=30
+        timeout=60
     )
-    if result.returncode == 0:
-        try:
-            return float(result.stdout.strip())
-        except ValueError:
-            log_print(log_file, f"      ⚠️  Could not parse free space: {result.stdout.strip()}")
-            return -1
-    else:
-        log_print(log_file, f"      ⚠️  Could not get free space: {result.stderr}")
-        return -1
+    if result.returncode != 0:
+        log_print(log_file, f"   ⚠️  Could not get free space: {result.stderr.strip()}")
+        return None
+
+    df_output, _, find_output = result.stdout.partition('--\n')
+    try:
+        # df -P: Filesystem 1-blocks Used Available Capacity Mounted-on, one line per path
+        df_rows = [line.split() for line in df_output.strip().splitlines()[1:]]
+        free_space = {p: (row[5], int(row[3])) for p, row in zip(paths, df_rows)}
+    except (IndexError, ValueError):
+        log_print(log_file, f"   ⚠️  Could not parse free space: {df_output.strip()}")
+        return None
+    if len(free_space) != len(paths):
+        log_print(log_file, f"   ⚠️  Could not parse free space: {df_output.strip()}")
+        return None
+
+    existing = {p: set() for p in paths}
+    normalized = {p.rstrip('/'): p for p in paths}
+    for line in find_output.splitlines():
+        directory, _, filename = line.partition('\t')
+        if directory.rstrip('/') in normalized:
+            existing[normalized[directory.rstrip('/')]].add(filename)
+    return (free_space, existing)
 
 
-def move_remote_file(hostname, src_path, dest_path, log_file=None):
-    """Move a file on remote server
+def plan_placement(files, filesizes, path, overflow_path, free_space):
+    """Pick the destination directory of each file before it is downloaded
+
+    Files go to path (fast NVMe) as long as it keeps MIN_FREE_SPACE_GB free
+    after the file, and to overflow_path otherwise, in the given order.
+    Paths on the same filesystem share its free space.
+
+    Args:
+        files: Filenames in download order
+        filesizes: {filename: size in bytes} from the NAS CSV (unknown sizes count as 0)
+        path: Primary models path
+        overflow_path: Overflow models path
+        free_space: {path: (mount_point, available_bytes)} from get_remote_placement_info()
+
+    Returns:
+        tuple: ({filename: directory}, number of files that may not fit in overflow_path)
+    """
+    reserve = MIN_FREE_SPACE_GB * 1024 ** 3
+    available = {mount: free for mount, free in free_space.values()}
+    primary_mount = free_space[path][0]
+    overflow_mount = free_space[overflow_path][0]
+
+    placement = {}
+    overcommitted = 0
+    for filename in files:
+        size = filesizes.get(filename, 0)
+        if available[primary_mount] - size >= reserve:
+            placement[filename] = path
+            available[primary_mount] -= size
+        else:
+            placement[filename] = overflow_path
+            if available[overflow_mount] < size:
+                overcommitted += 1
+            available[overflow_mount] -= size
+    return (placement, overcommitted)
+
+
+def build_content_index(gpu_csv_local, exclude=(), log_file=None):
+    """Index a GPU server's files by content (sha256sum column of its CSV)
+
+    Args:
+        gpu_csv_local: Local copy of the server's sha256-list.csv
+        exclude: Filenames whose local copy is missing or wrong (files to download)
+        log_file: Optional file object to write logs to
+
+    Returns:
+        dict: {sha256sum: [filename, ...]}
+    """
+    exclude = set(exclude)
+    with output_to_log(log_file):
+        gpu_checksums = read_csv(gpu_csv_local)
+    content_index = {}
+    for filename, data in gpu_checksums.items():
+        if data['sha256sum'] and filename not in exclude:
+            content_index.setdefault(data['sha256sum'], []).append(filename)
+    return content_index
+
+
+def link_local_copy(hostname, sources, dest_path, expected_hash, expected_size=None, log_file=None):
+    """Create a file on a GPU server from an identical local file instead of downloading it
+
+    Tries, for each source in order: a reflink copy (shares blocks, no extra
+    space, independent file), a hard link (same filesystem only), then a
+    plain copy (e.g. from the overflow path on another filesystem). The new
+    file is created next to dest_path, hashed, and renamed into place only
+    if its sha256 is expected_hash: the CSV only describes one copy of each
+    name, so a candidate in another root may be an older file of the same
+    name and size.
 
     Args:
         hostname: SSH hostname (user@host)
-        src_path: Source file path
-        dest_path: Destination file path
+        sources: Candidate source paths with the same sha256, in order of preference
+        dest_path: Destination path on the GPU server
+        expected_hash: SHA256 the new file must have (NAS CSV)
+        expected_size: Skip sources whose size differs (None: no check)
         log_file: Optional file object to write logs to
 
     Returns:
-        bool: True if move successful, False otherwise
+        str: "<method> <source>" on success, or None if no source could be used
     """
-    # Ensure destination directory exists
-    dest_dir = os.path.dirname(dest_path)
-    cmd = f'mkdir -p "{dest_dir}" && mv "{src_path}" "{dest_path}"'
-    result = subprocess.run(
-        ['ssh', hostname, cmd],
+    size_check = f'[ "$(stat -c %s "$src")" = "{expected_size}" ] || continue; ' if expected_size else ''
+    quoted_sources = ' '.join(f'"{source}"' for source in sources)
+    link_cmd = f'dest="{dest_path}"; tmp="$dest.dedup.$$"; ' \
+               f'for src in {quoted_sources}; do ' \
+               f'[ -f "$src" ] || continue; {size_check}' \
+               f'if cp --reflink=always "$src" "$tmp" 2>/dev/null; then method=reflink; ' \
+               f'elif ln -f "$src" "$tmp" 2>/dev/null; then method=hardlink; ' \
+               f'elif cp "$src" "$tmp"; then method=copy; ' \
+               f'else rm -f "$tmp"; continue; fi; ' \
+               f'sum=$(sha256sum < "$tmp") && [ "${{sum%% *}}" = "{expected_hash}" ] || ' \
+               f'{{ echo "$src: content differs from the NAS hash" >&2; rm -f "$tmp"; continue; }}; ' \
+               f'mv -f "$tmp" "$dest" && rm -f "$tmp" && echo "$method $src" && exit 0; ' \
+               f'rm -f "$tmp"; done; exit 1'
+
+    result = run_ssh(
+        hostname, link_cmd,
         capture_output=True,
         text=True,
-        timeout=300  # 5 minutes for move (large files)
+        timeout=3600  # Plain copies of large files
     )
-    if result.returncode == 0:
-        return True
-    else:
-        log_print(log_file, f"      ⚠️  Move failed: {result.stderr}")
-        return False
+    if result.returncode == 0 and result.stdout.strip():
+        return result.stdout.strip()
+    if result.stderr.strip():
+        log_print(log_file, f"      ⚠️  Local copy failed: {result.stderr.strip()}")
+    return None
+
+
+def start_seed_server(hostname, roots, log_file=None):
+    """Start fanout_seed_server.py on a GPU server for the rest of the run
+
+    The server is started once per host and keeps running until
+    stop_seed_servers(), so peers can keep fetching from a server that has
+    finished its own sync.
+
+    Args:
+        hostname: SSH hostname (user@host)
+        roots: Model directories to serve (models_path_1, then the overflow path)
+        log_file: Optional file object to write logs to
+
+    Returns:
+        bool: True if the seed server is running
+    """
+    with SEED_SERVERS_LOCK:
+        if hostname in SEED_SERVERS:
+            return SEED_SERVERS[hostname] is not None
+
+        unique_roots = list(dict.fromkeys(root for root in roots if root))
+        seed_cmd = f'python3 "{DEFAULT_REMOTE_SCRIPTS_DIR}/fanout_seed_server.py" --port={FANOUT_PORT} ' + \
+                   ' '.join(f'"{root}"' for root in unique_roots)
+        # Closing stdin (or losing the SSH session) stops the seed server,
+        # so it watches stdin itself instead of using the hangup wrapper
+        process = popen_ssh(
+            hostname, seed_cmd, ['-T'], hangup=False,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True
+        )
+        first_line = process.stdout.readline().strip()
+        if not first_line.startswith('Serving'):
+            process.wait()
+            log_print(log_file, f"   ⚠️  Seed server failed to start: {first_line or f'exit code {process.returncode}'}")
+            log_print(log_file, f"   ⚠️  Peers will not download from this server")
+            SEED_SERVERS[hostname] = None
+            return False
+
+        SEED_SERVERS[hostname] = process
+
+    def drain_output():
+        # Keep the pipe from filling up; errors end up in the server's log
+        for line in process.stdout:
+            log_print(log_file, f"      [seed] {line.rstrip()}")
+
+    threading.Thread(target=drain_output, daemon=True).start()
+    log_print(log_file, f"   🌱 Seed server: http://{hostname.split('@')[-1]}:{FANOUT_PORT}/")
+    return True
+
+
+def stop_seed_servers():
+    """Stop every seed server started by start_seed_server()"""
+    with SEED_SERVERS_LOCK:
+        processes = [process for process in SEED_SERVERS.values() if process is not None]
+        SEED_SERVERS.clear()
+    if not processes:
+        return
+
+    print(f"\n🛑 Stopping {len(processes)} seed server(s)...")
+    for process in processes:
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+    for process in processes:
+        try:
+            process.wait(timeout=SSH_COMMAND_TIMEOUT_SECONDS)
+        except subprocess.TimeoutExpired:
+            process.terminate()
 
 
-# Minimum free space threshold (in GB) before moving files to overflow path
+def register_verified_seeds(gpu_server, gpu_csv_local, nas_csv_local, log_file=None):
+    """Offer the files a GPU server already holds to its fan-out group
+
+    Only files whose sha256sum in the server's CSV matches the NAS CSV are
+    registered.
+
+    Args:
+        gpu_server: Server spec in format user@hostname:/path
+        gpu_csv_local: Local copy of the server's sha256-list.csv
+        nas_csv_local: Local path to NAS CSV file (source of truth)
+        log_file: Optional file object to write logs to
+    """
+    hostname, _ = gpu_server.split(':')
+    with output_to_log(log_file):
+        gpu_checksums = read_csv(gpu_csv_local)
+        nas_checksums = read_csv(nas_csv_local)
+    verified = [
+        filename for filename, data in nas_checksums.items()
+        if data['sha256sum'] and gpu_checksums.get(filename, {}).get('sha256sum') == data['sha256sum']
+    ]
+    SEED_REGISTRY.add_seeds(SERVER_GROUPS.get(hostname), verified, hostname)
+    log_print(log_file, f"   🌱 Seeding {len(verified)} verified file(s) to group {SERVER_GROUPS.get(hostname)}")
+
+
+# Minimum free space (in GB) kept on models_path_1; further files go to the overflow path
 MIN_FREE_SPACE_GB = 100
 
+# Verified checksums journaled on a GPU server before they are applied to its CSV
+CSV_MERGE_BATCH = 50
+
+# sha256sum output line ("<digest>  -") printed by an inline-hash download
+SHA256_DIGEST_RE = re.compile(r'^([0-9a-f]{64})\s')
+
+# Bytes fetched, as reported by segmented_download.py --report-bytes
+DOWNLOADED_BYTES_RE = re.compile(r'^downloaded (\d+)$', re.MULTILINE)
+
+
+def _download_and_verify(hostname, file_url, dest_path, expected_hash, file_log, log_file, transfer_slot, verify_slots, wget_progress, inline_hash=True, segment_connections=0, bandwidth=None, filesize=0, source="nas"):
+    """Download one file and verify its hash (one transfer slot, then one verify slot)
+
+    Implements the per-file retry/recompute flow of download_files_from_nas.
+    With inline_hash, the SHA256 is computed while the file streams to disk
+    (wget -O - | tee <dest> | sha256sum) and used as the first hash; the
+    file is only re-read from disk to recompute after a mismatch.
+    With segment_connections > 1, the file is fetched by segmented_download.py
+    on the GPU server instead of wget; it also reports the digest of the
+    downloaded bytes.
+
+    Args:
+        hostname: SSH hostname (user@host)
+        file_url: URL of the file on the NAS HTTP server
+        dest_path: Destination path on the GPU server
+        expected_hash: SHA256 from the NAS CSV, or None to skip verification
+        file_log: Callable writing one message for this file
+        log_file: Optional file object that wget output is streamed to
+        transfer_slot: Callable returning a context manager that holds a NAS transfer slot
+        verify_slots: Semaphore limiting concurrent hash computations
+        wget_progress: wget progress option (e.g. '--progress=dot:mega')
+        inline_hash: Hash while downloading instead of re-reading the file
+        segment_connections: Parallel Range connections (0 or 1: use wget)
+        bandwidth: Optional BandwidthShare of the server, giving each transfer its --limit-rate
+        filesize: Expected size in bytes (NAS CSV), reported as the file's size in hash events
+        source: Source label for events ("nas" or "peer")
+
+    Returns:
+        tuple: (success, computed_hash, failure_reason)
+    """
+    max_attempts = 2
+    computed_hash = None
+    last_failure_reason = None  # Track why the last attempt failed
+    filename = os.path.basename(dest_path)
+
+    def timed_hash(kind):
+        started = time.monotonic()
+        with verify_slots:
+            digest = compute_remote_hash(hostname, dest_path, log_file)
+        emit_event("hash", hostname, file=filename, kind=kind, ok=digest is not None,
+                   size=filesize, seconds=round(time.monotonic() - started, 3))
+        return digest
+
+    for attempt in range(1, max_attempts + 1):
+        if attempt > 1:
+            file_log(f"      🔄 Retry attempt {attempt}/{max_attempts}...")
+            emit_event("retry", hostname, file=filename, attempt=attempt, source=source, reason=last_failure_reason)
+
+        segmented = segment_connections > 1
+        tool = "segmented download" if segmented else "wget"
+        with transfer_slot(), (bandwidth.share() if bandwidth else nullcontext(0)) as limit_rate:
+            # Download file using wget (or segmented_download.py for large files)
+            # -O will overwrite existing file automatically (no need for rm).
+            # The rate is the server's bandwidth left when this transfer starts
+            rate_option = f' --limit-rate={limit_rate}' if limit_rate > 0 else ''
+            # Always write a new file: the old one may be a hard link shared with
+            # another filename (content dedup), which must not be overwritten
+            if segmented:
+                # A complete download that failed verification must not be resumed
+                restart = ' --restart' if computed_hash else ''
+                remove_old = f'rm -f "{dest_path}"' if computed_hash else \
+                             f'[ -e "{resume_map_path(dest_path)}" ] || rm -f "{dest_path}"'
+                wget_cmd = f'{remove_old}; python3 "{DEFAULT_REMOTE_SCRIPTS_DIR}/segmented_download.py" ' \
+                           f'--connections={segment_connections} --min-size=0{restart}{rate_option} --report-bytes "{file_url}" "{dest_path}"'
+            elif inline_hash:
+                # Hash the bytes as they are written; wget progress goes to stderr
+                # and only the digest to stdout. pipefail reports wget/tee errors.
+                script = f'set -o pipefail; rm -f "{dest_path}"; ' \
+                         f'wget {wget_progress}{rate_option} "{file_url}" -O - | tee "{dest_path}" | sha256sum'
+                wget_cmd = f'bash -c {shlex.quote(script)}'
+            else:
+                wget_cmd = f'rm -f "{dest_path}"; wget {wget_progress}{rate_option} "{file_url}" -O "{dest_path}"'
+
+            # Stream output to log file if provided (stdout/stderr inherited otherwise)
+            started = time.monotonic()
+            result = run_ssh(
+                hostname, wget_cmd,
+                text=True,
+                stdout=subprocess.PIPE if inline_hash or segmented else log_file,
+                stderr=log_file,
+                timeout=3600  # 1 hour per file
+            )
+            # Bytes actually moved: segmented downloads count them (a resumed
+            # download only fetches the missing segments); wget always fetches
+            # the whole file, and the size of a failed wget is not known
+            if segmented:
+                match = DOWNLOADED_BYTES_RE.search(result.stdout or '')
+                transferred = int(match.group(1)) if match else 0
+            else:
+                transferred = filesize if result.returncode == 0 else 0
+            emit_event("transfer", hostname, file=filename, source=source, tool=tool, attempt=attempt,
+                       ok=result.returncode == 0, bytes=transferred, seconds=round(time.monotonic() - started, 3))
+
+        if result.returncode != 0:
+            file_log(f"      ❌ {tool} failed with code {result.returncode}")
+            last_failure_reason = f"{tool} failed with code {result.returncode}"
+            continue  # Try again if we have retries left
+
+        inline_digest = None
+        if inline_hash or segmented:
+            match = SHA256_DIGEST_RE.match(result.stdout or '')
+            inline_digest = match.group(1) if match else None
+
+        # Download succeeded, now verify hash
+        if not expected_hash:
+            # No expected hash, skip verification
+            return (True, inline_digest, None)
+
+        if inline_digest:
+            computed_hash = inline_digest
+            hash_source = " (computed during download)"
+        else:
+            # Compute hash of downloaded file
+            file_log(f"      Computing hash...")
+            computed_hash = timed_hash("verify")
+            hash_source = ""
+
+        if computed_hash is None:
+            file_log(f"      ❌ Failed to compute hash")
+            last_failure_reason = "hash computation failed"
+            continue  # Try again
+
+        if computed_hash == expected_hash:
+            file_log(f"      ✅ Hash verified{hash_source}: {computed_hash[:16]}...")
+            return (True, computed_hash, None)
+
+        # Hash mismatch - recompute once from disk to rule out transient error
+        file_log(f"      ⚠️  Hash mismatch! Expected: {expected_hash[:16]}..., Got: {computed_hash[:16]}...")
+        emit_event("hash_mismatch", hostname, file=filename, source=source, attempt=attempt,
+                   expected=expected_hash, got=computed_hash)
+        file_log(f"      Recomputing hash to confirm...")
+
+        recomputed_hash = timed_hash("recompute")
+
+        if recomputed_hash == expected_hash:
+            file_log(f"      ✅ Hash verified on recompute: {recomputed_hash[:16]}...")
+            return (True, recomputed_hash, None)
+
+        # Still mismatch after recompute
+        if recomputed_hash is None:
+            file_log(f"      ❌ Recompute hash failed")
+            last_failure_reason = "hash recomputation failed"
+        elif recomputed_hash != computed_hash:
+            file_log(f"      ⚠️  Recomputed hash differs: {recomputed_hash[:16]}...")
+            last_failure_reason = f"hash mismatch (expected: {expected_hash[:16]}..., got: {recomputed_hash[:16]}...)"
+        else:
+            last_failure_reason = f"hash mismatch (expected: {expected_hash[:16]}..., got: {computed_hash[:16]}...)"
+
+        file_log(f"      ❌ Hash verification failed after recompute")
+        # Will retry download if attempts remain
+
+    return (False, computed_hash, last_failure_reason)
+
 
-def download_files_from_nas(gpu_server, files, log_file=None, server_name=None, custom_nas_url=None, nas_csv_local=None, overflow_path=None):
-    """Download files from NAS HTTP server to GPU server one by one
+def download_files_from_nas(gpu_server, files, log_file=None, server_name=None, custom_nas_url=None, nas_csv_local=None, overflow_path=None, gpu_csv_local=None, run_state=None):
+    """Download files from NAS HTTP server to GPU server through a transfer/verify pipeline
 
+    Up to TRANSFERS files are downloaded with wget at once, and up to
+    VERIFY_WORKERS downloaded files are hashed at once, so one file is
+    verified while the next ones are still transferring. Transfer slots
+    come from the NAS's shared TransferScheduler, which also caps the
+    transfers of all servers together; files are queued smallest first.
+    With --fanout, each file is fetched from a peer seed when the
+    SEED_REGISTRY has one (falling back to the NAS), and the server
+    becomes a seed for every file it verifies.
+    A file whose expected sha256 the server already holds under another
+    name (see build_content_index) is linked or copied from that local
+    copy instead of being downloaded, once the copy's hash matches.
     Uses wget -O to download and overwrite existing files automatically.
-    Uses dot format (--progress=dot:mega) for cleaner log output.
-    After each successful download, verifies hash against NAS CSV.
+    Uses dot format (--progress=dot:mega) for cleaner log output when
+    files are transferred one at a time, and one line per file otherwise.
+    After each successful download, verifies hash against NAS CSV, using
+    the digest computed during the download when INLINE_HASH is set.
     If hash mismatch: recompute once, then retry download once.
-    If still mismatch after retry, stops sync for this server.
+    If still mismatch after retry, stops sync for this server: no further
+    downloads are started and transfers already in flight are finished.
 
-    After download, if free space on path1 < 100G, moves file to overflow_path.
+    Each file is written directly to the directory chosen by plan_placement()
+    (path while it keeps MIN_FREE_SPACE_GB free, overflow_path after that),
+    based on one free-space check of both paths and the NAS CSV filesizes.
 
     Verification flow for each file:
         Download -> Compute Hash -> Match?
@@ -799,7 +1545,9 @@ def download_files_from_nas(gpu_server, files, log_file=None, server_name=None,
         server_name: Server name for progress tracking
         custom_nas_url: Optional custom NAS URL in format "ip:port"
         nas_csv_local: Path to NAS CSV file for hash verification
-        overflow_path: Path to move files to when path1 is nearly full (optional)
+        overflow_path: Path for files that do not fit in path1 (optional)
+        gpu_csv_local: Local copy of the server's CSV, for reusing identical local files
+        run_state: Optional SyncState recording each verified file (for --resume)
 
     Returns:
         tuple: (success_count, error_message) - error_message is None if all OK,
@@ -818,12 +1566,24 @@ def download_files_from_nas(gpu_server, files, log_file=None, server_name=None,
     else:
         http_url = f"http://{NAS_IP}:{HTTP_PORT}"
 
-    # Load expected checksums from NAS CSV
+    # Load expected checksums (and sizes, to pick segmented downloads) from NAS CSV
     expected_checksums = {}
+    nas_filesizes = {}
     if nas_csv_local:
         expected_checksums = load_nas_checksums(nas_csv_local)
+        nas_filesizes = load_nas_filesizes(nas_csv_local)
         log_print(log_file, f"   Loaded {len(expected_checksums)} checksums from NAS CSV")
 
+    # Files already on the server, by content: {sha256sum: [filename, ...]}
+    content_index = {}
+    if gpu_csv_local and expected_checksums:
+        content_index = build_content_index(gpu_csv_local, files, log_file)
+    local_roots = [path] + ([overflow_path] if overflow_path and overflow_path != path else [])
+
+    def local_sources(expected_hash):
+        # Same filesystem as the destination first, so hard links can work
+        return [f"{root}/{name}" for root in local_roots for name in content_index.get(expected_hash, [])]
+
     log_print(log_file, f"\n📥 Downloading {len(files)} file(s) from NAS...")
     log_print(log_file, f"   From: {http_url}")
     log_print(log_file, f"   To: {gpu_server}")
@@ -836,19 +1596,70 @@ def download_files_from_nas(gpu_server, files, log_file=None, server_name=None,
             log_print(log_file, f"   [{i}/{len(files)}] {filename}")
             log_print(log_file, f"      From: {file_url}")
             log_print(log_file, f"      To:   {dest_path}")
+            if content_index.get(expected_checksums.get(filename)):
+                log_print(log_file, f"      [DRY RUN] Would reuse identical local file {content_index[expected_checksums[filename]][0]}")
             log_print(log_file, f"      [DRY RUN] Would verify hash after download")
         log_print(log_file, f"\n   [DRY RUN] Would download {len(files)} file(s)")
         return (len(files), None)
 
-    success_count = 0
+    transfers = max(1, TRANSFERS)
+    verify_workers = max(1, VERIFY_WORKERS)
+    scheduler = get_transfer_scheduler(http_url)
+    log_print(log_file, f"   Pipeline: {transfers} concurrent transfer(s), {verify_workers} concurrent verification(s)")
+    log_print(log_file, f"   NAS limit: {scheduler.max_active} concurrent transfer(s) across all servers")
+
+    # Share the server's bandwidth cap between its transfers: each one gets
+    # what is left when it starts, at least an even split of the cap
+    bandwidth = None
+    if LIMIT_RATE_MBPS > 0:
+        cap = int(LIMIT_RATE_MBPS * 1024 * 1024)
+        bandwidth = BandwidthShare(cap, cap // transfers)
+        log_print(log_file, f"   Bandwidth cap: {LIMIT_RATE_MBPS:g} MB/s shared by the running transfers "
+                            f"(at least {bandwidth.min_share // 1024} KB/s each)")
+
+    # Small files first: quick progress, and the scheduler prefers them too
+    files = sorted(files, key=lambda filename: nas_filesizes.get(filename, 0))
+
+    # Choose every file's directory up front so nothing is moved afterwards
+    placement = {}
+    stale_copies = {}  # {filename: copy in the other path, removed once verified}
+    if overflow_path and overflow_path != path:
+        placement_info = get_remote_placement_info(hostname, [path, overflow_path], log_file)
+        if placement_info:
+            free_space, existing = placement_info
+            placement, overcommitted = plan_placement(files, nas_filesizes, path, overflow_path, free_space)
+            to_overflow = sum(1 for directory in placement.values() if directory == overflow_path)
+            log_print(log_file, f"   Placement: {len(files) - to_overflow} file(s) to {path}, "
+                                f"{to_overflow} to {overflow_path} "
+                                f"({free_space[path][1] / 1024 ** 3:.0f}G / {free_space[overflow_path][1] / 1024 ** 3:.0f}G free)")
+            if overcommitted:
+                log_print(log_file, f"   ⚠️  {overcommitted} file(s) may not fit in {overflow_path}")
+            for filename, directory in placement.items():
+                other = overflow_path if directory == path else path
+                if filename in existing[other]:
+                    stale_copies[filename] = f"{other}/{filename}"
+        else:
+            log_print(log_file, f"   ⚠️  Downloading everything to {path}")
 
-    for i, filename in enumerate(files, 1):
-        file_url = f"{http_url}/{filename}"
-        dest_path = f"{path}/{filename}"
+    verify_slots = threading.Semaphore(verify_workers)
+    # Serializes the remote CSV update and free-space check/move per file
+    finish_lock = threading.Lock()
+    stop_event = threading.Event()
+    state_lock = threading.Lock()
+    state = {"success_count": 0, "error_msg": None, "journaled": 0}
 
-        # Update progress
-        if server_name:
-            update_progress(server_name, "Downloading", i-1, len(files))
+    # Dot progress is only readable when one transfer writes to the log at a time
+    wget_progress = '--progress=dot:mega' if transfers == 1 else '--no-verbose'
+
+    def sync_file(i, filename):
+        if stop_event.is_set():
+            return
+
+        file_url = f"{http_url}/{filename}"
+        dest_path = f"{placement.get(filename, path)}/{filename}"
+        def file_log(message):
+            # Prefix per-file lines so overlapping files stay distinguishable
+            log_print(log_file, f"      [{i}/{len(files)}] {message.lstrip()}")
 
         # Show progress
         log_print(log_file, f"   [{i}/{len(files)}] {filename}")
@@ -856,144 +1667,164 @@ def download_files_from_nas(gpu_server, files, log_file=None, server_name=None,
         # Get expected hash
         expected_hash = expected_checksums.get(filename)
         if not expected_hash:
-            log_print(log_file, f"      ⚠️  No expected hash found in NAS CSV, skipping verification")
+            file_log(f"      ⚠️  No expected hash found in NAS CSV, skipping verification")
 
-        # Try download (with one retry on hash mismatch)
-        max_attempts = 2
+        filesize = nas_filesizes.get(filename, 0)
         download_success = False
-        last_failure_reason = None  # Track why the last attempt failed
-
-        for attempt in range(1, max_attempts + 1):
-            if attempt > 1:
-                log_print(log_file, f"      🔄 Retry attempt {attempt}/{max_attempts}...")
-
-            # Download file using wget with dot format for cleaner logs
-            # -O will overwrite existing file automatically (no need for rm)
-            # --progress=dot:mega shows progress in dot format (cleaner for logs)
-            wget_cmd = f'wget --progress=dot:mega "{file_url}" -O "{dest_path}"'
-
-            # Stream output to log file if provided
-            if log_file:
-                result = subprocess.run(
-                    ['ssh', hostname, wget_cmd],
-                    text=True,
-                    stdout=log_file,
-                    stderr=log_file,
-                    timeout=3600  # 1 hour per file
-                )
-            else:
-                result = subprocess.run(
-                    ['ssh', hostname, wget_cmd],
-                    text=True,
-                    timeout=3600  # 1 hour per file
+        file_source = None
+
+        # Reuse an identical file already on the server (same sha256, other name);
+        # the new file is hashed before it is used, which takes a verify slot
+        sources = local_sources(expected_hash) if expected_hash else []
+        if sources:
+            with verify_slots:
+                linked = link_local_copy(hostname, sources, dest_path, expected_hash, filesize or None, log_file)
+            if linked:
+                method, source = linked.split(' ', 1)
+                file_log(f"      ♻️  Reused local copy ({method}): {source}")
+                download_success, computed_hash, last_failure_reason = True, expected_hash, None
+                file_source = "local"
+
+        # Large files are split into parallel Range requests
+        segment_connections = SEGMENT_CONNECTIONS if filesize >= SEGMENTED_MIN_SIZE else 0
+        if segment_connections > 1 and not download_success:
+            file_log(f"      Segmented download over {segment_connections} connections")
+
+        def transfer_slot():
+            return scheduler.slot(hostname, filesize)
+
+        def peer_slot():
+            return PEER_SCHEDULER.slot(hostname, filesize)
+
+        # Peer copies can only be trusted when there is a NAS hash to check them against
+        group = SERVER_GROUPS.get(hostname)
+        use_fanout = SEED_REGISTRY is not None and bool(expected_hash)
+        while use_fanout and not download_success:
+            seed = SEED_REGISTRY.acquire(group, filename, hostname)
+            if seed is None:
+                break  # No seed yet: this server pulls the file from the NAS
+            seed_url = f"http://{seed.split('@')[-1]}:{FANOUT_PORT}/{filename}"
+            file_log(f"      🔗 Downloading from peer {seed}")
+            try:
+                download_success, computed_hash, last_failure_reason = _download_and_verify(
+                    hostname, seed_url, dest_path, expected_hash, file_log, log_file,
+                    peer_slot, verify_slots, wget_progress, INLINE_HASH, segment_connections, bandwidth,
+                    filesize, "peer"
                 )
-
-            if result.returncode != 0:
-                log_print(log_file, f"      ❌ wget failed with code {result.returncode}")
-                last_failure_reason = f"wget failed with code {result.returncode}"
-                continue  # Try again if we have retries left
-
-            # Download succeeded, now verify hash
-            if not expected_hash:
-                # No expected hash, skip verification
-                download_success = True
+            finally:
+                SEED_REGISTRY.release_upload(seed)
+            if download_success:
+                file_source = "peer"
                 break
+            file_log(f"      ⚠️  Peer {seed} failed ({last_failure_reason}), trying another source")
+            SEED_REGISTRY.remove_seed(group, filename, seed)
 
-            # Compute hash of downloaded file
-            log_print(log_file, f"      Computing hash...")
-            computed_hash = compute_remote_hash(hostname, dest_path, log_file)
+        if not download_success:
+            try:
+                # Try download (with one retry on hash mismatch)
+                download_success, computed_hash, last_failure_reason = _download_and_verify(
+                    hostname, file_url, dest_path, expected_hash, file_log, log_file,
+                    transfer_slot, verify_slots, wget_progress, INLINE_HASH, segment_connections, bandwidth,
+                    filesize
+                )
+                file_source = "nas"
+                # Register before ending the pull so waiting peers find the seed
+                if download_success and use_fanout and start_seed_server(hostname, [path, overflow_path], log_file):
+                    SEED_REGISTRY.add_seed(group, filename, hostname)
+            finally:
+                if use_fanout:
+                    SEED_REGISTRY.finish_pull(group, filename, hostname)
+        elif use_fanout and start_seed_server(hostname, [path, overflow_path], log_file):
+            SEED_REGISTRY.add_seed(group, filename, hostname)
+
+        if not download_success:
+            # Failed after all retries - this is a fatal error, stop sync for this server
+            with state_lock:
+                if state["error_msg"] is None:
+                    state["error_msg"] = f"{filename}: {last_failure_reason}"
+            stop_event.set()
+            file_log(f"   ❌ FATAL: {filename}: {last_failure_reason}")
+            emit_event("file_failed", hostname, file=filename, reason=last_failure_reason)
+            return
 
-            if computed_hash is None:
-                log_print(log_file, f"      ❌ Failed to compute hash")
-                last_failure_reason = "hash computation failed"
-                continue  # Try again
+        with finish_lock:
+            # Journal the verified hash on the GPU server; the journal is
+            # applied to sha256-list.csv once per CSV_MERGE_BATCH files
+            checksum_to_save = expected_hash if expected_hash else computed_hash
+            if checksum_to_save:
+                checksum_result = journal_remote_checksum(hostname, path, filename, checksum_to_save)
+                if checksum_result.returncode == 0:
+                    file_log(f"      ✅ Checksum journaled")
+                    state["journaled"] += 1
+                else:
+                    file_log(f"      ⚠️  Failed to journal checksum: {checksum_result.stderr}")
+            else:
+                file_log(f"      ⚠️  No checksum to save")
 
-            if computed_hash == expected_hash:
-                log_print(log_file, f"      ✅ Hash verified: {computed_hash[:16]}...")
-                download_success = True
-                break
+            if state["journaled"] >= CSV_MERGE_BATCH:
+                if apply_remote_checksum_journal(hostname, path, log_file):
+                    state["journaled"] = 0
 
-            # Hash mismatch - recompute once to rule out transient error
-            log_print(log_file, f"      ⚠️  Hash mismatch! Expected: {expected_hash[:16]}..., Got: {computed_hash[:16]}...")
-            log_print(log_file, f"      Recomputing hash to confirm...")
+            # Only the verified copy may remain (the seed server and loaders search both paths)
+            stale_copy = stale_copies.get(filename)
+            if stale_copy:
+                remove_result = run_ssh(
+                    hostname, f'rm -f "{stale_copy}"',
+                    text=True,
+                    capture_output=True,
+                    timeout=60
+                )
+                if remove_result.returncode == 0:
+                    file_log(f"      🗑️  Removed stale copy {stale_copy}")
+                else:
+                    file_log(f"      ⚠️  Failed to remove stale copy {stale_copy}: {remove_result.stderr.strip()}")
 
-            recomputed_hash = compute_remote_hash(hostname, dest_path, log_file)
+            if run_state:
+                run_state.mark_verified(filename)
 
-            if recomputed_hash == expected_hash:
-                log_print(log_file, f"      ✅ Hash verified on recompute: {recomputed_hash[:16]}...")
-                download_success = True
-                break
+        emit_event("file_done", hostname, file=filename, source=file_source, size=filesize,
+                   path=placement.get(filename, path))
 
-            # Still mismatch after recompute
-            if recomputed_hash is None:
-                log_print(log_file, f"      ❌ Recompute hash failed")
-                last_failure_reason = "hash recomputation failed"
-            elif recomputed_hash != computed_hash:
-                log_print(log_file, f"      ⚠️  Recomputed hash differs: {recomputed_hash[:16]}...")
-                last_failure_reason = f"hash mismatch (expected: {expected_hash[:16]}..., got: {recomputed_hash[:16]}...)"
-            else:
-                last_failure_reason = f"hash mismatch (expected: {expected_hash[:16]}..., got: {computed_hash[:16]}...)"
+        with state_lock:
+            state["success_count"] += 1
+            success_count = state["success_count"]
+            # Later files with the same content can be linked from this one
+            if expected_hash:
+                content_index.setdefault(expected_hash, []).append(filename)
 
-            log_print(log_file, f"      ❌ Hash verification failed after recompute")
-            # Will retry download if attempts remain
+        # Update progress after successful download
+        if server_name:
+            update_progress(server_name, "Downloading", success_count, len(files))
 
-        if download_success:
-            success_count += 1
+    if server_name:
+        update_progress(server_name, "Downloading", 0, len(files))
 
-            # Update sha256-list.csv on the GPU server with verified hash
-            # Uses 4-column format: filename,sha256sum,8k_sha256sum,filesize
-            log_print(log_file, f"      Updating checksum in CSV...")
-            checksum_to_save = expected_hash if expected_hash else computed_hash
-            if checksum_to_save:
-                # Filter out both old (2-col) and new (4-col) headers, preserve existing data
-                checksum_cmd = f'cd "{path}" && ' \
-                              f'{{ echo "filename,sha256sum,8k_sha256sum,filesize"; ' \
-                              f'{{ cat sha256-list.csv 2>/dev/null | grep -v "^filename," | grep -v "^{filename}," || true; }} ; ' \
-                              f'echo "{filename},{checksum_to_save},,"; }} | ' \
-                              f'{{ read header; echo "$header"; sort -t, -k1; }} > /tmp/sorted.csv && mv /tmp/sorted.csv sha256-list.csv'
-
-                checksum_result = subprocess.run(
-                    ['ssh', hostname, checksum_cmd],
-                    text=True,
-                    capture_output=True,
-                    timeout=60
-                )
+    # Enough workers to keep every transfer and verification slot busy;
+    # files are started in list order (smallest first)
+    with ThreadPoolExecutor(max_workers=min(len(files), transfers + verify_workers)) as executor:
+        futures = [executor.submit(sync_file, i, filename) for i, filename in enumerate(files, 1)]
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception:
+                # Don't start more files; in-flight ones finish before re-raising
+                stop_event.set()
+                raise
 
-                if checksum_result.returncode == 0:
-                    log_print(log_file, f"      ✅ Checksum saved to CSV")
-                else:
-                    log_print(log_file, f"      ⚠️  Failed to update CSV: {checksum_result.stderr}")
-            else:
-                log_print(log_file, f"      ⚠️  No checksum to save")
-
-            # Check free space and move to overflow path if needed
-            if overflow_path and overflow_path != path:
-                free_space_gb = get_remote_free_space_gb(hostname, path, log_file)
-                if free_space_gb >= 0 and free_space_gb < MIN_FREE_SPACE_GB:
-                    log_print(log_file, f"      📦 Free space {free_space_gb:.0f}G < {MIN_FREE_SPACE_GB}G, moving to overflow path...")
-                    src_file = dest_path
-                    dest_file = f"{overflow_path}/{filename}"
-                    if move_remote_file(hostname, src_file, dest_file, log_file):
-                        log_print(log_file, f"      ✅ Moved to {overflow_path}")
-                    else:
-                        log_print(log_file, f"      ⚠️  Failed to move file, keeping in {path}")
-
-            # Update progress after successful download
-            if server_name:
-                update_progress(server_name, "Downloading", success_count, len(files))
-        else:
-            # Failed after all retries - this is a fatal error, stop sync for this server
-            error_msg = f"{filename}: {last_failure_reason}"
-            log_print(log_file, f"   ❌ FATAL: {error_msg}")
-            log_print(log_file, f"   ❌ Stopping sync for this server")
-            return (success_count, error_msg)
+    # Apply the remaining journaled checksums (also after a fatal error)
+    if state["journaled"]:
+        apply_remote_checksum_journal(hostname, path, log_file)
+
+    success_count = state["success_count"]
+    if state["error_msg"]:
+        log_print(log_file, f"   ❌ Stopping sync for this server")
+        return (success_count, state["error_msg"])
 
     log_print(log_file, f"   ✅ Downloaded and verified {success_count}/{len(files)} file(s)")
     return (success_count, None)
 
 
 
-
 def sync_single_server(gpu_server, nas_csv_local, log_file=None, server_name=None, custom_nas_url=None, overflow_path=None):
     """Sync a single GPU server with NAS
 
@@ -1001,8 +1832,15 @@ def sync_single_server(gpu_server, nas_csv_local, log_file=None, server_name=Non
     1. Update checksums on GPU server
     2. Compare checksums to get files to download
     3. Download files from NAS HTTP server (updates sha256sum in CSV after each file)
-       - If free space < 100G, moves files to overflow_path
-    4. Run 'compare_checksums.py all' to fill in L1/L2 checksums for downloaded files
+       - Files that do not fit in path1 (keeping 100G free) go to overflow_path
+    4. Update all levels to fill in L1/L2 checksums for downloaded files
+
+    The wall time of each phase is reported as a "timing" event for the
+    end-of-run profile (see sync_profile.py).
+
+    Progress is recorded in logs/state-{hostname}.json; with RESUME, an
+    unfinished state of the resumed run matching this server and NAS CSV
+    skips step 1 and the files it lists as verified.
 
     Args:
         gpu_server: Server spec in format user@hostname:/path
@@ -1010,7 +1848,7 @@ def sync_single_server(gpu_server, nas_csv_local, log_file=None, server_name=Non
         log_file: Optional file object to write logs to
         server_name: Server name for progress tracking
         custom_nas_url: Optional custom NAS URL in format "ip:port"
-        overflow_path: Path to move files when primary path is nearly full
+        overflow_path: Path for files that do not fit in the primary path
 
     Returns:
         bool: True if sync successful, False otherwise
@@ -1025,7 +1863,15 @@ def sync_single_server(gpu_server, nas_csv_local, log_file=None, server_name=Non
             log_print(log_file, f"Overflow path: {overflow_path}")
     log_print(log_file, '='*70)
 
+    sync_started = time.monotonic()
     try:
+        run_state = None
+        if not DRY_RUN:
+            state_file = state_path(SCRIPT_DIR / "logs", gpu_server.split('@')[-1].split(':')[0])
+            run_state = SyncState.open(state_file, gpu_server, nas_csv_local, *RUN, resume=RESUME)
+            if run_state.resumed:
+                log_print(log_file, f"⏭️  Resuming from {state_file}")
+
         # Step 1: Update checksums on GPU server
         if server_name:
             update_progress(server_name, "Checking checksums", 0, 0)
@@ -1033,7 +1879,20 @@ def sync_single_server(gpu_server, nas_csv_local, log_file=None, server_name=Non
             print_step(1, 4, f"Update checksums on {gpu_server}")
         else:
             log_print(log_file, f"\n[Step 1/4] Update checksums on {gpu_server}")
-        gpu_csv_local = update_gpu_server_checksums(gpu_server, log_file)
+        resumed_csv = run_state.get('checksums', 'gpu_csv') if run_state else None
+        if resumed_csv and os.path.exists(resumed_csv):
+            log_print(log_file, f"   ⏭️  Checksums already updated by the interrupted run ({resumed_csv})")
+            gpu_csv_local = resumed_csv
+            # Checksums journaled by the interrupted run
+            remote_host, server_path = gpu_server.split(':')
+            with timed_phase(gpu_server, "journal"):
+                if not apply_remote_checksum_journal(remote_host, server_path, log_file):
+                    gpu_csv_local = None
+        else:
+            gpu_csv_local = update_gpu_server_checksums(gpu_server, log_file)
+            if gpu_csv_local is not None and run_state:
+                # Kept with the state: the shared logs/ copy is overwritten by other calls
+                run_state.finish('checksums', gpu_csv=run_state.keep_csv(gpu_csv_local))
         if gpu_csv_local is None:
             error_msg = f"Required remote checksum list is missing or inaccessible: {gpu_server}/sha256-list.csv"
             if server_name:
@@ -1049,7 +1908,8 @@ def sync_single_server(gpu_server, nas_csv_local, log_file=None, server_name=Non
             print_step(2, 4, "Compare checksums")
         else:
             log_print(log_file, f"\n[Step 2/4] Compare checksums")
-        files_to_download = get_files_to_download(gpu_csv_local, nas_csv_local, log_file)
+        with timed_phase(gpu_server, "csv_compare"):
+            files_to_download = get_files_to_download(gpu_csv_local, nas_csv_local, log_file)
 
         if files_to_download is None:
             error_msg = f"Local checksum list is unavailable for {gpu_server}"
@@ -1059,7 +1919,23 @@ def sync_single_server(gpu_server, nas_csv_local, log_file=None, server_name=Non
             log_print(log_file, "❌ Stopping sync for this server")
             return False
 
+        # Files the interrupted run already downloaded and verified
+        verified = [f for f in files_to_download if run_state and f in run_state.verified]
+        pending_files = [f for f in files_to_download if f not in verified]
+        if verified:
+            log_print(log_file, f"   ⏭️  {len(verified)} file(s) already downloaded and verified by the interrupted run")
+
+        # Offer the files this server already holds to its peers
+        if SEED_REGISTRY is not None and not DRY_RUN:
+            hostname, path = gpu_server.split(':')
+            if start_seed_server(hostname, [path, overflow_path], log_file):
+                register_verified_seeds(gpu_server, gpu_csv_local, nas_csv_local, log_file)
+                if verified:
+                    SEED_REGISTRY.add_seeds(SERVER_GROUPS.get(hostname), verified, hostname)
+
         if not files_to_download:
+            if run_state:
+                run_state.finish('completed')
             if server_name:
                 update_progress(server_name, "Completed", 0, 0, status="completed")
             log_print(log_file, "\n✅ Server already in sync - no files to download")
@@ -1072,9 +1948,16 @@ def sync_single_server(gpu_server, nas_csv_local, log_file=None, server_name=Non
             print_step(3, 4, "Download files from NAS")
         else:
             log_print(log_file, f"\n[Step 3/4] Download files from NAS")
-        success_count, error_msg = download_files_from_nas(
-            gpu_server, files_to_download, log_file, server_name, custom_nas_url, nas_csv_local, overflow_path
-        )
+        if pending_files:
+            with timed_phase(gpu_server, "download"):
+                success_count, error_msg = download_files_from_nas(
+                    gpu_server, pending_files, log_file, server_name, custom_nas_url, nas_csv_local, overflow_path,
+                    gpu_csv_local, run_state
+                )
+        else:
+            log_print(log_file, f"   ⏭️  Nothing left to download")
+            success_count, error_msg = 0, None
+        success_count += len(verified)
 
         # Check for fatal error (hash verification failure)
         if error_msg:
@@ -1088,22 +1971,14 @@ def sync_single_server(gpu_server, nas_csv_local, log_file=None, server_name=Non
 
         # Update all checksums (L1, L2, L3) for downloaded files using 'all' mode
         # This fills in missing values only - L3 (sha256sum) is already saved during download
-        if success_count > 0 and not DRY_RUN:
+        if success_count > 0 and not DRY_RUN and not (run_state and run_state.done('completed')):
             if server_name:
                 update_progress(server_name, "Updating checksums", success_count, len(files_to_download))
             log_print(log_file, f"\n📊 Updating checksums for downloaded files (all levels)...")
-            cmd = [
-                'python3',
-                str(SCRIPT_DIR / 'compare_checksums.py'),
-                'all',
-                gpu_server
-            ]
-            if log_file:
-                result = subprocess.run(cmd, text=True, stdout=log_file, stderr=log_file)
-            else:
-                result = subprocess.run(cmd, text=True)
-            if result.returncode != 0:
-                error_msg = f"Final checksum update failed with code {result.returncode}"
+            with timed_phase(gpu_server, "final_update"), output_to_log(log_file):
+                updated_csv = update_directory(gpu_server, 'ALL')
+            if updated_csv is None:
+                error_msg = "Final checksum update failed"
                 if server_name:
                     update_progress(
                         server_name,
@@ -1118,6 +1993,8 @@ def sync_single_server(gpu_server, nas_csv_local, log_file=None, server_name=Non
             else:
                 log_print(log_file, f"   ✅ Checksums updated")
 
+        if run_state and success_count == len(files_to_download):
+            run_state.finish('completed')
         if server_name:
             update_progress(server_name, "Completed", success_count, len(files_to_download), status="completed")
         log_print(log_file, f"\n✅ Server sync completed: {success_count}/{len(files_to_download)} files downloaded")
@@ -1125,7 +2002,7 @@ def sync_single_server(gpu_server, nas_csv_local, log_file=None, server_name=Non
 
     except Exception as e:
         if server_name:
-            update_progress(server_name, "Failed", 0, 0, status="failed")
+            update_progress(server_name, "Failed", 0, 0, status="failed", error_msg=str(e))
         log_print(log_file, f"\n❌ Error syncing {gpu_server}: {e}")
         import traceback
         if log_file:
@@ -1134,6 +2011,10 @@ def sync_single_server(gpu_server, nas_csv_local, log_file=None, server_name=Non
             traceback.print_exc()
         return False
 
+    finally:
+        emit_event("timing", gpu_server.split(':')[0], phase="total",
+                   seconds=round(time.monotonic() - sync_started, 3))
+
 
 def sync_server_with_logging(server, nas_csv_local, log_dir=".", custom_nas_url=None, overflow_path=None):
     """Wrapper to sync a single server with logging to file
@@ -1143,7 +2024,7 @@ def sync_server_with_logging(server, nas_csv_local, log_dir=".", custom_nas_url=
         nas_csv_local: Local path to NAS CSV file (source of truth)
         log_dir: Directory to write log files to
         custom_nas_url: Optional custom NAS URL in format "ip:port"
-        overflow_path: Path to move files when primary path is nearly full
+        overflow_path: Path for files that do not fit in the primary path
 
     Returns:
         bool: True if sync successful, False otherwise
@@ -1179,8 +2060,187 @@ def sync_server_with_logging(server, nas_csv_local, log_dir=".", custom_nas_url=
     return success
 
 
+def print_server_result(hostname, success, error=None):
+    """Print the completion line of one server in parallel mode
+
+    Args:
+        hostname: Server hostname (PROGRESS_DATA key)
+        success: Result of sync_server_with_logging()
+        error: Exception raised by the sync, if any
+    """
+    if error is not None:
+        print(f"\n[{hostname}] ❌ Exception: {error}")
+        return
+
+    with PROGRESS_LOCK:
+        data = PROGRESS_DATA.get(hostname, {})
+    files_synced = data.get("files_synced", 0)
+    total_files = data.get("total_files", 0)
+    error_msg = data.get("error_msg")
+    if not success:
+        failure_detail = error_msg or f"See logs/sync-{hostname}.log"
+        print(f"\n[{hostname}] ❌ Failed: {failure_detail}")
+    elif total_files > 0:
+        print(f"\n[{hostname}] ✅ Completed: {files_synced}/{total_files} files synced")
+    else:
+        print(f"\n[{hostname}] ✅ Completed: Already in sync")
+
+
+async def report_progress(events):
+    """Apply progress events in arrival order and print the status table periodically
+
+    Events are (kind, hostname, payload) tuples:
+      - ("progress", hostname, data): replace the server's PROGRESS_DATA entry
+      - ("finished", hostname, (success, error)): print its completion line; it
+        follows all of the server's progress events, so the counts are final
+      - ("stop", None, None): return
+
+    Args:
+        events: asyncio.Queue filled (in order) by the post() of sync_servers_parallel()
+    """
+    async def display_periodically():
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL_SECONDS)
+            display_progress_status()
+
+    ticker = asyncio.create_task(display_periodically())
+    try:
+        while True:
+            kind, hostname, payload = await events.get()
+            if kind == "progress":
+                with PROGRESS_LOCK:
+                    PROGRESS_DATA[hostname] = payload
+            elif kind == "finished":
+                print_server_result(hostname, *payload)
+            else:
+                return
+    finally:
+        ticker.cancel()
+
+
+async def cancel_server_sync(future, remote_host):
+    """Stop a server's sync: drop it if queued, else kill its processes and let it unwind
+
+    Args:
+        future: concurrent.futures.Future of sync_server_with_logging()
+        remote_host: user@host whose ssh/scp clients are killed
+    """
+    if future.cancel():
+        return  # Still queued; never started
+    cancel_host(remote_host)
+    if SEED_REGISTRY is not None:
+        SEED_REGISTRY.cancel_host(remote_host)
+    try:
+        await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), CANCEL_GRACE_SECONDS)
+    except Exception:
+        pass  # Failing is expected; a worker that does not unwind in time is left behind
+
+
+async def sync_server_task(executor, post, server, nas_csv_local, log_dir, custom_nas_url, overflow_path):
+    """Sync one server in the worker pool as a cancellable task
+
+    Args:
+        executor: Worker pool for the blocking sync
+        post: Callable(kind, hostname, payload) queueing a progress event (see report_progress())
+        server: Server spec in format user@hostname:/path
+        nas_csv_local: Local path to NAS CSV file (source of truth)
+        log_dir: Directory to write log files to
+        custom_nas_url: Optional custom NAS URL in format "ip:port"
+        overflow_path: Path for files that do not fit in the primary path
+
+    Returns:
+        bool: True if sync successful, False otherwise (also on timeout)
+    """
+    hostname = server.split('@')[-1].split(':')[0]
+    remote_host = server.split(':')[0]
+    loop = asyncio.get_running_loop()
+    started = asyncio.Event()
+
+    def run():
+        loop.call_soon_threadsafe(started.set)
+        return sync_server_with_logging(server, nas_csv_local, log_dir, custom_nas_url, overflow_path)
+
+    future = executor.submit(run)
+    timeout = SERVER_TIMEOUT_MINUTES * 60 if SERVER_TIMEOUT_MINUTES > 0 else None
+
+    try:
+        # The timeout counts from when a worker picks the server up, not
+        # while it waits in the pool's queue
+        await started.wait()
+        success = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+    except asyncio.TimeoutError:
+        await cancel_server_sync(future, remote_host)
+        update_progress(hostname, "Timed out", status="failed",
+                        error_msg=f"Cancelled after {SERVER_TIMEOUT_MINUTES:g} min timeout")
+        post("finished", hostname, (False, None))
+        return False
+    except asyncio.CancelledError:
+        await cancel_server_sync(future, remote_host)
+        update_progress(hostname, "Cancelled", status="failed", error_msg="Cancelled")
+        raise
+    except Exception as e:
+        post("finished", hostname, (False, e))
+        return False
+
+    post("finished", hostname, (success, None))
+    return success
+
+
+async def sync_servers_parallel(servers, nas_csv_local, log_dir):
+    """Sync all servers at once from one event loop
+
+    Each server is an asyncio task whose blocking sync runs in a pool of
+    SERVER_WORKERS threads (all servers at once by default); servers beyond
+    that wait in the pool's queue without a thread, and their timeout only
+    starts once a worker picks them up. Worker threads report progress through
+    update_progress(), which posts events to the loop; all events go through
+    call_soon_threadsafe() so they are applied in the order they were posted.
+    Cancelling the run (Ctrl-C, SIGTERM) cancels every server task.
+
+    Args:
+        servers: List of (server, overflow_path, custom_nas_url) tuples
+        nas_csv_local: Local path to NAS CSV file (source of truth)
+        log_dir: Directory to write log files to
+
+    Returns:
+        dict: {server: bool} sync result per server
+    """
+    global PROGRESS_SINK
+
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+
+    def post(kind, hostname, payload):
+        loop.call_soon_threadsafe(events.put_nowait, (kind, hostname, payload))
+
+    PROGRESS_SINK = lambda server, data: post("progress", server, data)
+    reporter = asyncio.create_task(report_progress(events))
+    executor = ThreadPoolExecutor(max_workers=min(len(servers), SERVER_WORKERS or len(servers)))
+
+    main_task = asyncio.current_task()
+    loop.add_signal_handler(signal.SIGTERM, main_task.cancel)
+    try:
+        tasks = [
+            asyncio.create_task(sync_server_task(executor, post, server, nas_csv_local, log_dir, custom_nas, path2))
+            for server, path2, custom_nas in servers
+        ]
+        try:
+            outcomes = await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            raise KeyboardInterrupt from None
+        return {server: success for (server, _, _), success in zip(servers, outcomes)}
+    finally:
+        loop.remove_signal_handler(signal.SIGTERM)
+        PROGRESS_SINK = None
+        post("stop", None, None)
+        await reporter
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
 def main():
-    global DRY_RUN, SKIP_L1_REFRESH
+    global DRY_RUN, SKIP_L1_REFRESH, TRANSFERS, VERIFY_WORKERS, INLINE_HASH, SEGMENT_CONNECTIONS
+    global NAS_TRANSFERS, LIMIT_RATE_MBPS, SEED_REGISTRY, PEER_SCHEDULER, FANOUT_PORT, FANOUT_UPLOADS
+    global SERVER_WORKERS, SERVER_TIMEOUT_MINUTES, RESUME, RUN, EVENT_LOG, PROFILE
 
     nas_http_server_start_attempted = False
 
@@ -1204,6 +2264,24 @@ Examples:
 
   # Skip L1 (filesize) refresh for faster sync (use cached values)
   python3 sync_models_multi_server.py --skip-l1-refresh
+
+  # Download 4 files at a time per server, verifying 2 at a time
+  python3 sync_models_multi_server.py --transfers 4 --verify-workers 2
+
+  # Parallel sync with at most 6 NAS transfers fleet-wide, 200 MB/s per server
+  python3 sync_models_multi_server.py --parallel --nas-transfers 6 --limit-rate 200
+
+  # Parallel sync where servers that already have a file seed it to their peers
+  python3 sync_models_multi_server.py --parallel --fanout
+
+  # Parallel sync of at most 50 servers at a time, giving up on a server after 3 hours
+  python3 sync_models_multi_server.py --parallel --server-workers 50 --server-timeout 180
+
+  # Continue an interrupted sync, skipping finished phases and verified files
+  python3 sync_models_multi_server.py --parallel --resume
+
+  # Export Prometheus metrics to a node_exporter textfile and on port 9310
+  python3 sync_models_multi_server.py --parallel --metrics-file /var/lib/node_exporter/model_sync.prom --metrics-port 9310
         """
     )
     parser.add_argument(
@@ -1216,20 +2294,134 @@ Examples:
         action='store_true',
         help='Sync all servers in parallel (faster but more resource intensive)'
     )
+    parser.add_argument(
+        '--server-workers',
+        type=int,
+        default=DEFAULT_SERVER_WORKERS,
+        help='Servers synced at once in parallel mode; the rest wait their turn, and their '
+             '--server-timeout starts when they begin (default: all servers at once)'
+    )
+    parser.add_argument(
+        '--server-timeout',
+        type=float,
+        default=0,
+        metavar='MINUTES',
+        help='Cancel a server\'s sync in parallel mode after this many minutes (default: no limit)'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue the most recent run from logs/state-*.json: skip finished phases and files verified by it'
+    )
+    parser.add_argument(
+        '--metrics-file',
+        metavar='PATH',
+        help='Write Prometheus text-format metrics to PATH while syncing (e.g. for the node_exporter textfile collector)'
+    )
+    parser.add_argument(
+        '--metrics-port',
+        type=int,
+        default=0,
+        help='Serve Prometheus metrics at http://<this host>:PORT/metrics while syncing (default: off)'
+    )
     parser.add_argument(
         '--skip-l1-refresh',
         action='store_true',
         help='Skip L1 (filesize) refresh before comparison (use cached values)'
     )
+    parser.add_argument(
+        '--transfers',
+        type=int,
+        default=DEFAULT_TRANSFERS,
+        help=f'Concurrent file downloads per GPU server (default: {DEFAULT_TRANSFERS})'
+    )
+    parser.add_argument(
+        '--verify-workers',
+        type=int,
+        default=DEFAULT_VERIFY_WORKERS,
+        help=f'Concurrent hash verifications per GPU server (default: {DEFAULT_VERIFY_WORKERS})'
+    )
+    parser.add_argument(
+        '--nas-transfers',
+        type=int,
+        default=DEFAULT_NAS_TRANSFERS,
+        help=f'Concurrent downloads from the NAS across all GPU servers (default: {DEFAULT_NAS_TRANSFERS})'
+    )
+    parser.add_argument(
+        '--limit-rate',
+        type=float,
+        default=0,
+        metavar='MBPS',
+        help='Download bandwidth cap per GPU server in MB/s, shared by its running transfers (default: unlimited)'
+    )
+    parser.add_argument(
+        '--fanout',
+        action='store_true',
+        help='Let GPU servers download files from peers in their group that already verified them'
+    )
+    parser.add_argument(
+        '--fanout-port',
+        type=int,
+        default=DEFAULT_FANOUT_PORT,
+        help=f'Port of the seed HTTP server on each GPU server (default: {DEFAULT_FANOUT_PORT})'
+    )
+    parser.add_argument(
+        '--fanout-uploads',
+        type=int,
+        default=DEFAULT_UPLOADS_PER_SEED,
+        help=f'Concurrent peer uploads per seeding GPU server (default: {DEFAULT_UPLOADS_PER_SEED})'
+    )
+    parser.add_argument(
+        '--no-inline-hash',
+        action='store_true',
+        help='Verify downloads with a separate sha256sum pass instead of hashing while downloading'
+    )
+    parser.add_argument(
+        '--segment-connections',
+        type=int,
+        default=DEFAULT_SEGMENT_CONNECTIONS,
+        help=f'Parallel HTTP Range connections per file for files of {SEGMENTED_MIN_SIZE // (1024 ** 3)} GB '
+             f'or more (default: {DEFAULT_SEGMENT_CONNECTIONS}; 1 downloads them with wget)'
+    )
 
     args = parser.parse_args()
 
     DRY_RUN = args.dry_run
     SKIP_L1_REFRESH = args.skip_l1_refresh
+    TRANSFERS = max(1, args.transfers)
+    VERIFY_WORKERS = max(1, args.verify_workers)
+    INLINE_HASH = not args.no_inline_hash
+    SEGMENT_CONNECTIONS = args.segment_connections
+    NAS_TRANSFERS = max(1, args.nas_transfers)
+    LIMIT_RATE_MBPS = max(0, args.limit_rate)
+    FANOUT_PORT = args.fanout_port
+    FANOUT_UPLOADS = max(1, args.fanout_uploads)
+    SERVER_WORKERS = max(0, args.server_workers)
+    SERVER_TIMEOUT_MINUTES = max(0, args.server_timeout)
+    RESUME = args.resume
 
     # Create logs directory if it doesn't exist
     logs_dir = SCRIPT_DIR / "logs"
     logs_dir.mkdir(exist_ok=True)
+    RUN = latest_run(logs_dir) if RESUME else new_run()
+
+    # Structured events next to the logs, plus optional metrics export
+    EVENT_LOG = EventLog(logs_dir / "sync-events.jsonl")
+    PROFILE = SyncProfile()
+    EVENT_LOG.metrics_file = args.metrics_file
+    metrics_server = None
+    if args.metrics_port:
+        try:
+            metrics_server = start_metrics_server(EVENT_LOG, args.metrics_port)
+        except OSError as e:
+            print(f"⚠️  Cannot serve metrics on port {args.metrics_port}: {e}")
+    EVENT_LOG.emit(
+        "run_start",
+        dry_run=DRY_RUN, parallel=args.parallel, resume=RESUME, transfers=TRANSFERS,
+        nas_transfers=NAS_TRANSFERS, fanout=args.fanout, limit_rate_mbps=LIMIT_RATE_MBPS
+    )
+    exit_code = 1
+    results = {}
 
     print("="*70)
     print("Multi-Server Model Sync with NAS HTTP Server")
@@ -1237,6 +2429,10 @@ Examples:
         print("[DRY RUN MODE - No changes will be made]")
     if args.parallel:
         print("[PARALLEL MODE - All servers synced simultaneously]")
+    if args.fanout:
+        print(f"[FAN-OUT - Servers seed verified files to peers on port {FANOUT_PORT}]")
+    if RESUME:
+        print(f"[RESUME - Continuing run {RUN[0][:8]} from logs/state-*.json where it matches the NAS CSV]")
     if SKIP_L1_REFRESH:
         print("[SKIP L1 REFRESH - Using cached filesize values]")
     else:
@@ -1245,6 +2441,11 @@ Examples:
     print(f"NAS Source: {NAS_HOST}:{NAS_PATH}")
     print(f"NAS HTTP: http://{NAS_IP}:{HTTP_PORT}")
     print(f"Server List: gpu_servers.csv")
+    print(f"Events: logs/sync-events.jsonl")
+    if args.metrics_file:
+        print(f"Metrics file: {args.metrics_file}")
+    if metrics_server:
+        print(f"Metrics: http://0.0.0.0:{args.metrics_port}/metrics")
 
     try:
         # Step 1: Load GPU servers
@@ -1255,6 +2456,10 @@ Examples:
             print("❌ No servers found in gpu_servers.csv")
             sys.exit(1)
 
+        if args.fanout:
+            SEED_REGISTRY = SeedRegistry(FANOUT_UPLOADS)
+            PEER_SCHEDULER = TransferScheduler(len(servers) * TRANSFERS, TRANSFERS)
+
         print(f"\nServers to sync:")
         for i, (server, path2, custom_nas) in enumerate(servers, 1):
             _, path1 = server.rsplit(':', 1)
@@ -1296,8 +2501,6 @@ Examples:
         # Step 6: Sync each GPU server
         print_step(6, 6, "Sync GPU servers")
 
-        results = {}
-
         if args.parallel:
             # Parallel execution - sync all servers simultaneously
             print(f"\n🚀 Syncing {len(servers)} servers in parallel...")
@@ -1312,55 +2515,7 @@ Examples:
 
             print()
 
-            # Start monitoring thread
-            stop_monitoring = threading.Event()
-
-            def monitor_progress():
-                """Monitor and display progress periodically"""
-                while not stop_monitoring.is_set():
-                    time.sleep(30)  # Update every 30 seconds
-                    if not stop_monitoring.is_set():
-                        display_progress_status()
-
-            monitor_thread = threading.Thread(target=monitor_progress, daemon=True)
-            monitor_thread.start()
-
-            # Sync all servers in parallel
-            with ThreadPoolExecutor(max_workers=len(servers)) as executor:
-                # Submit all server sync tasks
-                future_to_server = {
-                    executor.submit(sync_server_with_logging, server, nas_csv_local, str(logs_dir), custom_nas, path2): (server, path2, custom_nas)
-                    for server, path2, custom_nas in servers
-                }
-
-                # Process results as they complete
-                for future in as_completed(future_to_server):
-                    server, path2, custom_nas = future_to_server[future]
-                    hostname = server.split('@')[-1].split(':')[0]
-                    try:
-                        success = future.result()
-                        results[server] = success
-
-                        # Display completion message
-                        with PROGRESS_LOCK:
-                            data = PROGRESS_DATA.get(hostname, {})
-                            files_synced = data.get("files_synced", 0)
-                            total_files = data.get("total_files", 0)
-                            error_msg = data.get("error_msg")
-                            if not success:
-                                failure_detail = error_msg or f"See logs/sync-{hostname}.log"
-                                print(f"\n[{hostname}] ❌ Failed: {failure_detail}")
-                            elif total_files > 0:
-                                print(f"\n[{hostname}] ✅ Completed: {files_synced}/{total_files} files synced")
-                            else:
-                                print(f"\n[{hostname}] ✅ Completed: Already in sync")
-                    except Exception as e:
-                        print(f"\n[{hostname}] ❌ Exception: {e}")
-                        results[server] = False
-
-            # Stop monitoring thread
-            stop_monitoring.set()
-            monitor_thread.join(timeout=1)
+            results = asyncio.run(sync_servers_parallel(servers, nas_csv_local, str(logs_dir)))
 
             # Final status display
             display_progress_status()
@@ -1372,7 +2527,9 @@ Examples:
                 print(f"# Server {i}/{len(servers)}")
                 print(f"{'#'*70}")
 
-                success = sync_single_server(server, nas_csv_local, custom_nas_url=custom_nas, overflow_path=path2)
+                hostname = server.split('@')[-1].split(':')[0]
+                success = sync_single_server(server, nas_csv_local, server_name=hostname,
+                                             custom_nas_url=custom_nas, overflow_path=path2)
                 results[server] = success
 
         # Summary
@@ -1389,6 +2546,14 @@ Examples:
         print(f"\nTotal: {success_count}/{len(servers)} servers synced successfully")
         print("="*70)
 
+        # Where the time went: phases per server and the critical path
+        profile_lines = PROFILE.report()
+        if profile_lines:
+            print("\n⏱️  " + profile_lines[0])
+            for line in profile_lines[1:]:
+                print(line)
+            print("="*70)
+
         if success_count == len(servers):
             print("\n🎉 All servers synced successfully!")
             exit_code = 0
@@ -1407,6 +2572,14 @@ Examples:
         exit_code = 1
 
     finally:
+        stop_seed_servers()
+
+        EVENT_LOG.emit("run_end", exit_code=exit_code, servers=len(results),
+                       succeeded=sum(1 for v in results.values() if v))
+        EVENT_LOG.close()
+        if metrics_server:
+            metrics_server.shutdown()
+
         # Only clean up after this run attempted to start the NAS server.
         if nas_http_server_start_attempted:
             try:
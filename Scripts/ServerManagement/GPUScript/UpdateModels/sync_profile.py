@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Per-phase timing profile and critical-path report for sync_models_multi_server.py.
+
+The sync reports what it spends time on as events (see sync_events.py):
+  timing     wall time of one phase of a server ("phase", "seconds"):
+               journal       applying checksums journaled by an earlier run
+               fetch_csv     downloading the server's CSV (dry run)
+               l1_refresh    L1 (filesize) refresh of the whole directory
+               l3_hash       standard checksum update (remote sha256 hashing)
+               csv_compare   comparing the server's CSV with the NAS CSV
+               download      step 3: transfers, verification and CSV journaling
+               final_update  step 4: filling in L1/L2 for downloaded files
+               total         the whole sync of the server
+  transfer   one download attempt ("bytes" actually downloaded, "seconds", "source", "ok")
+  hash       one hash read from disk ("seconds")
+  file_done  one synced file ("size", "source")
+
+SyncProfile.record() aggregates them per server. Phases can run several
+times (e.g. a resumed server applies its journal twice) and are summed.
+Transfers and hashes overlap inside the download phase, so their seconds
+are reported as busy time, next to the download's wall time.
+
+The report lists the wall time of every phase per server, the bytes each
+server downloaded with its throughput, the aggregate throughput of the
+run, and the critical path: the server that finished last, when it
+started (setup and waiting for a server worker come before) and the phase
+that dominated it.
+
+Usage:
+  profile = SyncProfile()
+  profile.record('timing', 'gpu-01', phase='l3_hash', seconds=42.0)
+  for line in profile.report():
+      print(line)
+"""
+
+import threading
+import time
+
+from hashing import format_bytes
+
+
+# Phases in workflow order (columns of the report)
+PHASES = ['journal', 'fetch_csv', 'l1_refresh', 'l3_hash', 'csv_compare', 'download', 'final_update']
+
+
+def format_duration(seconds):
+    """Short human-readable duration (e.g. 850ms, 4.2s, 12m03s, 1h02m)."""
+    if seconds < 1:
+        return f"{seconds * 1000:.0f}ms"
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    if minutes < 60:
+        return f"{minutes}m{seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m"
+
+
+class SyncProfile:
+    """Thread-safe per-server phase timers and byte counters of one run."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.servers = {}  # {server: per-server counters, see _server()}
+
+    def _server(self, server):
+        """Counters of a server (lock held)."""
+        if server not in self.servers:
+            self.servers[server] = {
+                'phases': {},          # {phase: seconds}
+                'span': None,          # (start, end) of the whole sync, relative to the run start
+                'transfer_seconds': 0.0,
+                'transfers': 0,
+                'failed_transfers': 0,
+                'hash_seconds': 0.0,
+                'hashes': 0,
+                'bytes': {},           # {source: bytes transferred}
+                'files': {},           # {source: files synced}
+            }
+        return self.servers[server]
+
+    def record(self, event, server, **fields):
+        """
+        Aggregate one event (events without a server or not listed above are ignored).
+
+        Args:
+            event: Event name
+            server: Server hostname
+            **fields: Event fields
+        """
+        if not server:
+            return
+        now = time.monotonic() - self.started
+        with self.lock:
+            counters = self._server(server)
+            if event == 'timing':
+                seconds = fields.get('seconds', 0)
+                if fields.get('phase') == 'total':
+                    counters['span'] = (max(0.0, now - seconds), now)
+                else:
+                    phases = counters['phases']
+                    phases[fields['phase']] = phases.get(fields['phase'], 0) + seconds
+            elif event == 'transfer':
+                counters['transfers'] += 1
+                counters['transfer_seconds'] += fields.get('seconds', 0)
+                if fields.get('ok'):
+                    source = fields.get('source', 'nas')
+                    counters['bytes'][source] = counters['bytes'].get(source, 0) + fields.get('bytes', 0)
+                else:
+                    counters['failed_transfers'] += 1
+            elif event == 'hash':
+                counters['hashes'] += 1
+                counters['hash_seconds'] += fields.get('seconds', 0)
+            elif event == 'file_done':
+                source = fields.get('source') or 'nas'
+                counters['files'][source] = counters['files'].get(source, 0) + 1
+
+    def critical_path(self):
+        """
+        The server that finished last and the phase that dominated it.
+
+        Returns:
+            tuple: (server, span, phase, phase_seconds), or None if no server finished
+        """
+        with self.lock:
+            finished = [(counters['span'], server, dict(counters['phases']))
+                        for server, counters in self.servers.items() if counters['span']]
+        if not finished:
+            return None
+        span, server, phases = max(finished, key=lambda item: item[0][1])
+        phase, phase_seconds = max(phases.items(), key=lambda item: item[1], default=(None, 0))
+        return (server, span, phase, phase_seconds)
+
+    def report(self):
+        """
+        Timing report of the run.
+
+        Returns:
+            list: Lines of text
+        """
+        wall = time.monotonic() - self.started
+        with self.lock:
+            servers = {server: {**counters, 'phases': dict(counters['phases']),
+                                'bytes': dict(counters['bytes']), 'files': dict(counters['files'])}
+                       for server, counters in self.servers.items()}
+        if not servers:
+            return []
+
+        used = {phase for counters in servers.values() for phase in counters['phases']}
+        phases = [phase for phase in PHASES if phase in used]
+        phases += sorted(used.difference(PHASES))
+        name_width = max(15, max(len(server) for server in servers))
+
+        lines = ["Phase timing (wall time per server)"]
+        header = f"   {'Server':{name_width}} {'total':>8}" + ''.join(f" {phase:>12}" for phase in phases)
+        lines.append(header + f" {'data':>10} {'rate':>12}")
+
+        total_bytes = 0
+        for server in sorted(servers):
+            counters = servers[server]
+            span = counters['span']
+            total = format_duration(span[1] - span[0]) if span else 'running'
+            row = f"   {server:{name_width}} {total:>8}"
+            for phase in phases:
+                seconds = counters['phases'].get(phase)
+                row += f" {format_duration(seconds) if seconds is not None else '-':>12}"
+            transferred = sum(counters['bytes'].values())
+            total_bytes += transferred
+            download_seconds = counters['phases'].get('download', 0)
+            rate = f"{format_bytes(transferred / download_seconds)}/s" if transferred and download_seconds else '-'
+            lines.append(row + f" {format_bytes(transferred):>10} {rate:>12}")
+
+        lines.append("")
+        lines.append("Download detail (busy time overlaps within the download phase)")
+        for server in sorted(servers):
+            counters = servers[server]
+            if not counters['transfers'] and not counters['hashes'] and not counters['files']:
+                continue
+            files = ', '.join(f"{count} {source}" for source, count in sorted(counters['files'].items())) or 'none'
+            detail = (f"   {server:{name_width}} files: {files}; "
+                      f"transfers: {counters['transfers']} ({counters['failed_transfers']} failed) "
+                      f"busy {format_duration(counters['transfer_seconds'])}; "
+                      f"hashes: {counters['hashes']} busy {format_duration(counters['hash_seconds'])}")
+            lines.append(detail)
+
+        lines.append("")
+        rate = f"{format_bytes(total_bytes / wall)}/s" if wall > 0 else '-'
+        lines.append(f"Aggregate: {format_bytes(total_bytes)} downloaded in {format_duration(wall)} ({rate})")
+
+        critical = self.critical_path()
+        if critical:
+            server, (start, end), phase, phase_seconds = critical
+            lines.append(f"Critical path: {server} finished last, {format_duration(end)} into the run "
+                         f"(started at {format_duration(start)}, synced for {format_duration(end - start)})")
+            if phase:
+                share = phase_seconds / (end - start) * 100 if end > start else 0
+                lines.append(f"   Dominant phase: {phase} {format_duration(phase_seconds)} ({share:.0f}% of its sync)")
+        return lines
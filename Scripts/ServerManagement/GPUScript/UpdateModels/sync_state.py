@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Per-server run state for sync_models_multi_server.py --resume.
+
+Every sync records its progress in logs/state-<hostname>.json:
+  - the run it belongs to: a run id shared by all servers of one fleet
+    sync, and when that run started
+  - the phases that finished: "checksums" (step 1, with a copy of the
+    server's CSV it produced, logs/state-<hostname>.csv, owned by the
+    state) and "completed" (step 4)
+  - every file downloaded and verified in step 3, recorded once its
+    checksum is journaled on the GPU server; each one is appended to
+    logs/state-<hostname>.verified (one JSON string per line), which is
+    folded into the state file whenever that is rewritten
+
+A state is only valid for the NAS CSV it was computed against: it stores
+that CSV's sha256 and the server spec, and is discarded when either
+changes. With --resume, the sync continues the most recent run
+(latest_run()) and a matching state of that run lets the sync skip the
+checksum update (the L1 refresh and full compare_checksums pass) and every
+file already verified, so restarting an interrupted fleet sync only redoes
+the work that was in flight. States of older runs and states that reached
+"completed" are never resumed. Without --resume a fresh state is started.
+
+Each phase change rewrites the file through a temp file that is fsynced
+and renamed over it, so a crash leaves either the old or the new state.
+Verified files only cost an append, so a large catalogue does not rewrite
+the whole state per file; a torn last line is ignored.
+
+Usage:
+  run_id, run_started = latest_run('logs') if resume else new_run()
+  state = SyncState.open(state_path('logs', 'gpu-01'), server, nas_csv_local, run_id, run_started, resume=True)
+  if not state.done('checksums'):
+      ... update checksums ...
+      state.finish('checksums', gpu_csv=state.keep_csv(gpu_csv_local))
+  state.mark_verified('model.ckpt')
+"""
+
+import glob
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+from hashing import sha256_file
+
+
+# Bumped when the file format changes; other versions are ignored
+STATE_VERSION = 2
+
+
+def state_path(logs_dir, hostname):
+    """Path of a server's state file."""
+    return os.path.join(str(logs_dir), f"state-{hostname}.json")
+
+
+def new_run():
+    """
+    Id and start time for a new fleet sync.
+
+    Returns:
+        tuple: (run_id, run_started)
+    """
+    return uuid.uuid4().hex, time.time()
+
+
+def latest_run(logs_dir):
+    """
+    The most recent run recorded in a logs directory's state files.
+
+    Returns:
+        tuple: (run_id, run_started) of the run that started last, or a
+            new_run() if there are no states
+    """
+    latest = None
+    for path in glob.glob(os.path.join(str(logs_dir), 'state-*.json')):
+        try:
+            with open(path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if not isinstance(saved, dict) or saved.get('version') != STATE_VERSION:
+            continue
+        run = (saved.get('run_id'), saved.get('run_started'))
+        if isinstance(run[1], (int, float)) and (latest is None or run[1] > latest[1]):
+            latest = run
+    return latest or new_run()
+
+
+class SyncState:
+    """Phases and verified files of one server's sync, persisted as JSON."""
+
+    def __init__(self, path, server, nas_csv_sha256, run_id, run_started):
+        self.path = path
+        self.server = server
+        self.nas_csv_sha256 = nas_csv_sha256
+        self.run_id = run_id
+        self.run_started = run_started
+        self.lock = threading.Lock()
+        self.phases = {}      # {phase: {key: value}}
+        self.verified = set()  # Files downloaded and verified against the NAS CSV
+        self.verified_log = os.path.splitext(path)[0] + '.verified'
+        self.resumed = False   # True if loaded from a previous run
+
+    @classmethod
+    def open(cls, path, server, nas_csv_local, run_id, run_started, resume=False):
+        """
+        Load a server's state for resuming, or start a fresh one.
+
+        Args:
+            path: State file (see state_path())
+            server: Server spec in format user@hostname:/path
+            nas_csv_local: Local NAS CSV the sync compares against
+            run_id: Id of this fleet sync (new_run(), or latest_run() to resume)
+            run_started: When the run started (time.time())
+            resume: If True, continue from a saved state of run_id that
+                matches the server and NAS CSV and did not complete;
+                otherwise (or without a match) start over
+
+        Returns:
+            SyncState: State to record this sync's progress in
+        """
+        state = cls(path, server, sha256_file(nas_csv_local), run_id, run_started)
+        if resume:
+            try:
+                with open(path) as f:
+                    saved = json.load(f)
+            except (OSError, ValueError):
+                saved = None
+            if (isinstance(saved, dict) and saved.get('version') == STATE_VERSION
+                    and saved.get('run_id') == run_id
+                    and saved.get('server') == server
+                    and saved.get('nas_csv_sha256') == state.nas_csv_sha256
+                    and 'completed' not in saved.get('phases', {})):
+                state.phases = saved.get('phases', {})
+                state.verified = set(saved.get('verified', [])) | state._read_verified_log()
+                state.resumed = True
+                with state.lock:
+                    state._save()  # Fold the log, dropping a torn last line before appending to it
+                return state
+
+        with state.lock:
+            state._save()
+        return state
+
+    def done(self, phase):
+        """True if phase finished in this or the resumed run."""
+        with self.lock:
+            return phase in self.phases
+
+    def get(self, phase, key, default=None):
+        """Value recorded with a finished phase."""
+        with self.lock:
+            return self.phases.get(phase, {}).get(key, default)
+
+    def keep_csv(self, csv_file):
+        """
+        Copy a CSV next to the state file, where no other sync overwrites it.
+
+        Args:
+            csv_file: CSV to keep (e.g. the step-1 copy of the server's CSV)
+
+        Returns:
+            str: Path of the copy (the state file's path with .csv)
+        """
+        kept = os.path.splitext(self.path)[0] + '.csv'
+        temp_path = f"{kept}.{os.getpid()}.tmp"
+        shutil.copyfile(csv_file, temp_path)
+        os.replace(temp_path, kept)
+        return kept
+
+    def finish(self, phase, **data):
+        """Record that phase finished, with optional values to resume from."""
+        with self.lock:
+            self.phases[phase] = data
+            self._save()
+
+    def mark_verified(self, filename):
+        """Record a downloaded file whose hash matched the NAS CSV (appended to the verified log)."""
+        with self.lock:
+            self.verified.add(filename)
+            with open(self.verified_log, 'a') as f:
+                f.write(json.dumps(filename) + '\n')
+
+    def _read_verified_log(self):
+        """Files in the verified log (complete lines only)."""
+        try:
+            with open(self.verified_log) as f:
+                content = f.read()
+        except OSError:
+            return set()
+        verified = set()
+        for line in content.split('\n')[:-1]:
+            try:
+                filename = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(filename, str):
+                verified.add(filename)
+        return verified
+
+    def _save(self):
+        """Atomically rewrite the state file (lock held)."""
+        data = {
+            'version': STATE_VERSION,
+            'run_id': self.run_id,
+            'run_started': self.run_started,
+            'server': self.server,
+            'nas_csv_sha256': self.nas_csv_sha256,
+            'phases': self.phases,
+            'verified': sorted(self.verified),
+        }
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(data, f, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        # Now part of the state file
+        with open(self.verified_log, 'w'):
+            pass
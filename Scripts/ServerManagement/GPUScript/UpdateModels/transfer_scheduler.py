@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Fleet-wide transfer scheduler for NAS downloads.
+
+In --parallel mode every GPU server downloads from the same NAS HTTP
+server at once. Without coordination each server runs its own transfers
+and the NAS disks and uplink thrash between all of them, so every server
+slows down together.
+
+A TransferScheduler hands out transfer slots for one download source:
+  - at most max_active transfers run at once across all hosts
+  - at most per_host transfers run at once on one host
+  - when a slot frees up, the waiting request that goes next is the one
+    from the most starved host (fewest active transfers, then fewest
+    bytes granted so far), and among those the smallest file
+
+Smallest-first keeps per-file latency low and finishes the many small
+files quickly; starved-host-first stops one server with a long queue
+from holding every NAS slot while the others sit idle.
+
+A BandwidthShare splits one host's bandwidth cap between its transfers.
+A running wget cannot change its --limit-rate, so each transfer gets its
+rate when it starts: what is left of the cap after the transfers already
+running, but at least min_share (the fixed split of the cap). A transfer
+running alone therefore gets the whole cap; the cap can only be exceeded,
+by at most min_share per transfer, while a new transfer overlaps ones
+that started alone.
+
+Usage:
+  from transfer_scheduler import BandwidthShare, TransferScheduler
+
+  scheduler = TransferScheduler(max_active=8, per_host=2)
+  bandwidth = BandwidthShare(cap=100 * 1024 * 1024, min_share=50 * 1024 * 1024)
+  with scheduler.slot('root@gpu-01', filesize), bandwidth.share() as limit_rate:
+      ... run the download with --limit-rate=limit_rate ...
+"""
+
+import itertools
+import threading
+from contextlib import contextmanager
+
+
+# Concurrent transfers from one NAS across all GPU servers
+DEFAULT_MAX_ACTIVE = 8
+
+# Concurrent transfers to one GPU server
+DEFAULT_PER_HOST = 2
+
+
+class TransferScheduler:
+    """Grants transfer slots under global and per-host limits."""
+
+    def __init__(self, max_active=DEFAULT_MAX_ACTIVE, per_host=DEFAULT_PER_HOST):
+        self.max_active = max(1, max_active)
+        self.per_host = max(1, per_host)
+        self.condition = threading.Condition()
+        self.active = {}         # {host: transfers running}
+        self.granted_bytes = {}  # {host: bytes of all slots granted so far}
+        self.waiting = {}        # {ticket: (host, size)}
+        self.granted = set()     # tickets granted but not yet picked up
+        self.tickets = itertools.count()
+
+    def _active_total(self):
+        return sum(self.active.values())
+
+    def _grant(self):
+        """Grant slots to waiting requests while limits allow (condition held)."""
+        while self.waiting and self._active_total() < self.max_active:
+            eligible = [
+                (self.active.get(host, 0), self.granted_bytes.get(host, 0), size, ticket)
+                for ticket, (host, size) in self.waiting.items()
+                if self.active.get(host, 0) < self.per_host
+            ]
+            if not eligible:
+                break  # Still wake the requests granted above
+            ticket = min(eligible)[3]
+            host, size = self.waiting.pop(ticket)
+            self.active[host] = self.active.get(host, 0) + 1
+            self.granted_bytes[host] = self.granted_bytes.get(host, 0) + size
+            self.granted.add(ticket)
+        self.condition.notify_all()
+
+    def acquire(self, host, size=0):
+        """
+        Block until a transfer slot is granted.
+
+        Args:
+            host: GPU server receiving the file
+            size: File size in bytes (smaller files are preferred)
+        """
+        with self.condition:
+            ticket = next(self.tickets)
+            self.waiting[ticket] = (host, size)
+            self._grant()
+            try:
+                while ticket not in self.granted:
+                    self.condition.wait()
+            except BaseException:
+                # Interrupted while waiting: withdraw, or give back a late grant
+                if self.waiting.pop(ticket, None) is None:
+                    self.granted.discard(ticket)
+                    self.active[host] -= 1
+                    self._grant()
+                raise
+            self.granted.discard(ticket)
+
+    def release(self, host):
+        """Return a slot obtained with acquire()."""
+        with self.condition:
+            self.active[host] -= 1
+            self._grant()
+
+    @contextmanager
+    def slot(self, host, size=0):
+        """Hold a transfer slot for the duration of the block."""
+        self.acquire(host, size)
+        try:
+            yield
+        finally:
+            self.release(host)
+
+    def status(self):
+        """
+        Snapshot of the scheduler state.
+
+        Returns:
+            tuple: (active_transfers, waiting_requests)
+        """
+        with self.condition:
+            return (self._active_total(), len(self.waiting))
+
+
+class BandwidthShare:
+    """Hands out per-transfer rates under one host's bandwidth cap."""
+
+    def __init__(self, cap, min_share):
+        self.cap = max(0, int(cap))
+        self.min_share = max(1, min(int(min_share), self.cap)) if self.cap else 0
+        self.lock = threading.Lock()
+        self.allocated = 0  # Bytes/sec given to running transfers
+
+    @contextmanager
+    def share(self):
+        """
+        Reserve a rate for the duration of the block.
+
+        Yields:
+            int: Bytes/sec for this transfer (0: unlimited, no cap set)
+        """
+        if not self.cap:
+            yield 0
+            return
+        with self.lock:
+            rate = max(self.cap - self.allocated, self.min_share)
+            self.allocated += rate
+        try:
+            yield rate
+        finally:
+            with self.lock:
+                self.allocated -= rate
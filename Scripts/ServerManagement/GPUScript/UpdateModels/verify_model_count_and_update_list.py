@@ -4,16 +4,24 @@ Verify that all GPU servers have the same number of models (.ckpt and .ckpt-tens
 Reads server list from gpu_servers.csv, compares model counts, filters the verified
 .ckpt names through model_blacklist.txt, writes model-list, and optionally triggers
 a control panel update.
+
+Each server's models directory is listed once (names, sizes, mtimes) in a single SSH
+call, all servers concurrently; counts, name differences and the model list are all
+computed from these snapshots.
 """
 
 from __future__ import annotations
 
 import argparse
 import csv
+import shlex
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from ssh_pool import run_ssh
+
 # Paths derived from script location
 SCRIPT_DIR = Path(__file__).parent.resolve()
 REPO_ROOT = SCRIPT_DIR.parents[3]  # Scripts/ServerManagement/GPUScript/UpdateModels -> repo root
@@ -22,6 +30,15 @@ MODEL_BLACKLIST_FILE = SCRIPT_DIR / "model_blacklist.txt"
 MODEL_LIST_FILE = REPO_ROOT / "model-list"
 SSH_TIMEOUT = 30
 
+# Servers whose inventory is fetched at once
+INVENTORY_WORKERS = 32
+
+# Model file kinds: (results key, filename suffix)
+MODEL_KINDS = (
+    ("ckpt", ".ckpt"),
+    ("tensordata", ".ckpt-tensordata"),
+)
+
 # Control panel settings
 CONTROL_PANEL_HOST = "100.71.37.12"
 CONTROL_PANEL_PORT = "50002"
@@ -47,23 +64,20 @@ def parse_servers(file_path: Path) -> list[tuple[str, str]]:
     return servers
 
 
-def get_file_count(server: str, models_path: str, pattern: str) -> tuple[int | None, str]:
+def get_inventory(server: str, models_path: str) -> tuple[dict[str, dict] | None, str]:
     """
-    SSH into server and count files matching pattern.
-    Returns (count, error_message). count is None if error occurred.
+    SSH into server once and list every entry of models_path.
+    Returns (inventory, error_message) where inventory maps
+    name -> {size: bytes, mtime: seconds, type: find %y letter}. inventory is None if error occurred.
     """
-    cmd = [
-        "ssh",
-        "-o", "ConnectTimeout=10",
-        "-o", "StrictHostKeyChecking=no",
-        "-o", "BatchMode=yes",
-        server,
-        f"ls -lrta {models_path} 2>/dev/null | awk '/{pattern}$/ {{print $NF}}' | sort | wc -l"
-    ]
+    # NUL-terminated records with the name last, so any filename parses
+    cmd = f"find {shlex.quote(models_path)} -mindepth 1 -maxdepth 1 -printf '%s\\t%T@\\t%y\\t%f\\0'"
 
     try:
-        result = subprocess.run(
+        result = run_ssh(
+            server,
             cmd,
+            ["-o", "StrictHostKeyChecking=no"],
             capture_output=True,
             text=True,
             timeout=SSH_TIMEOUT
@@ -71,46 +85,24 @@ def get_file_count(server: str, models_path: str, pattern: str) -> tuple[int | N
         if result.returncode != 0:
             return None, result.stderr.strip() or "SSH connection failed"
 
-        count = int(result.stdout.strip())
-        return count, ""
+        inventory = {}
+        for record in result.stdout.split("\0"):
+            if not record:
+                continue
+            size, mtime, file_type, name = record.split("\t", 3)
+            inventory[name] = {"size": int(size), "mtime": float(mtime), "type": file_type}
+        return inventory, ""
     except subprocess.TimeoutExpired:
         return None, "Connection timed out"
     except ValueError as e:
-        return None, f"Failed to parse count: {e}"
+        return None, f"Failed to parse file list: {e}"
     except Exception as e:
         return None, str(e)
 
 
-def get_file_list(server: str, models_path: str, pattern: str) -> tuple[list[str] | None, str]:
-    """
-    SSH into server and get a sorted list of names matching pattern.
-    Returns (file_list, error_message). file_list is None if error occurred.
-    """
-    cmd = [
-        "ssh",
-        "-o", "ConnectTimeout=10",
-        "-o", "StrictHostKeyChecking=no",
-        "-o", "BatchMode=yes",
-        server,
-        f"ls -lrta {models_path} 2>/dev/null | awk '/{pattern}$/ {{print $NF}}' | sort"
-    ]
-
-    try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=SSH_TIMEOUT
-        )
-        if result.returncode != 0:
-            return None, result.stderr.strip() or "SSH connection failed"
-
-        models = [line.strip() for line in result.stdout.strip().split('\n') if line.strip()]
-        return models, ""
-    except subprocess.TimeoutExpired:
-        return None, "Connection timed out"
-    except Exception as e:
-        return None, str(e)
+def files_with_suffix(inventory: dict[str, dict], suffix: str) -> list[str]:
+    """Sorted names in an inventory ending with suffix."""
+    return sorted(name for name in inventory if name.endswith(suffix))
 
 
 def update_control_panel(model_list_path: Path) -> tuple[bool, str]:
@@ -148,32 +140,28 @@ def update_control_panel(model_list_path: Path) -> tuple[bool, str]:
 def verify_counts(servers: list[tuple[str, str]]) -> tuple[dict[str, dict], dict[str, str]]:
     """
     Verify .ckpt and .ckpt-tensordata counts across all servers.
-    Returns (results, errors) where results maps server -> {ckpt: count, tensordata: count, models_path: path}
+    All inventories are fetched concurrently, so this takes as long as the slowest server.
+    Returns (results, errors) where results maps server ->
+    {ckpt: count, tensordata: count, models_path: path, inventory: see get_inventory()}
     """
     results = {}
     errors = {}
 
-    for server, models_path in servers:
-        print(f"Checking {server} ({models_path})...", end=" ", flush=True)
+    workers = max(1, min(len(servers), INVENTORY_WORKERS))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        inventories = list(executor.map(lambda server: get_inventory(*server), servers))
 
-        ckpt_count, ckpt_error = get_file_count(server, models_path, "\\.ckpt")
-        if ckpt_error:
-            errors[server] = ckpt_error
-            print(f"ERROR: {ckpt_error}")
+    for (server, models_path), (inventory, error) in zip(servers, inventories):
+        print(f"Checking {server} ({models_path})...", end=" ")
+        if error:
+            errors[server] = error
+            print(f"ERROR: {error}")
             continue
 
-        tensordata_count, tensordata_error = get_file_count(server, models_path, "\\.ckpt-tensordata")
-        if tensordata_error:
-            errors[server] = tensordata_error
-            print(f"ERROR: {tensordata_error}")
-            continue
-
-        results[server] = {
-            "ckpt": ckpt_count,
-            "tensordata": tensordata_count,
-            "models_path": models_path
-        }
-        print(f".ckpt: {ckpt_count}, .ckpt-tensordata: {tensordata_count}")
+        results[server] = {key: len(files_with_suffix(inventory, suffix)) for key, suffix in MODEL_KINDS}
+        results[server]["models_path"] = models_path
+        results[server]["inventory"] = inventory
+        print(f".ckpt: {results[server]['ckpt']}, .ckpt-tensordata: {results[server]['tensordata']}")
 
     return results, errors
 
@@ -225,10 +213,7 @@ def print_file_differences(results: dict[str, dict]) -> None:
     if not results:
         return
 
-    for count_key, pattern, label in (
-        ("ckpt", "\\.ckpt", ".ckpt"),
-        ("tensordata", "\\.ckpt-tensordata", ".ckpt-tensordata"),
-    ):
+    for count_key, label in MODEL_KINDS:
         count_to_servers = {}
         for server, info in results.items():
             count_to_servers.setdefault(info[count_key], []).append(server)
@@ -242,29 +227,14 @@ def print_file_differences(results: dict[str, dict]) -> None:
         reference_info = results[reference_server]
         reference_path = reference_info["models_path"]
 
-        print(
-            f"\nFetching {label} list from reference: "
-            f"{reference_server} ({reference_path})..."
-        )
-        reference_files, reference_error = get_file_list(
-            reference_server, reference_path, pattern
-        )
-        if reference_error:
-            print(f"  Error: {reference_error}")
-            continue
-        reference_set = set(reference_files)
+        print(f"\nComparing {label} names with reference: {reference_server} ({reference_path})")
+        reference_set = set(files_with_suffix(reference_info["inventory"], label))
 
         for server, info in results.items():
             if info[count_key] == reference_count:
                 continue
 
-            server_path = info["models_path"]
-            print(f"\nFetching {label} list from {server} ({server_path})...")
-            server_files, server_error = get_file_list(server, server_path, pattern)
-            if server_error:
-                print(f"  Error: {server_error}")
-                continue
-            server_set = set(server_files)
+            server_set = set(files_with_suffix(info["inventory"], label))
 
             missing = sorted(reference_set - server_set)
             extra = sorted(server_set - reference_set)
@@ -383,20 +353,10 @@ def main():
     if should_save_model_list:
         first_server = next(iter(results))
         first_server_path = results[first_server]["models_path"]
-        print(f"\nFetching .ckpt list from {first_server} ({first_server_path})...")
+        print(f"\nUsing .ckpt list from {first_server} ({first_server_path})")
 
-        model_list, error = get_file_list(first_server, first_server_path, "\\.ckpt")
-        if error or model_list is None:
-            print(f"Error fetching .ckpt list: {error or 'No file list returned'}")
-            sys.exit(1)
-
-        expected_count = results[first_server]["ckpt"]
-        if len(model_list) != expected_count:
-            print(
-                "Error: .ckpt count changed while fetching the model list "
-                f"(expected {expected_count}, got {len(model_list)})"
-            )
-            sys.exit(1)
+        # Same snapshot the counts were verified on
+        model_list = files_with_suffix(results[first_server]["inventory"], ".ckpt")
 
         filtered_model_list = [
             model for model in model_list if model not in model_blacklist